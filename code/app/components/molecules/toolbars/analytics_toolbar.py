@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
 import dash_bootstrap_components as dbc
@@ -10,6 +11,7 @@ from components.molecules.molecule import Molecule
 from dash import dcc, html
 from dash.development.base_component import Component
 from services.db.cache.trade_history import get_all_trades_df
+from services.db.cache.trades_df_cache import get_trades_version
 
 
 def analytics_bar_get_active_states(  # pylint: disable=too-many-arguments, too-many-positional-arguments
@@ -73,6 +75,26 @@ def analytics_bar_filter_trades(
     return trades_df
 
 
+@lru_cache(maxsize=1)
+def _get_filter_options(
+    _trades_version: int,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    # every analytics page renders the toolbar, the options only change with the trades
+    trades_df = get_all_trades_df()
+    if trades_df.empty:
+        return [], [], []
+
+    account_ids = [account_id for account_id in trades_df["account_id"].unique() if isinstance(account_id, str)]
+    symbols = [symbol for symbol in trades_df["symbol"].unique() if isinstance(symbol, str)]
+    asset_types = [asset_type for asset_type in trades_df["asset_type"].unique() if isinstance(asset_type, str)]
+
+    return (
+        [{"label": val, "value": val} for val in sorted(account_ids)],
+        [{"label": val, "value": val} for val in sorted(symbols)],
+        [{"label": val, "value": val} for val in sorted(asset_types)],
+    )
+
+
 class AnalyticsToolbarMolecule(Molecule):  # pylint: disable=too-few-public-methods
     """Toolbar for the analysis pages."""
 
@@ -100,19 +122,10 @@ class AnalyticsToolbarMolecule(Molecule):  # pylint: disable=too-few-public-meth
 
     def _load_filter_options(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
         """Load filter options for the dropdowns."""
-        trades_df = get_all_trades_df()
-        if trades_df.empty:
-            return [], [], []
-
-        account_ids = [account_id for account_id in trades_df["account_id"].unique() if isinstance(account_id, str)]
-        symbols = [symbol for symbol in trades_df["symbol"].unique() if isinstance(symbol, str)]
-        asset_types = [asset_type for asset_type in trades_df["asset_type"].unique() if isinstance(asset_type, str)]
-
-        return (
-            [{"label": val, "value": val} for val in sorted(account_ids)],
-            [{"label": val, "value": val} for val in sorted(symbols)],
-            [{"label": val, "value": val} for val in sorted(asset_types)],
-        )
+        # a frame past its TTL is loaded again here, which changes the version the options are cached by
+        get_all_trades_df()
+
+        return _get_filter_options(get_trades_version())
 
     def _render_filter_dropdowns(self) -> html.Div:
         """Render the filter dropdowns."""
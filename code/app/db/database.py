@@ -1,12 +1,15 @@
 import os
+from typing import Any
 
+from models.cache.sync_watermark import SyncWatermark
 from models.cache.trade_history import Trade
 from models.main.account import Account
 from models.main.account_config import AccountConfig
 from models.main.confluence import ConfluenceConfig
 from models.main.general_setting import GeneralSetting
 from quant_core.services.core_logger import CoreLogger
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 
 MAIN_DATABASE_PATH = os.path.join(os.path.dirname(__file__), "data", "database.db")
@@ -26,7 +29,7 @@ MAIN_TABLES = [
     ("main_general_settings", GeneralSetting),
     ("main_account_configs", AccountConfig),
 ]
-CACHE_TABLES = [("cache_trades", Trade)]
+CACHE_TABLES = [("cache_trades", Trade), ("cache_sync_watermarks", SyncWatermark)]
 
 main_engine = create_engine(MAIN_DATABASE_URL, echo=False)
 MainSessionLocal = sessionmaker(bind=main_engine)
@@ -35,6 +38,18 @@ cache_engine = create_engine(CACHE_DATABASE_URL, echo=False)
 CacheSessionLocal = sessionmaker(bind=cache_engine)
 
 
+def _create_cache_indexes(table_name: str, model: Any) -> None:
+    """Add indexes introduced after the table was created, the cache is dropped if its rows violate them."""
+    for index in model.__table__.indexes:
+        try:
+            index.create(bind=cache_engine, checkfirst=True)
+        except IntegrityError:
+            CoreLogger().warning(f"Clearing {table_name} to create {index.name}, it is filled again by the next sync.")
+            with cache_engine.begin() as connection:
+                connection.execute(text(f"DELETE FROM {table_name}"))
+            index.create(bind=cache_engine, checkfirst=True)
+
+
 def init_db() -> None:
     """Initialize the database on first run."""
     main_inspector = inspect(main_engine)
@@ -59,5 +74,6 @@ def init_db() -> None:
             model.metadata.create_all(bind=cache_engine)
         else:
             CoreLogger().debug(f"Table already exists: {table_name}")
+            _create_cache_indexes(table_name, model)
 
     CoreLogger().info("✅ Database initialization complete.")
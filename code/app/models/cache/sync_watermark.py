@@ -0,0 +1,11 @@
+from models.cache.trade_history import Base
+from sqlalchemy import Column, DateTime, String
+
+
+class SyncWatermark(Base):  # type: ignore  # pylint: disable=too-few-public-methods
+    """Time from which the next trade sync fetches the MT5 history of an account."""
+
+    __tablename__ = "cache_sync_watermarks"
+
+    account_id = Column(String, primary_key=True)
+    synced_until = Column(DateTime, nullable=False)
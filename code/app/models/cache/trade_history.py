@@ -1,7 +1,9 @@
+from typing import Any, Dict
+
 from quant_core.entities.dto.trade import AlphaTradeDTO
 from quant_core.enums.trade_direction import TradeDirection
 from quant_core.enums.trade_event_type import TradeEventType
-from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -11,6 +13,8 @@ class Trade(Base):  # type: ignore  # pylint: disable=too-few-public-methods
     """Trade model for SQLAlchemy ORM."""
 
     __tablename__ = "cache_trades"
+    # deposits all share position 0, their deal ticket (order) tells them apart
+    __table_args__ = (Index("ux_cache_trades_position", "account_id", "position_id", "order", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -41,26 +45,31 @@ class Trade(Base):  # type: ignore  # pylint: disable=too-few-public-methods
             f"size={self.size}, profit={self.profit})>"
         )
 
+    @staticmethod
+    def get_values(account_id: str, trade: AlphaTradeDTO) -> Dict[str, Any]:
+        """Column values of a TradeDTO, e.g. for bulk inserts."""
+        return {
+            "position_id": trade.id,
+            "account_id": account_id,
+            "order": trade.order,
+            "trade_group": trade.trade_group,
+            "opened_at": trade.opened_at,
+            "closed_at": trade.closed_at,
+            "direction": trade.direction.value,
+            "event": trade.event.value,
+            "size": trade.size,
+            "symbol": trade.symbol,
+            "entry_price": trade.entry_price,
+            "exit_price": trade.exit_price,
+            "profit": trade.profit,
+            "swap": trade.swap,
+            "commission": trade.commission,
+        }
+
     @staticmethod
     def from_dto(account_id: str, trade: AlphaTradeDTO) -> "Trade":
         """Create a Trade instance from a TradeDTO."""
-        return Trade(
-            position_id=trade.id,
-            account_id=account_id,
-            order=trade.order,
-            trade_group=trade.trade_group,
-            opened_at=trade.opened_at,
-            closed_at=trade.closed_at,
-            direction=trade.direction.value,
-            event=trade.event.value,
-            size=trade.size,
-            symbol=trade.symbol,
-            entry_price=trade.entry_price,
-            exit_price=trade.exit_price,
-            profit=trade.profit,
-            swap=trade.swap,
-            commission=trade.commission,
-        )
+        return Trade(**Trade.get_values(account_id, trade))
 
     def to_dto(self) -> AlphaTradeDTO:
         """Convert the Trade instance to a TradeDTO."""
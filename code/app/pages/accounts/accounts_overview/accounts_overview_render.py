@@ -6,6 +6,7 @@ from models.main.account import Account
 from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
 from services.db.cache.trade_history import get_all_trades_df
 from services.db.main.account import AccountService
+from services.metric_states import get_closed_trades, get_metric_frame
 
 
 def _render_account_card(account: Account, history_data_frame: pd.DataFrame) -> html.Div:
@@ -20,14 +21,16 @@ def _render_account_card(account: Account, history_data_frame: pd.DataFrame) ->
 def render_all_accounts():
     """Reload the MT5 accounts and their trades."""
     accounts = sorted(AccountService.get_all_accounts(), key=lambda x: x.friendly_name)
-    trades_df = get_all_trades_df()
-
-    if trades_df.empty:
-        balance_df = pd.DataFrame(columns=["account_id", "balance", "timestamp"])
-    else:
-        balance_df = AccountBalanceOverTime().calculate(
-            data_frame=trades_df,
-        )
+    # the per account balances are kept up to date by the trade sync, they are only calculated without a state
+    balance_df = get_metric_frame(AccountBalanceOverTime())
+    if balance_df is None:
+        trades_df = get_closed_trades(get_all_trades_df())
+        if trades_df.empty:
+            balance_df = pd.DataFrame(columns=["account_id", "balance", "timestamp"])
+        else:
+            balance_df = AccountBalanceOverTime().calculate(
+                data_frame=trades_df,
+            )
 
     return AlphaRow(
         [AlphaCol(_render_account_card(account, balance_df), xs=12, sm=6, md=4, lg=3, xl=3) for account in accounts]
@@ -10,6 +10,7 @@ from dash.development.base_component import Component
 from pages.analytics.performance.performance_constants import PREFIX
 from quant_core.enums.chart_mode import ChartMode
 from quant_core.metrics.expectancy_over_time.expectancy_over_time import ExpectancyOverTime
+from quant_core.metrics.metric_suite import MetricSuite
 from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
 from services.db.cache.trade_history import get_all_trades_df
 
@@ -111,15 +112,9 @@ def render_performance_content(  # pylint: disable=too-many-arguments, too-many-
     groups = TradeMetricOverTime.groups(
         group_by_account_id, group_by_symbol, group_by_asset_type, group_by_direction, group_by_hour, group_by_weekday
     )
-    expectancy_df = ExpectancyOverTime().calculate(
-        data_frame=trades_df,
-        group_by_account_id=group_by_account_id,
-        group_by_symbol=group_by_symbol,
-        group_by_asset_type=group_by_asset_type,
-        group_by_direction=group_by_direction,
-        group_by_hour=group_by_hour,
-        group_by_weekday=group_by_weekday,
-    )
+    expectancy_df = MetricSuite.calculate(trades_df, metrics=[ExpectancyOverTime()], groups=groups)[
+        "ExpectancyOverTime"
+    ]
 
     chart_mode = ChartMode.ABSOLUTE if show_abs else ChartMode.RELATIVE
 
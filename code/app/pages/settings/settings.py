@@ -8,6 +8,7 @@ from pages.base_page import BasePage
 from pages.settings.settings_callbacks import (  # pylint: disable=unused-import  # noqa: F401
     load_polygon_api_key,
     load_trade_window_settings,
+    rebuild_trades_from_metatrader_5,
     save_polygon_api_key,
     save_trade_window_settings,
     sync_trades_from_metatrader_5,
@@ -36,6 +37,7 @@ class GeneralSettingsPage(BasePage):  # pylint: disable=too-few-public-methods
                         dcc.Store(id=POLYGON_API_KEY_STORE_ID),
                         # deprecated sync trades button -> move to analytics page
                         AlphaButton("Sync Trades from TradingView", "sync-trades-btn").render(),
+                        AlphaButton("Rebuild Trade History", "rebuild-trades-btn").render(),
                         html.Div(id="sync-trades-status", className="mt-3"),
                     ]
                 ),
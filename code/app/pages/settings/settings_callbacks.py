@@ -111,3 +111,19 @@ def sync_trades_from_metatrader_5(_) -> dbc.Alert:
     except Exception as error:  # pylint: disable=broad-exception-caught
         CoreLogger().error(f"During sync trades from MetaTrader the following error occured: {str(error)}")
         return dbc.Alert(f"❌ Sync failed: {str(error)}", color="danger", dismissable=True)
+
+
+@callback(
+    Output("sync-trades-status", "children", allow_duplicate=True),
+    Input("rebuild-trades-btn", "n_clicks"),
+    prevent_initial_call=True,
+)
+def rebuild_trades_from_metatrader_5(_) -> dbc.Alert:
+    """Delete all stored trades and sync the full history from MetaTrader 5."""
+    try:
+        result = sync_trades_from_all_accounts(rebuild=True)
+        CoreLogger().info("Successfully rebuilt trades from MetaTrader.")
+        return dbc.Alert(f"✅ Rebuilt trades: {result}", color="success", dismissable=True)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        CoreLogger().error(f"During rebuild trades from MetaTrader the following error occured: {str(error)}")
+        return dbc.Alert(f"❌ Rebuild failed: {str(error)}", color="danger", dismissable=True)
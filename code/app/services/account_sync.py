@@ -0,0 +1,223 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import util
+from typing import Any, Callable, ContextManager, List, Optional
+
+from quant_core.clients.mt5.mt5_client import Mt5Client
+from quant_core.entities.dto.trade import AlphaTradeDTO
+from quant_core.services.core_logger import CoreLogger
+
+SYNC_MAX_WORKERS = 4
+SYNC_TIMEOUT = 300.0
+SYNC_POLL_INTERVAL = 0.1
+
+# the lock of the MT5 terminal, handed to every worker process when it starts
+_TERMINAL_LOCK: Any = None
+
+
+@dataclass
+class AccountSyncJob:
+    """The history of one account to fetch."""
+
+    account_id: str
+    friendly_name: str
+    secret_name: str
+    days: int
+    date_from: Optional[datetime] = None
+
+
+@dataclass
+class AccountSyncResult:
+    """The fetched trades of an account, or the error its fetch or write failed with."""
+
+    job: AccountSyncJob
+    trades: List[AlphaTradeDTO] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class _TerminalSection:
+    """
+    Holds the MT5 terminal lock while the terminal is logged in to an account.
+    - The time spent waiting for the lock is kept apart, it does not count towards the timeout of a fetch
+    - The lock is released once, either when the section is left or, after the fetch timed out, when the worker
+      process exits and its connection to the terminal is closed
+    """
+
+    def __init__(self, lock: Any) -> None:
+        self._lock = lock
+        self._guard = threading.Lock()
+        self._held = False
+        self._closed = False
+        self._waited = 0.0
+        self._waiting_since: Optional[float] = None
+
+    def __enter__(self) -> "_TerminalSection":
+        with self._guard:
+            self._waiting_since = time.monotonic()
+        self._lock.acquire()
+        with self._guard:
+            self._waited += time.monotonic() - self._waiting_since
+            self._waiting_since = None
+            if self._closed:
+                self._lock.release()
+                raise RuntimeError("The terminal was closed while waiting for it.")
+            self._held = True
+
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.release()
+
+    def waited(self) -> float:
+        """The seconds spent waiting for the terminal so far."""
+        with self._guard:
+            if self._waiting_since is None:
+                return self._waited
+            return self._waited + time.monotonic() - self._waiting_since
+
+    def release(self) -> None:
+        """Release the terminal if it is still held."""
+        with self._guard:
+            if self._held:
+                self._held = False
+                self._lock.release()
+
+    def release_on_exit(self) -> None:
+        """Keep the terminal until the worker process exits, a fetch left behind may still be using it."""
+        util.Finalize(None, self._close, exitpriority=0)
+
+    def _close(self) -> None:
+        with self._guard:
+            self._closed = True
+            if self._held:
+                try:
+                    Mt5Client.shutdown_terminal()
+                finally:
+                    self._held = False
+                    self._lock.release()
+
+
+def fetch_account_trades(job: AccountSyncJob, terminal: ContextManager) -> List[AlphaTradeDTO]:
+    """
+    Fetch the trades of an account.
+    The credentials are read and the deals are paired concurrently, only the login and the history fetch hold the
+    terminal, the MT5 terminal is logged in to one account at a time.
+    """
+    credentials = Mt5Client.get_credentials(job.secret_name)
+    with terminal:
+        mt5_client = Mt5Client(job.secret_name, credentials=credentials)
+        try:
+            deals = mt5_client.get_history(days=job.days, date_from=job.date_from)
+        finally:
+            mt5_client.shutdown()
+
+    return Mt5Client.to_alpha_trades(deals, account_id=job.account_id, skip_unmatched_exits=job.date_from is not None)
+
+
+def _init_worker(terminal_lock: Any) -> None:
+    global _TERMINAL_LOCK  # pylint: disable=global-statement
+    _TERMINAL_LOCK = terminal_lock
+
+
+def _run_job(
+    fetch: Callable[[AccountSyncJob, ContextManager], List[AlphaTradeDTO]], job: AccountSyncJob, timeout: float
+) -> List[AlphaTradeDTO]:
+    # runs in a worker process of its own, a fetch which does not return in time is left behind with the process,
+    # the terminal is released once the process exits
+    trades: List[AlphaTradeDTO] = []
+    errors: List[Exception] = []
+    terminal = _TerminalSection(_TERMINAL_LOCK)
+
+    def _fetch() -> None:
+        try:
+            trades.extend(fetch(job, terminal))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            errors.append(error)
+
+    started_at = time.monotonic()
+    thread = threading.Thread(target=_fetch, daemon=True)
+    thread.start()
+    while thread.is_alive() and time.monotonic() - started_at - terminal.waited() < timeout:
+        thread.join(SYNC_POLL_INTERVAL)
+
+    if thread.is_alive():
+        terminal.release_on_exit()
+        raise TimeoutError(f"Fetching the trades of {job.friendly_name} took longer than {timeout:.0f}s.")
+    if errors:
+        raise errors[0]
+
+    return trades
+
+
+class AccountSyncScheduler:  # pylint: disable=too-few-public-methods
+    """
+    Fetches the trade histories of several accounts concurrently.
+    - Every account is fetched in a process of its own, the MetaTrader5 module holds one global terminal connection
+    - All workers share the one MT5 terminal, it is logged in to one account at a time behind a cross process lock
+    - At most `max_workers` accounts are fetched at a time, each one for at most `timeout` seconds not counting the
+      time spent waiting for the terminal
+    - The results are written by the calling process one after another, in the order the fetches finish
+    """
+
+    def __init__(
+        self,
+        max_workers: int = SYNC_MAX_WORKERS,
+        timeout: float = SYNC_TIMEOUT,
+        on_progress: Optional[Callable[[int, int, AccountSyncResult], None]] = None,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}.")
+
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.on_progress = on_progress
+
+    def run(
+        self,
+        jobs: List[AccountSyncJob],
+        write: Callable[[AccountSyncResult], None],
+        fetch: Callable[[AccountSyncJob, ContextManager], List[AlphaTradeDTO]] = fetch_account_trades,
+    ) -> List[AccountSyncResult]:
+        """
+        Fetch all jobs and write every fetched account, errors are kept on the results.
+        fetch gets the job and the terminal section, the MT5 login and history fetch have to run inside of it.
+        """
+        if not jobs:
+            return []
+
+        results = []
+        # workers are spawned as on windows, the lock has to be created by the same context to be handed over
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(jobs)),
+            mp_context=context,
+            max_tasks_per_child=1,
+            initializer=_init_worker,
+            initargs=(context.Lock(),),
+        ) as executor:
+            futures = {executor.submit(_run_job, fetch, job, self.timeout): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = AccountSyncResult(job=futures[future])
+                try:
+                    result.trades = future.result()
+                    write(result)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    result.error = str(error) or type(error).__name__
+
+                results.append(result)
+                self._report(done, len(jobs), result)
+
+        return results
+
+    def _report(self, done: int, total: int, result: AccountSyncResult) -> None:
+        if result.error is None:
+            CoreLogger().info(f"[{done}/{total}] Synced {len(result.trades)} trades for {result.job.friendly_name}")
+        else:
+            CoreLogger().error(f"[{done}/{total}] Error syncing trades for {result.job.friendly_name}: {result.error}")
+
+        if self.on_progress is not None:
+            self.on_progress(done, total, result)
@@ -0,0 +1,129 @@
+import importlib
+import time
+from datetime import datetime, timedelta
+from multiprocessing import util
+from typing import Callable, ContextManager, Dict, List
+
+import pytest
+from quant_core.entities.dto.trade import AlphaTradeDTO
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.enums.trade_event_type import TradeEventType
+from services.account_sync import AccountSyncJob, AccountSyncResult, AccountSyncScheduler
+
+
+def _fetch(job: AccountSyncJob, terminal: ContextManager) -> List[AlphaTradeDTO]:
+    if job.account_id == "FAILING":
+        raise ValueError("Login failed.")
+    if job.account_id == "LATE":
+        time.sleep(1.0)
+
+    # the trades record when the terminal was held
+    with terminal:
+        entered_at = datetime.now()
+        if job.account_id == "HANGING":
+            # the worker process takes a second to exit once the fetch is left behind
+            util.Finalize(None, time.sleep, args=(1.0,), exitpriority=1)
+            time.sleep(30)
+        time.sleep(0.3)
+        left_at = datetime.now()
+
+    return [
+        AlphaTradeDTO(
+            id=index,
+            account_id=job.account_id,
+            order=index,
+            trade_group="-",
+            opened_at=entered_at,
+            closed_at=left_at,
+            direction=TradeDirection.LONG,
+            event=TradeEventType.LONG,
+            size=0.1,
+            symbol="EURUSD",
+            entry_price=1.1,
+            exit_price=1.2,
+            profit=10.0,
+            swap=0.0,
+            commission=-0.5,
+        )
+        for index in range(len(job.account_id))
+    ]
+
+
+def _worker_fetch() -> Callable[[AccountSyncJob, ContextManager], List[AlphaTradeDTO]]:
+    # the spawned workers import the fetch by its module name, the name pytest gives this module is not importable
+    return importlib.import_module("services.account_sync_test")._fetch  # type: ignore
+
+
+def _job(account_id: str) -> AccountSyncJob:
+    return AccountSyncJob(account_id=account_id, friendly_name=account_id, secret_name="SECRET", days=30)
+
+
+class TestAccountSyncScheduler:
+    def test_all_accounts_are_fetched_and_written(self) -> None:
+        written: List[str] = []
+        progress: List[int] = []
+
+        results = AccountSyncScheduler(max_workers=2, on_progress=lambda done, _, __: progress.append(done)).run(
+            [_job("A"), _job("BB"), _job("CCC")],
+            lambda result: written.append(result.job.account_id),
+            fetch=_worker_fetch(),
+        )
+
+        assert sorted(written) == ["A", "BB", "CCC"]
+        assert progress == [1, 2, 3]
+        assert {result.job.account_id: len(result.trades) for result in results} == {"A": 1, "BB": 2, "CCC": 3}
+        assert all(result.error is None for result in results)
+
+    def test_failing_and_hanging_accounts_do_not_stop_the_sync(self) -> None:
+        written: List[str] = []
+
+        results = AccountSyncScheduler(max_workers=3, timeout=1.0).run(
+            [_job("FAILING"), _job("HANGING"), _job("OK")],
+            lambda result: written.append(result.job.account_id),
+            _worker_fetch(),
+        )
+
+        errors = {result.job.account_id: result.error for result in results}
+        assert written == ["OK"]
+        assert errors["OK"] is None
+        assert errors["FAILING"] == "Login failed."
+        assert "took longer than 1s" in str(errors["HANGING"])
+
+    def test_the_terminal_is_held_until_a_hanging_worker_exits(self) -> None:
+        reported_at: Dict[str, datetime] = {}
+
+        results = AccountSyncScheduler(
+            max_workers=2,
+            timeout=2.0,
+            on_progress=lambda _, __, result: reported_at.setdefault(result.job.account_id, datetime.now()),
+        ).run([_job("HANGING"), _job("LATE")], lambda _: None, fetch=_worker_fetch())
+
+        late = next(result for result in results if result.job.account_id == "LATE")
+        assert late.error is None
+        # the hanging fetch holds the terminal until its worker process exited
+        assert late.trades[0].opened_at - reported_at["HANGING"] >= timedelta(seconds=0.9)
+
+    def test_the_terminal_is_held_by_one_account_at_a_time(self) -> None:
+        results = AccountSyncScheduler(max_workers=3, timeout=0.5).run(
+            [_job("A"), _job("BB"), _job("CCC")], lambda _: None, fetch=_worker_fetch()
+        )
+
+        # waiting for the terminal does not count towards the timeout
+        assert all(result.error is None for result in results)
+        sections = sorted((result.trades[0].opened_at, result.trades[0].closed_at) for result in results)
+        assert all(left_at <= entered_at for (_, left_at), (entered_at, _) in zip(sections, sections[1:]))
+
+    def test_write_errors_are_kept_on_the_result(self) -> None:
+        def _write(result: AccountSyncResult) -> None:
+            raise ValueError(f"Database locked for {result.job.account_id}.")
+
+        results = AccountSyncScheduler().run([_job("A")], _write, fetch=_worker_fetch())
+
+        assert results[0].error == "Database locked for A."
+
+    def test_no_jobs(self) -> None:
+        assert not AccountSyncScheduler().run([], lambda _: None, fetch=_worker_fetch())
+
+    def test_value_error_is_thrown_without_workers(self) -> None:
+        with pytest.raises(ValueError):
+            AccountSyncScheduler(max_workers=0)
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Dict
+
+from db.database import CacheSessionLocal
+from models.cache.sync_watermark import SyncWatermark
+from quant_core.services.core_logger import CoreLogger
+
+
+def get_watermarks() -> Dict[str, datetime]:
+    """Return the sync watermark of every account."""
+    with CacheSessionLocal() as session:
+        return {watermark.account_id: watermark.synced_until for watermark in session.query(SyncWatermark).all()}
+
+
+def set_watermark(account_id: str, synced_until: datetime) -> None:
+    """Insert or update the sync watermark of an account."""
+    with CacheSessionLocal() as session:
+        CoreLogger().debug(f"Setting the sync watermark of account_id: {account_id} to {synced_until}")
+        session.merge(SyncWatermark(account_id=account_id, synced_until=synced_until))
+        session.commit()
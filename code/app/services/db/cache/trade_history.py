@@ -1,12 +1,50 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
 import pandas as pd
-from db.database import CacheSessionLocal
+from db.database import CacheSessionLocal, MainSessionLocal
 from models.cache.trade_history import Trade
-from quant_core.clients.mt5.mt5_client import Mt5Client
+from models.main.account import Account
+from models.main.account_config import AccountConfig
+from quant_core.entities.dto.trade import AlphaTradeDTO
 from quant_core.enums.asset_type import AssetType
+from quant_core.enums.platform import Platform
+from quant_core.enums.prop_firm import PropFirm
+from quant_core.enums.stagger_method import StaggerMethod
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.enums.trade_mode import TradeMode
 from quant_core.services.core_logger import CoreLogger
+from services.account_sync import AccountSyncJob, AccountSyncResult, AccountSyncScheduler
+from services.db.cache.sync_watermark import get_watermarks, set_watermark
+from services.db.cache.trades_df_cache import TRADES_DF_CACHE, invalidate_trades_df
 from services.db.main.account import AccountService
-from services.db.main.account_config import AccountConfigService
-from sqlalchemy import text
+from services.metric_states import clear_metric_states, get_closed_trades, update_metric_states
+from sqlalchemy import Connection, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+KEY_COLUMNS = ["account_id", "position_id", "order"]
+UPSERT_BATCH_SIZE = 5_000
+# deals are re-fetched this far before the watermark, MT5 deal times are in broker server time
+SYNC_OVERLAP = timedelta(days=1)
+# schema name of the main database while it is attached to a cache connection
+MAIN_SCHEMA = "main_db"
+TRADE_DTYPES = {
+    "id": "int64",
+    "position_id": "int64",
+    "order": "int64",
+    "event": "int64",
+    "size": "float64",
+    "entry_price": "float64",
+    "exit_price": "float64",
+    "profit": "float64",
+    "swap": "float64",
+    "commission": "float64",
+    # row ids of the account and the config of a trade, NaN without one
+    "account_row": "float64",
+    "config_row": "float64",
+}
+ENUM_COLUMNS = {"platform": Platform, "prop_firm": PropFirm, "entry_stagger_method": StaggerMethod, "mode": TradeMode}
 
 
 def get_all_trades() -> list[Trade]:
@@ -17,34 +55,111 @@ def get_all_trades() -> list[Trade]:
         return session.query(Trade).all()
 
 
-def get_all_trades_df(enrich: bool = True) -> pd.DataFrame:
-    """Fetch all trades as a DataFrame."""
-    all_trades = get_all_trades()
-    trades_df = pd.DataFrame([t.__dict__ for t in all_trades])
-    trades_df = trades_df[[col for col in trades_df.columns if not col.startswith("_sa_")]]
-
-    if enrich and not trades_df.empty:
-        accounts = AccountService().get_all_accounts()
-        accounts_df = pd.DataFrame([a.__dict__ for a in accounts])
-        accounts_df = accounts_df[[col for col in accounts_df.columns if not col.startswith("_sa_")]]
-
-        trades_df = trades_df.merge(accounts_df, left_on="account_id", right_on="uid", how="left")
-        trades_df.drop(columns=["enabled", "uid"], inplace=True)
-
-        accounts_config = AccountConfigService().get_all_configs()
-        accounts_config_df = pd.DataFrame([c.__dict__ for c in accounts_config])
-        accounts_config_df = accounts_config_df[
-            [col for col in accounts_config_df.columns if not col.startswith("_sa_")]
-        ]
-        accounts_config_df["asset_type"] = accounts_config_df["asset_type"].apply(
-            lambda x: x.value if x else AssetType.UNKNOWN.value
-        )
-        accounts_config_df["symbol"] = accounts_config_df["platform_asset_id"]
-        trades_df = trades_df.merge(accounts_config_df, on=["account_id", "symbol"], how="left")
+def _read_trade_columns(connection: Connection, query: str) -> pd.DataFrame:
+    # rows straight from the DBAPI cursor into one typed array per column, the result rows are never materialised
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(query)
+        names = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    values = zip(*rows) if rows else [()] * len(names)
+    trades_df = pd.DataFrame(
+        {name: np.array(column, dtype=TRADE_DTYPES.get(name, object)) for name, column in zip(names, values)}
+    )
+    for column in ["opened_at", "closed_at"]:
+        trades_df[column] = pd.to_datetime(trades_df[column], format="ISO8601")
 
     return trades_df
 
 
+def _read_dimension(connection: Connection, model: Any, columns: List[str]) -> pd.DataFrame:
+    dimension_df = pd.read_sql_query(
+        text(f"SELECT rowid AS row_id, {', '.join(columns)} FROM {MAIN_SCHEMA}.{model.__tablename__}"), connection
+    )
+    for column, enum in ENUM_COLUMNS.items():
+        if column in dimension_df:
+            dimension_df[column] = dimension_df[column].map(enum.__members__)
+
+    return dimension_df.set_index("row_id")
+
+
+def load_trades_df(enrich: bool = True) -> pd.DataFrame:
+    """
+    Load all trades as a DataFrame from the database, get_all_trades_df returns the cached frame.
+    - The trades are read column wise from the cursor into typed columns (see TRADE_DTYPES)
+    - With enrich, one SQL join finds the account and the account config (by symbol) of every trade, their columns
+      are read once per account / config and spread over the trades by row id. The main database is attached to the
+      cache connection for it
+    - Enum columns hold the enum members, asset_type its value (UNKNOWN for configs without one)
+    """
+    trade_columns = [f't."{column.name}"' for column in Trade.__table__.columns]
+    query = f"SELECT {', '.join(trade_columns)} FROM {Trade.__tablename__} t ORDER BY t.id"
+
+    with CacheSessionLocal() as session:
+        CoreLogger().debug("Fetching all trades from the database.")
+        connection = session.connection()
+        if not enrich:
+            trades_df = _read_trade_columns(connection, query)
+            return pd.DataFrame() if trades_df.empty else trades_df
+
+        with MainSessionLocal() as main_session:
+            main_database_path = main_session.get_bind().url.database
+        connection.execute(text(f"ATTACH DATABASE :path AS {MAIN_SCHEMA}"), {"path": main_database_path})
+        try:
+            trades_df = _read_trade_columns(
+                connection,
+                f"SELECT {', '.join(trade_columns)}, a.rowid AS account_row, c.rowid AS config_row "
+                f"FROM {Trade.__tablename__} t "
+                f"LEFT JOIN {MAIN_SCHEMA}.{Account.__tablename__} a ON a.uid = t.account_id "
+                f"LEFT JOIN {MAIN_SCHEMA}.{AccountConfig.__tablename__} c "
+                "ON c.account_id = t.account_id AND c.platform_asset_id = t.symbol "
+                "ORDER BY t.id",
+            )
+            accounts_df = _read_dimension(
+                connection,
+                Account,
+                [f'"{column.name}"' for column in Account.__table__.columns if column.name not in ["uid", "enabled"]],
+            )
+            configs_df = _read_dimension(
+                connection,
+                AccountConfig,
+                [
+                    (
+                        "COALESCE(asset_type, 'UNKNOWN') AS asset_type"
+                        if column.name == "asset_type"
+                        else f'"{column.name}"'
+                    )
+                    for column in AccountConfig.__table__.columns
+                    if column.name != "account_id"
+                ],
+            )
+        finally:
+            connection.execute(text(f"DETACH DATABASE {MAIN_SCHEMA}"))
+
+    if trades_df.empty:
+        return pd.DataFrame()
+
+    configs_df["asset_type"] = configs_df["asset_type"].map({asset.name: asset.value for asset in AssetType})
+    configs_df["enabled"] = configs_df["enabled"].astype(bool)
+
+    return pd.concat(
+        [
+            trades_df.drop(columns=["account_row", "config_row"]),
+            accounts_df.reindex(trades_df["account_row"]).reset_index(drop=True),
+            configs_df.reindex(trades_df["config_row"]).reset_index(drop=True),
+        ],
+        axis=1,
+    )
+
+
+def get_all_trades_df(enrich: bool = True) -> pd.DataFrame:
+    """Fetch all trades as a DataFrame (see load_trades_df), cached until the trades, accounts or configs change."""
+    return TRADES_DF_CACHE.get(enrich, load_trades_df)
+
+
 def upsert_trade(trade_data: dict, account_id: str):
     """
     Insert or update a trade based on ticket number.
@@ -66,15 +181,44 @@ def upsert_trade(trade_data: dict, account_id: str):
             session.add(trade)
 
         session.commit()
+        invalidate_trades_df()
         return trade
 
 
+def upsert_trades(trades: List[AlphaTradeDTO], account_id: str, batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """
+    Insert or update all trades of an account in one transaction, returns the number of trades written.
+    - SQLite `INSERT ... ON CONFLICT DO UPDATE` on the unique (account_id, position_id, order) index, executed in
+      batches of `batch_size` rows
+    """
+    rows = [Trade.get_values(account_id, trade) for trade in trades]
+    if not rows:
+        return 0
+
+    statement = sqlite_insert(Trade.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={column: statement.excluded[column] for column in rows[0] if column not in KEY_COLUMNS},
+    )
+
+    with CacheSessionLocal() as session:
+        CoreLogger().info(f"Upserting {len(rows)} trades for account_id: {account_id}")
+        for start in range(0, len(rows), batch_size):
+            session.execute(statement, rows[start : start + batch_size])
+        session.commit()
+        invalidate_trades_df()
+
+    return len(rows)
+
+
 def delete_trade(ticket: int, account_id: int) -> None:
     """Delete a trade by ticket and account_id."""
     with CacheSessionLocal() as session:
         CoreLogger().info(f"Deleting trade with ticket: {ticket} for account_id: {account_id}")
         session.query(Trade).filter_by(ticket=ticket, account_id=account_id).delete()
         session.commit()
+        invalidate_trades_df()
+        clear_metric_states()
 
 
 def delete_trades_for_account(account_id: int) -> None:
@@ -83,6 +227,8 @@ def delete_trades_for_account(account_id: int) -> None:
         CoreLogger().info(f"Deleting all trades for account_id: {account_id}")
         session.query(Trade).filter_by(account_id=account_id).delete()
         session.commit()
+        invalidate_trades_df()
+        clear_metric_states()
 
 
 def truncate_table(table_name: str) -> None:
@@ -91,55 +237,85 @@ def truncate_table(table_name: str) -> None:
         CoreLogger().info("Deleting all rows from trades table (SQLite compatible).")
         session.execute(text(f"DELETE FROM {table_name}"))
         session.commit()
+        invalidate_trades_df()
 
 
-def _sync_trades_into_db(days: int) -> None:
-    results = []
+def get_watermark(trades: List[AlphaTradeDTO]) -> Optional[datetime]:
+    """
+    Time from which the next sync has to fetch the history of an account, None without trades.
+    - The last synced deal, or the opening deal of the first position still open (a single deal, no exit price), its
+      closing deal has to be fetched together with it
+    """
+    if not trades:
+        return None
+
+    open_positions = [
+        trade.opened_at for trade in trades if trade.event is not TradeEventType.DEPOSIT and trade.exit_price == 0.0
+    ]
+
+    return min([max(trade.closed_at for trade in trades), *open_positions])
+
+
+def _write_account_trades(result: AccountSyncResult) -> None:
+    upsert_trades(result.trades, result.job.account_id)
+    synced_until = get_watermark(result.trades)
+    if synced_until is not None:
+        set_watermark(result.job.account_id, synced_until)
+
+
+def _sync_trades_into_db(
+    days: int,
+    watermarks: Dict[str, datetime],
+    on_progress: Optional[Callable[[int, int, AccountSyncResult], None]] = None,
+) -> List[str]:
+    jobs = [
+        AccountSyncJob(
+            account_id=account.uid,
+            friendly_name=account.friendly_name,
+            secret_name=account.secret_name,
+            days=days,
+            date_from=watermarks[account.uid] - SYNC_OVERLAP if account.uid in watermarks else None,
+        )
+        for account in AccountService().get_all_accounts()
+    ]
+
+    return [
+        (
+            f"{result.job.friendly_name}: {len(result.trades)} trades synced"
+            if result.error is None
+            else f"{result.job.friendly_name}: sync failed"
+        )
+        for result in AccountSyncScheduler(on_progress=on_progress).run(jobs, _write_account_trades)
+    ]
 
-    for account in AccountService().get_all_accounts():
-        try:
-            alpha_trades = Mt5Client(account.secret_name).get_history_alpha_trades(account_id=account.uid, days=days)
-            CoreLogger().info(f"Fetched {len(alpha_trades)} trades for account {account.friendly_name}")
-
-            count = 0
-
-            for trade in alpha_trades:
-                trade_data = {
-                    "position_id": trade.id,
-                    "order": trade.order,
-                    "trade_group": trade.trade_group,
-                    "opened_at": trade.opened_at,
-                    "closed_at": trade.closed_at,
-                    "direction": trade.direction.value,
-                    "event": trade.event.value,
-                    "size": trade.size,
-                    "symbol": trade.symbol,
-                    "entry_price": trade.entry_price,
-                    "exit_price": trade.exit_price,
-                    "profit": trade.profit,
-                    "swap": trade.swap,
-                    "commission": trade.commission,
-                }
-                upsert_trade(trade_data, account.uid)
-                count += 1
-
-            results.append(f"{account.friendly_name}: {count} trades synced")
-        except Exception as error:  # pylint: disable=broad-exception-caught
-            CoreLogger().error(f"Error syncing trades for {account.friendly_name}: {error}")
-            results.append(f"{account.friendly_name}: sync failed")
-
-
-def sync_trades_from_all_accounts(days: int = 9999) -> str:
+
+def sync_trades_from_all_accounts(
+    days: int = 9999,
+    rebuild: bool = False,
+    on_progress: Optional[Callable[[int, int, AccountSyncResult], None]] = None,
+) -> str:
     """
     Syncs MT5 trade history for all accounts.
-    Deletes existing trades first.
+    Only the deals since the sync watermark of an account are fetched and merged into the existing trades,
+    accounts without a watermark fetch the last X days.
+    With rebuild, the trades and watermarks are deleted first and the last X days are fetched for all accounts.
+    The accounts are fetched concurrently (see AccountSyncScheduler), on_progress is called after every account.
+    The closed trades which were not in the database before (or were still open) are passed on to the incremental
+    metric states, a rebuild also rebuilds the metric states.
     Returns a summary string.
     """
 
-    tables = ["cache_trades"]
-    for table in tables:
-        truncate_table(table_name=table)
+    if rebuild:
+        tables = ["cache_trades", "cache_sync_watermarks"]
+        for table in tables:
+            truncate_table(table_name=table)
+        clear_metric_states()
+
+    known_trades_df = get_closed_trades(get_all_trades_df(enrich=False))
+    known_ids = set(known_trades_df["id"]) if not known_trades_df.empty else set()
+
+    results = _sync_trades_into_db(days, {} if rebuild else get_watermarks(), on_progress)
 
-    _sync_trades_into_db(days)
+    update_metric_states(get_all_trades_df(), known_ids)
 
-    return "Successfully synced trades."
+    return "; ".join(results) or "No accounts to sync."
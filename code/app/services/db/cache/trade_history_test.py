@@ -0,0 +1,335 @@
+import contextlib
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, ContextManager, List, Tuple
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+from models.cache.trade_history import Trade
+from models.main.account import Account
+from models.main.account_config import AccountConfig
+from quant_core.clients.mt5.mt5_client import Mt5Client
+from quant_core.entities.dto.trade import AlphaTradeDTO
+from quant_core.entities.mt5.mt5_trade import CompletedMT5Trade
+from quant_core.enums.asset_type import AssetType
+from quant_core.enums.platform import Platform
+from quant_core.enums.prop_firm import PropFirm
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.enums.trade_mode import TradeMode
+from quant_dev.builder import Builder
+from services.account_sync import AccountSyncJob, AccountSyncResult, AccountSyncScheduler, fetch_account_trades
+from services.db.cache.sync_watermark import get_watermarks
+from services.db.cache.trade_history import (
+    SYNC_OVERLAP,
+    get_all_trades,
+    get_all_trades_df,
+    get_watermark,
+    sync_trades_from_all_accounts,
+    upsert_trades,
+)
+from services.db.cache.trades_df_cache import invalidate_trades_df
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def _build_trades(count: int, profit: float = 10.0) -> List[AlphaTradeDTO]:
+    opened_at = datetime(2025, 1, 1)
+    deposits = [
+        AlphaTradeDTO(
+            id=0,
+            account_id="",
+            order=ticket,
+            trade_group="-",
+            opened_at=opened_at,
+            closed_at=opened_at,
+            direction=TradeDirection.NEUTRAL,
+            event=TradeEventType.DEPOSIT,
+            size=0.0,
+            symbol="",
+            entry_price=0.0,
+            exit_price=0.0,
+            profit=5_000.0,
+            swap=0.0,
+            commission=0.0,
+        )
+        for ticket in [1, 2]
+    ]
+    trades = [
+        AlphaTradeDTO(
+            id=100 + index,
+            account_id="",
+            order=1_000 + index,
+            trade_group="123",
+            opened_at=opened_at + timedelta(hours=index),
+            closed_at=opened_at + timedelta(hours=index + 1),
+            direction=TradeDirection.LONG,
+            event=TradeEventType.LONG,
+            size=0.1,
+            symbol="EURUSD",
+            entry_price=1.1,
+            exit_price=1.2,
+            profit=profit,
+            swap=0.0,
+            commission=-0.5,
+        )
+        for index in range(count)
+    ]
+
+    return deposits + trades
+
+
+def _run_in_process(
+    _: AccountSyncScheduler,
+    jobs: List[AccountSyncJob],
+    write: Callable[[AccountSyncResult], None],
+    fetch: Callable[[AccountSyncJob, ContextManager], List[AlphaTradeDTO]] = fetch_account_trades,
+) -> List[AccountSyncResult]:
+    # the patched Mt5Client only exists in this process
+    results = [AccountSyncResult(job=job, trades=fetch(job, contextlib.nullcontext())) for job in jobs]
+    for result in results:
+        write(result)
+
+    return results
+
+
+class TestUpsertTrades:
+    def test_trades_are_inserted_in_batches(self) -> None:
+        with Builder.temporary_test_db(Trade) as test_session_local:
+            with patch("services.db.cache.trade_history.CacheSessionLocal", test_session_local):
+                count = upsert_trades(_build_trades(25), "ACCOUNT", batch_size=10)
+
+                trades = get_all_trades()
+
+                assert count == 27
+                assert len(trades) == 27
+                assert sum(trade.event == TradeEventType.DEPOSIT.value for trade in trades) == 2
+                assert {trade.account_id for trade in trades} == {"ACCOUNT"}
+
+    def test_existing_trades_are_updated(self) -> None:
+        with Builder.temporary_test_db(Trade) as test_session_local:
+            with patch("services.db.cache.trade_history.CacheSessionLocal", test_session_local):
+                upsert_trades(_build_trades(5), "ACCOUNT")
+                upsert_trades(_build_trades(5), "OTHER")
+
+                upsert_trades(_build_trades(10, profit=-20.0), "ACCOUNT")
+
+                trades = get_all_trades()
+                account_trades = [trade for trade in trades if trade.account_id == "ACCOUNT"]
+                assert len(trades) == 19
+                assert len(account_trades) == 12
+                assert {trade.profit for trade in account_trades if trade.position_id} == {-20.0}
+                assert {trade.profit for trade in trades if trade.account_id == "OTHER" and trade.position_id} == {10.0}
+
+    def test_no_trades(self) -> None:
+        with Builder.temporary_test_db(Trade) as test_session_local:
+            with patch("services.db.cache.trade_history.CacheSessionLocal", test_session_local):
+                assert upsert_trades([], "ACCOUNT") == 0
+                assert not get_all_trades()
+
+
+class TestGetWatermark:
+    def test_watermark_is_the_last_deal(self) -> None:
+        trades = _build_trades(5)
+
+        assert get_watermark(trades) == max(trade.closed_at for trade in trades)
+
+    def test_watermark_is_held_by_open_positions(self) -> None:
+        trades = _build_trades(5)
+        trades[3].exit_price = 0.0
+        trades[3].closed_at = trades[3].opened_at
+
+        assert get_watermark(trades) == trades[3].opened_at
+
+    def test_no_trades(self) -> None:
+        assert get_watermark([]) is None
+
+
+def _build_deal(
+    ticket: int, position_id: int, time: datetime, entry_type: int, profit: float = 0.0
+) -> CompletedMT5Trade:
+    # buy to open, sell to close
+    return CompletedMT5Trade(
+        position_id=position_id,
+        ticket=ticket,
+        order=ticket,
+        time=time,
+        type_code=entry_type,
+        entry_type=entry_type,
+        size=0.1,
+        symbol="EURUSD",
+        price=1.1 + entry_type / 10,
+        commission=-0.5,
+        swap=0.0,
+        profit=profit,
+        magic=123,
+    )
+
+
+class TestSyncTradesFromAllAccounts:
+    def _sync(self, mt5_client: MagicMock, rebuild: bool = False, pair_deals: bool = False) -> MagicMock:
+        account = SimpleNamespace(uid="ACCOUNT", secret_name="SECRET", friendly_name="Account")
+        # without pair_deals the trades are returned as they are by the client
+        mt5_client_class = MagicMock(
+            return_value=mt5_client,
+            to_alpha_trades=Mt5Client.to_alpha_trades if pair_deals else lambda deals, account_id, **_: deals,
+        )
+        with patch("services.db.cache.trade_history.AccountService") as account_service, patch(
+            "services.account_sync.Mt5Client", mt5_client_class
+        ), patch.object(AccountSyncScheduler, "run", autospec=True, side_effect=_run_in_process), patch(
+            "services.db.cache.trade_history.get_all_trades_df", return_value=pd.DataFrame()
+        ), patch(
+            "services.db.cache.trade_history.update_metric_states"
+        ), patch(
+            "services.db.cache.trade_history.clear_metric_states"
+        ) as clear_metric_states:
+            account_service.return_value.get_all_accounts.return_value = [account]
+            sync_trades_from_all_accounts(rebuild=rebuild)
+
+        return clear_metric_states
+
+    def test_only_deals_since_the_watermark_are_fetched(self) -> None:
+        with Builder.temporary_test_db(Trade) as test_session_local:
+            with patch("services.db.cache.trade_history.CacheSessionLocal", test_session_local), patch(
+                "services.db.cache.sync_watermark.CacheSessionLocal", test_session_local
+            ):
+                trades = _build_trades(10)
+                mt5_client = MagicMock()
+                mt5_client.get_history.return_value = trades[:7]
+                self._sync(mt5_client)
+                assert mt5_client.get_history.call_args.kwargs["date_from"] is None
+
+                mt5_client.get_history.return_value = trades[5:]
+                self._sync(mt5_client)
+
+                date_from = mt5_client.get_history.call_args.kwargs["date_from"]
+                assert date_from == trades[6].closed_at - SYNC_OVERLAP
+                assert len(get_all_trades()) == 12
+                assert get_watermarks() == {"ACCOUNT": trades[-1].closed_at}
+
+    def test_closing_deals_of_synced_positions_are_skipped(self) -> None:
+        with Builder.temporary_test_db(Trade) as test_session_local:
+            with patch("services.db.cache.trade_history.CacheSessionLocal", test_session_local), patch(
+                "services.db.cache.sync_watermark.CacheSessionLocal", test_session_local
+            ):
+                opened_at = datetime(2025, 1, 1)
+                deals = [
+                    _build_deal(1, 100, opened_at, entry_type=0),
+                    _build_deal(2, 100, opened_at + timedelta(days=3), entry_type=1, profit=50.0),
+                    _build_deal(3, 200, opened_at + timedelta(days=3, hours=2), entry_type=0),
+                    _build_deal(4, 200, opened_at + timedelta(days=3, hours=3), entry_type=1, profit=20.0),
+                ]
+                mt5_client = MagicMock()
+                mt5_client.get_history.return_value = deals
+                self._sync(mt5_client, pair_deals=True)
+
+                # the window since the watermark holds only the closing deal of position 100
+                new_deals = [
+                    _build_deal(5, 300, opened_at + timedelta(days=3, hours=4), entry_type=0),
+                    _build_deal(6, 300, opened_at + timedelta(days=3, hours=5), entry_type=1, profit=10.0),
+                ]
+                mt5_client.get_history.return_value = deals[1:] + new_deals
+                self._sync(mt5_client, pair_deals=True)
+
+                trades = get_all_trades()
+                assert sorted((trade.position_id, trade.order) for trade in trades) == [(100, 1), (200, 3), (300, 5)]
+                assert all(trade.exit_price != 0.0 for trade in trades)
+                assert get_watermarks() == {"ACCOUNT": new_deals[-1].time}
+
+    def test_rebuild_fetches_the_full_history(self) -> None:
+        with Builder.temporary_test_db(Trade) as test_session_local:
+            with patch("services.db.cache.trade_history.CacheSessionLocal", test_session_local), patch(
+                "services.db.cache.sync_watermark.CacheSessionLocal", test_session_local
+            ):
+                mt5_client = MagicMock()
+                mt5_client.get_history.return_value = _build_trades(10)
+                self._sync(mt5_client)
+
+                mt5_client.get_history.return_value = _build_trades(4)
+                clear_metric_states = self._sync(mt5_client, rebuild=True)
+
+                assert mt5_client.get_history.call_args.kwargs["date_from"] is None
+                assert len(get_all_trades()) == 6
+                clear_metric_states.assert_called_once()
+
+
+class TestGetAllTradesDf:
+    def setup_method(self) -> None:
+        invalidate_trades_df()
+
+    @staticmethod
+    def _sessions(directory: str) -> Tuple[sessionmaker, sessionmaker]:
+        # the main database is attached by its path, in memory databases can not be shared that way
+        main_engine = create_engine(f"sqlite:///{os.path.join(directory, 'main.db')}")
+        cache_engine = create_engine(f"sqlite:///{os.path.join(directory, 'cache.db')}")
+        Account.metadata.create_all(bind=main_engine)
+        Trade.metadata.create_all(bind=cache_engine)
+
+        main_session_local = sessionmaker(bind=main_engine)
+        with main_session_local() as session:
+            session.add(
+                Account(
+                    uid="ACCOUNT",
+                    platform=Platform.METATRADER,
+                    prop_firm=PropFirm.FUNDING_PIPS,
+                    friendly_name="Account",
+                    enabled=True,
+                )
+            )
+            session.add(
+                AccountConfig(
+                    account_id="ACCOUNT",
+                    platform_asset_id="EURUSD",
+                    signal_asset_id="EURUSD",
+                    decimal_points=5,
+                    asset_type=AssetType.FOREX,
+                    mode=TradeMode.GRID,
+                    enabled=True,
+                )
+            )
+            session.commit()
+
+        return main_session_local, sessionmaker(bind=cache_engine)
+
+    def test_trades_are_joined_with_accounts_and_configs(self, tmp_path: Path) -> None:
+        main_session_local, cache_session_local = self._sessions(str(tmp_path))
+        with patch("services.db.cache.trade_history.CacheSessionLocal", cache_session_local), patch(
+            "services.db.cache.trade_history.MainSessionLocal", main_session_local
+        ):
+            upsert_trades(_build_trades(3), "ACCOUNT")
+            upsert_trades(_build_trades(2), "UNKNOWN")
+
+            trades_df = get_all_trades_df()
+
+        assert len(trades_df) == 9
+        assert list(trades_df["id"]) == sorted(trades_df["id"])
+        assert trades_df["opened_at"].dtype == "datetime64[ns]"
+        assert trades_df["profit"].dtype == "float64"
+        assert trades_df["event"].dtype == "int64"
+        assert not {"uid", "account", "account_configs"} & set(trades_df.columns)
+
+        account_df = trades_df[trades_df["account_id"] == "ACCOUNT"]
+        assert set(account_df["friendly_name"]) == {"Account"}
+        assert set(account_df["prop_firm"]) == {PropFirm.FUNDING_PIPS}
+        # deposits have no symbol and so no config
+        assert list(account_df["asset_type"]) == [np.nan, np.nan, "FOREX", "FOREX", "FOREX"]
+        assert list(account_df["mode"]) == [np.nan, np.nan, TradeMode.GRID, TradeMode.GRID, TradeMode.GRID]
+        assert list(account_df["enabled"].dropna()) == [True, True, True]
+        assert trades_df.loc[trades_df["account_id"] == "UNKNOWN", ["friendly_name", "asset_type"]].isna().all().all()
+
+    def test_trades_without_enrichment(self, tmp_path: Path) -> None:
+        main_session_local, cache_session_local = self._sessions(str(tmp_path))
+        with patch("services.db.cache.trade_history.CacheSessionLocal", cache_session_local), patch(
+            "services.db.cache.trade_history.MainSessionLocal", main_session_local
+        ):
+            assert get_all_trades_df(enrich=False).empty
+
+            # the bulk upsert invalidates the cached frame
+            upsert_trades(_build_trades(3), "ACCOUNT")
+            trades_df = get_all_trades_df(enrich=False)
+
+        assert list(trades_df.columns) == [column.name for column in Trade.__table__.columns]
+        assert len(trades_df) == 5
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+import pandas as pd
+from quant_core.services.core_logger import CoreLogger
+
+# seconds a cached frame is used, bounds how long writes of other processes stay unseen
+TRADES_DF_TTL = 300.0
+
+
+class TradesFrameCache:
+    """
+    Process wide cache of the trade frames of `get_all_trades_df`, one per `enrich` flag.
+    - Writes to the trades, accounts and account configs call `invalidate`, it drops the frames and bumps the version
+    - Frames older than `ttl` seconds are loaded again, every load bumps the version as well
+    - Callers share the cached frame, so values derived from it (e.g. the normalized trades) are cached with it,
+      treat it as read only
+    """
+
+    def __init__(self, ttl: float = TRADES_DF_TTL) -> None:
+        self.ttl = ttl
+        self._invalidations = 0
+        self._loads = 0
+        self._frames: Dict[bool, Tuple[float, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Number of invalidations and loads so far, e.g. as a memoisation key of values derived from the trades."""
+        return self._invalidations + self._loads
+
+    def invalidate(self) -> None:
+        """Drop the cached frames, the next call loads them again."""
+        with self._lock:
+            self._invalidations += 1
+            self._frames.clear()
+
+    def get(self, enrich: bool, load: Callable[[bool], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached frame, loaded by `load(enrich)` if there is none or it expired."""
+        with self._lock:
+            cached = self._frames.get(enrich)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+            invalidations = self._invalidations
+
+        # loaded without the lock, a frame loaded while the trades changed is not kept
+        CoreLogger().debug(f"Loading the trade frame (enrich={enrich}, invalidations={invalidations}).")
+        loaded_at, trades_df = time.monotonic(), load(enrich)
+        with self._lock:
+            if invalidations == self._invalidations:
+                self._loads += 1
+                self._frames[enrich] = (loaded_at, trades_df)
+
+        return trades_df
+
+
+TRADES_DF_CACHE = TradesFrameCache()
+
+
+def invalidate_trades_df() -> None:
+    """Invalidate the cached trade frames, to be called after every write to the trades, accounts or configs."""
+    TRADES_DF_CACHE.invalidate()
+
+
+def get_trades_version() -> int:
+    """Version of the cached trade frames, it changes with every invalidation and every load."""
+    return TRADES_DF_CACHE.version
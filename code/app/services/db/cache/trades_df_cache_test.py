@@ -0,0 +1,63 @@
+from typing import List
+
+import pandas as pd
+from services.db.cache.trades_df_cache import TradesFrameCache
+
+
+class _Loader:
+    def __init__(self) -> None:
+        self.calls: List[bool] = []
+
+    def __call__(self, enrich: bool) -> pd.DataFrame:
+        self.calls.append(enrich)
+
+        return pd.DataFrame({"profit": [1.0, 2.0], "enrich": [enrich, enrich]})
+
+
+class TestTradesFrameCache:
+    def test_frames_are_loaded_once_per_enrich_flag(self) -> None:
+        cache, load = TradesFrameCache(), _Loader()
+
+        cache.get(True, load)
+        cache.get(False, load)
+        trades_df = cache.get(True, load)
+
+        assert load.calls == [True, False]
+        assert list(trades_df["enrich"]) == [True, True]
+
+    def test_callers_share_the_cached_frame(self) -> None:
+        cache, load = TradesFrameCache(), _Loader()
+
+        assert cache.get(True, load) is cache.get(True, load)
+
+    def test_invalidation_reloads_and_bumps_the_version(self) -> None:
+        cache, load = TradesFrameCache(), _Loader()
+        cache.get(True, load)
+
+        cache.invalidate()
+        cache.get(True, load)
+
+        assert load.calls == [True, True]
+        assert cache.version == 3
+
+    def test_expired_frames_are_reloaded_and_bump_the_version(self) -> None:
+        cache, load = TradesFrameCache(ttl=0.0), _Loader()
+
+        cache.get(True, load)
+        version = cache.version
+        cache.get(True, load)
+
+        assert load.calls == [True, True]
+        assert cache.version > version
+
+    def test_frames_loaded_during_an_invalidation_are_not_kept(self) -> None:
+        cache, load = TradesFrameCache(), _Loader()
+
+        def _load_while_writing(enrich: bool) -> pd.DataFrame:
+            cache.invalidate()
+            return load(enrich)
+
+        cache.get(True, _load_while_writing)
+        cache.get(True, load)
+
+        assert load.calls == [True, True]
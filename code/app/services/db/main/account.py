@@ -7,6 +7,7 @@ from quant_core.enums.platform import Platform
 from quant_core.enums.prop_firm import PropFirm
 from quant_core.services.core_logger import CoreLogger
 from quant_core.utils.text_utils import generate_uid
+from services.db.cache.trades_df_cache import invalidate_trades_df
 from sqlalchemy.orm import joinedload
 
 
@@ -86,6 +87,7 @@ class AccountService:
                 account.platform = platform
                 account.prop_firm = prop_firm
             session.commit()
+            invalidate_trades_df()
 
         return account
 
@@ -115,6 +117,7 @@ class AccountService:
             account.account_configs.append(AccountConfig(**config, account_id=uid))
             session.add(account)
             session.commit()
+            invalidate_trades_df()
             return account
 
     @staticmethod
@@ -125,6 +128,7 @@ class AccountService:
             if account:
                 session.delete(account)  # Deletes related configs due to cascade
                 session.commit()
+                invalidate_trades_df()
                 CoreLogger().info(f"Deleted account with uid: {uid}")
             else:
                 CoreLogger().warning(f"No account found for UID: {uid}")
@@ -7,6 +7,7 @@ from quant_core.clients.mt5.mt5_client import Mt5Client
 from quant_core.enums.stagger_method import StaggerMethod
 from quant_core.enums.trade_mode import TradeMode
 from quant_core.services.core_logger import CoreLogger
+from services.db.cache.trades_df_cache import invalidate_trades_df
 from services.symbol_lookup import ALL_SYMBOLS
 from sqlalchemy.orm import joinedload
 
@@ -79,6 +80,7 @@ class AccountConfigService:
                     account.account_configs.append(new_config)
 
             session.commit()
+            invalidate_trades_df()
             CoreLogger().info(f"Finished upserting configs for account {account_uid}")
 
     @staticmethod
@@ -93,6 +95,7 @@ class AccountConfigService:
             if config:
                 session.delete(config)
                 session.commit()
+                invalidate_trades_df()
                 CoreLogger().info(f"Deleted config for {account_uid} + {platform_asset_id}")
             else:
                 CoreLogger().warning(f"No config found for deletion: {account_uid} + {platform_asset_id}")
@@ -108,6 +111,7 @@ class AccountConfigService:
                 CoreLogger().info(f"Clearing all configs for account {account_uid}")
                 account.account_configs.clear()
                 session.commit()
+                invalidate_trades_df()
             else:
                 CoreLogger().warning(f"No account found for UID {account_uid}")
 
@@ -0,0 +1,99 @@
+import os
+import pickle
+from typing import Any, Collection, List, Optional
+
+import pandas as pd
+from db.database import CACHE_DATABASE_PATH
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
+from quant_core.metrics.profit_factor_over_time.profit_factor import ProfitFactorOverTime
+from quant_core.metrics.sharpe_over_time.sharpe import SharpeRatioOverTime
+from quant_core.metrics.sortino_over_time.sortino import SortinoRatioOverTime
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_core.metrics.trades_per_day_over_time.trades_per_day import TradesPerDayOverTime
+from quant_core.metrics.win_rate_over_time.win_rate_over_time import WinRateOverTime
+from quant_core.services.core_logger import CoreLogger
+
+METRIC_STATE_DIR = os.path.join(os.path.dirname(CACHE_DATABASE_PATH), "metric_states")
+
+# metrics kept up to date by the trade sync, with their default (per account) grouping
+INCREMENTAL_METRICS: List[TradeMetricOverTime] = [
+    AccountBalanceOverTime(),
+    SharpeRatioOverTime(),
+    SortinoRatioOverTime(),
+    ProfitFactorOverTime(),
+    WinRateOverTime(),
+    TradesPerDayOverTime(),
+]
+
+
+def _get_state_path(metric: TradeMetricOverTime) -> str:
+    return os.path.join(METRIC_STATE_DIR, f"{type(metric).__name__}.pkl")
+
+
+def _load_state(metric: TradeMetricOverTime) -> Optional[Any]:
+    state_path = _get_state_path(metric)
+    if not os.path.exists(state_path):
+        return None
+
+    try:
+        with open(state_path, "rb") as state_file:
+            return pickle.load(state_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def _save_state(metric: TradeMetricOverTime, state: Any) -> None:
+    os.makedirs(METRIC_STATE_DIR, exist_ok=True)
+    state_path = _get_state_path(metric)
+    with open(f"{state_path}.tmp", "wb") as state_file:
+        pickle.dump(state, state_file)
+    os.replace(f"{state_path}.tmp", state_path)
+
+
+def get_closed_trades(trades_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The deposits and closed trades, the trades the metric states are built from.
+    - Open positions are left out (no exit price yet), their row is replaced once they close
+    """
+    if trades_df.empty:
+        return trades_df
+
+    return trades_df[(trades_df["event"] == TradeEventType.DEPOSIT.value) | (trades_df["exit_price"] != 0.0)]
+
+
+def get_metric_frame(metric: TradeMetricOverTime) -> Optional[pd.DataFrame]:
+    """Return the metric frame of the persisted state, None if the metric has no state yet."""
+    state = _load_state(metric)
+
+    return None if state is None else state.frame
+
+
+def update_metric_states(trades_df: pd.DataFrame, known_ids: Collection[int]) -> None:
+    """
+    Extend the persisted metric states by the closed trades whose id is not in `known_ids`, the ids of the closed
+    trades before the sync.
+    - States which do not exist yet or can not take the trades incrementally are rebuilt from all closed trades
+    """
+    closed_df = get_closed_trades(trades_df)
+    new_trades_df = closed_df[~closed_df["id"].isin(known_ids)] if not closed_df.empty else closed_df
+    for metric in INCREMENTAL_METRICS:
+        state = _load_state(metric)
+        if state is not None:
+            try:
+                if not new_trades_df.empty:
+                    metric.update(state, new_trades_df)
+                    _save_state(metric, state)
+                continue
+            except ValueError as error:
+                CoreLogger().info(f"Rebuilding the {type(metric).__name__} state: {error}")
+
+        if not closed_df.empty:
+            _save_state(metric, metric.init_state(closed_df))
+
+
+def clear_metric_states() -> None:
+    """Delete all persisted metric states."""
+    for metric in INCREMENTAL_METRICS:
+        if os.path.exists(_get_state_path(metric)):
+            os.remove(_get_state_path(metric))
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
+from quant_core.metrics.trades_per_day_over_time.trades_per_day import TradesPerDayOverTime
+from services.metric_states import clear_metric_states, get_closed_trades, get_metric_frame, update_metric_states
+
+
+def _build_trades_df(count: int, open_index: int) -> pd.DataFrame:
+    opened_at = datetime(2025, 1, 1)
+    rows = [
+        {
+            "id": 1,
+            "account_id": "ACCOUNT",
+            "opened_at": opened_at,
+            "closed_at": opened_at,
+            "direction": TradeDirection.NEUTRAL.value,
+            "event": TradeEventType.DEPOSIT.value,
+            "symbol": "",
+            "exit_price": 0.0,
+            "profit": 10_000.0,
+            "swap": 0.0,
+            "commission": 0.0,
+        }
+    ]
+    for index in range(count):
+        # the open position is stored with its opening deal only, closed_at is its open time
+        is_open = index == open_index
+        rows.append(
+            {
+                "id": 2 + index,
+                "account_id": "ACCOUNT",
+                "opened_at": opened_at + timedelta(days=index),
+                "closed_at": opened_at + timedelta(days=index, hours=0 if is_open else 5),
+                "direction": TradeDirection.LONG.value,
+                "event": TradeEventType.LONG.value,
+                "symbol": "EURUSD",
+                "exit_price": 0.0 if is_open else 1.2,
+                "profit": 0.0 if is_open else 10.0 * (-1) ** index,
+                "swap": 0.0,
+                "commission": -0.5,
+            }
+        )
+
+    return pd.DataFrame(rows)
+
+
+class TestUpdateMetricStates:
+    def test_closing_positions_are_counted_once(self, tmp_path: Path) -> None:
+        with patch("services.metric_states.METRIC_STATE_DIR", str(tmp_path)):
+            before_df = _build_trades_df(20, open_index=19)
+            update_metric_states(before_df, set())
+
+            # the open position closed, its row is replaced, and two trades were added
+            after_df = _build_trades_df(22, open_index=-1)
+            update_metric_states(after_df, set(get_closed_trades(before_df)["id"]))
+
+            for metric in [AccountBalanceOverTime(), TradesPerDayOverTime()]:
+                pd.testing.assert_frame_equal(
+                    get_metric_frame(metric).reset_index(drop=True),
+                    metric.calculate(after_df).reset_index(drop=True),
+                    check_dtype=False,
+                )
+
+    def test_states_are_cleared(self, tmp_path: Path) -> None:
+        with patch("services.metric_states.METRIC_STATE_DIR", str(tmp_path)):
+            update_metric_states(_build_trades_df(5, open_index=-1), set())
+            clear_metric_states()
+
+            assert get_metric_frame(AccountBalanceOverTime()) is None
@@ -25,14 +25,16 @@ except ImportError:
 class Mt5Client:
     """A client for interacting with MetaTrader 5."""
 
-    def __init__(self, secret_id: str):
+    def __init__(self, secret_id: str, credentials: Optional[tuple[str, str, str]] = None):
         self._secret_id = secret_id
         self._initialized = False
-        self._login_to_mt5()
+        self._login_to_mt5(credentials)
 
-    def _get_mt5_credentials(self) -> tuple[str, str, str]:
+    @staticmethod
+    def get_credentials(secret_id: str) -> tuple[str, str, str]:
+        """Returns the MT5 login, password and server stored in the secret."""
         secrets_manager = boto3.client("secretsmanager", region_name="eu-west-1")
-        secret = secrets_manager.get_secret_value(SecretId=self._secret_id)
+        secret = secrets_manager.get_secret_value(SecretId=secret_id)
         secret_dict = json.loads(secret["SecretString"])
         login = secret_dict.get("MT5_USER_NAME")
         password = secret_dict.get("MT5_PASSWORD")
@@ -41,10 +43,12 @@ class Mt5Client:
             raise ValueError("Missing MT5 credentials in secrets manager.")
         return login, password, server
 
-    def _login_to_mt5(self) -> None:
-        CoreLogger().debug(f"Retrieving MT5 Secrets for secret id {self._secret_id}...")
-        login, password, server = self._get_mt5_credentials()
-        CoreLogger().debug("Successfully retrieved MT5 Secrets...")
+    def _login_to_mt5(self, credentials: Optional[tuple[str, str, str]] = None) -> None:
+        if credentials is None:
+            CoreLogger().debug(f"Retrieving MT5 Secrets for secret id {self._secret_id}...")
+            credentials = self.get_credentials(self._secret_id)
+            CoreLogger().debug("Successfully retrieved MT5 Secrets...")
+        login, password, server = credentials
 
         if isinstance(mt5, Mock):
             CoreLogger().warning("MT5 is mocked. Skipping initialization.")
@@ -71,6 +75,13 @@ class Mt5Client:
             self._initialized = False
             CoreLogger().info("MetaTrader5 shutdown successful.")
 
+    @staticmethod
+    def shutdown_terminal() -> None:
+        """Close the connection of this process to MT5, also the one of clients which are still using it."""
+        # the mocked module has no connection to close
+        if hasattr(mt5, "shutdown"):
+            mt5.shutdown()
+
     def get_balance(self) -> float:
         """Get the current balance from MT5."""
         if not self._initialized:
@@ -118,14 +129,15 @@ class Mt5Client:
 
         return result
 
-    def get_history(self, days: int = 365) -> List[CompletedMT5Trade]:
+    def get_history(self, days: int = 365, date_from: Optional[datetime] = None) -> List[CompletedMT5Trade]:
         """
         Returns a list of CompletedMT5Trade instances for all closed trades in the past X days.
+        If date_from is given, only the deals since date_from are returned.
         """
         if not self._initialized:
             raise ValueError("MT5 not initialized.")
 
-        date_from = datetime.now() - timedelta(days=days)
+        date_from = date_from or datetime.now() - timedelta(days=days)
         date_to = datetime.now() + timedelta(days=1)
         raw_trades = mt5.history_deals_get(date_from, date_to)  # type: ignore
 
@@ -181,11 +193,29 @@ class Mt5Client:
             ]
         )
 
-    def get_history_alpha_trades(self, account_id: str, days: int = 365) -> List[AlphaTradeDTO]:
+    def get_history_alpha_trades(
+        self, account_id: str, days: int = 365, date_from: Optional[datetime] = None
+    ) -> List[AlphaTradeDTO]:
         """
         Returns a list of AlphaTradeDTO instances for all closed trades in the past X days.
+        If date_from is given, only the deals since date_from are returned.
+        """
+        return self.to_alpha_trades(
+            self.get_history(days=days, date_from=date_from),
+            account_id=account_id,
+            skip_unmatched_exits=date_from is not None,
+        )
+
+    @staticmethod
+    def to_alpha_trades(
+        deals: List[CompletedMT5Trade], account_id: str, skip_unmatched_exits: bool = False
+    ) -> List[AlphaTradeDTO]:
+        """
+        Returns the AlphaTradeDTO instances of the deals, the opening and closing deal of a position form one trade.
+        With skip_unmatched_exits, closing deals without their opening deal are dropped instead of being returned as
+        open trades, an incremental window holds them for positions which were opened (and synced) before it.
         """
-        mt5_trades = sorted(self.get_history(days=days), key=lambda x: x.time)
+        mt5_trades = sorted(deals, key=lambda x: x.time)
         default_dict_dp = defaultdict(list)
         result = []
 
@@ -238,7 +268,7 @@ class Mt5Client:
                     del default_dict_dp[trade.position_id]
 
         for trades in default_dict_dp.values():
-            if len(trades) == 1:
+            if len(trades) == 1 and not (skip_unmatched_exits and trades[0].entry_type == 1):
                 opened_trade = trades[0]
                 direction = TradeDirection.LONG if opened_trade.type_code == 0 else TradeDirection.SHORT
                 result.append(
@@ -1,15 +1,36 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
 
+import numpy as np
 import pandas as pd
 from quant_core.features.feature import DataFeature
+from quant_core.features.kernels.heikin_ashi_kernel import heikin_ashi
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
 
 
+@dataclass
+class HeikinAshiState:
+    """Incremental state of the Heikin Ashi candles: the open and close whose midpoint is the next open."""
+
+    prev_open: float
+    prev_close: float
+
+
 class DataFeatureHeikinAshi(DataFeature):
-    """Data Feature for Heikin Ashi candles."""
+    """
+    Data Feature for Heikin Ashi candles.
+    - By default the open is the midpoint of the previous raw candle, the definition this feature always used, which
+      deviates from the classic Heikin Ashi candles
+    - `recursive_open=True` uses the midpoint of the previous Heikin Ashi candle (the classic definition)
+    """
+
+    def __init__(self, recursive_open: bool = False) -> None:
+        self._recursive_open = recursive_open
 
     def get_columns(self) -> List[str]:
-        return ["ha_open", "ha_close", "ha_high", "ha_low"]
+        suffix = "_recursive" if self._recursive_open else ""
+
+        return [f"ha_open{suffix}", f"ha_close{suffix}", f"ha_high{suffix}", f"ha_low{suffix}"]
 
     def add_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         ha_open_column, ha_close_column, ha_high_column, ha_low_column = self.get_columns()
@@ -19,15 +40,61 @@ class DataFeatureHeikinAshi(DataFeature):
         check_df_sorted(data_frame=data_frame)
         check_enough_rows(data_frame=data_frame)
 
-        data_frame[ha_open_column] = (data_frame["open"].shift(1) + data_frame["close"].shift(1)) / 2
-        data_frame[ha_close_column] = (
-            data_frame["open"] + data_frame["high"] + data_frame["low"] + data_frame["close"]
-        ) / 4
-        data_frame[ha_high_column] = data_frame[["high", ha_open_column, ha_close_column]].max(axis=1)
-        data_frame[ha_low_column] = data_frame[["low", ha_open_column, ha_close_column]].min(axis=1)
+        candles = heikin_ashi(
+            open_=data_frame["open"].to_numpy(),
+            high=data_frame["high"].to_numpy(),
+            low=data_frame["low"].to_numpy(),
+            close=data_frame["close"].to_numpy(),
+            recursive_open=self._recursive_open,
+        )
+
+        data_frame[ha_open_column] = candles[0]
+        data_frame[ha_close_column] = candles[1]
+        data_frame[ha_high_column] = candles[2]
+        data_frame[ha_low_column] = candles[3]
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> HeikinAshiState:
+        check_df_sorted(data_frame=data_frame)
+        check_enough_rows(data_frame=data_frame)
+
+        if not self._recursive_open:
+            return HeikinAshiState(
+                prev_open=float(data_frame["open"].iloc[-1]), prev_close=float(data_frame["close"].iloc[-1])
+            )
+
+        candles = heikin_ashi(
+            open_=data_frame["open"].to_numpy(),
+            high=data_frame["high"].to_numpy(),
+            low=data_frame["low"].to_numpy(),
+            close=data_frame["close"].to_numpy(),
+            recursive_open=True,
+        )
+
+        return HeikinAshiState(prev_open=float(candles[0, -1]), prev_close=float(candles[1, -1]))
+
+    def update(self, state: HeikinAshiState, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        ha_open_column, ha_close_column, ha_high_column, ha_low_column = self.get_columns()
+        bar_open, high, low, close = (float(new_bar[key]) for key in ("open", "high", "low", "close"))
+
+        ha_open = (state.prev_open + state.prev_close) / 2
+        ha_close = (bar_open + high + low + close) / 4
+        if self._recursive_open:
+            state.prev_open, state.prev_close = ha_open, ha_close
+        else:
+            state.prev_open, state.prev_close = bar_open, close
+
+        return {
+            ha_open_column: ha_open,
+            ha_close_column: ha_close,
+            ha_high_column: float(np.nanmax([high, ha_open, ha_close])),
+            ha_low_column: float(np.nanmin([low, ha_open, ha_close])),
+        }
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         ha_open_column, ha_close_column, ha_high_column, ha_low_column = self.get_columns()
         ha_normalized_open_column, ha_normalized_close_column, ha_normalized_high_column, ha_normalized_low_column = (
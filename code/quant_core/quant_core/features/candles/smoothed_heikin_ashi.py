@@ -1,50 +1,108 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
 
 import numpy as np
 import pandas as pd
-from quant_core.features.candles.heikin_ashi import DataFeatureHeikinAshi
+from quant_core.features.candles.heikin_ashi import DataFeatureHeikinAshi, HeikinAshiState
 from quant_core.features.feature import DataFeature
+from quant_core.features.kernels.heikin_ashi_kernel import heikin_ashi
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
+from quant_core.utils.rolling_utils import ExponentialMovingAverage
+
+
+@dataclass
+class SmoothedHeikinAshiState:
+    """Incremental state of the Smoothed Heikin Ashi candles."""
+
+    heikin_ashi: HeikinAshiState
+    open: ExponentialMovingAverage
+    close: ExponentialMovingAverage
+    high: ExponentialMovingAverage
+    low: ExponentialMovingAverage
 
 
 class DataFeatureSmoothedHeikinAshi(DataFeature):
-    """Data Feature for the Smoothed Heikin Ashi candles."""
+    """
+    Data Feature for the Smoothed Heikin Ashi candles, the EWM (span `smooth_length`) of the Heikin Ashi candles.
+    - The candles are the ones of `DataFeatureHeikinAshi`, by default they open at the midpoint of the previous raw
+      candle as this feature always did, which is not the classic definition, `recursive_open=True` gives that one
+    - Existing Heikin Ashi columns are smoothed as they are, otherwise candles and smoothing are computed in one pass
+    """
 
-    def __init__(self, smooth_length: int) -> None:
+    def __init__(self, smooth_length: int, recursive_open: bool = False) -> None:
         self._smooth_length = smooth_length
+        self._recursive_open = recursive_open
 
     def get_columns(self) -> List[str]:
+        suffix = "_recursive" if self._recursive_open else ""
+
         return [
-            f"ha_open_smooth_{self._smooth_length}",
-            f"ha_close_smooth_{self._smooth_length}",
-            f"ha_high_smooth_{self._smooth_length}",
-            f"ha_low_smooth_{self._smooth_length}",
+            f"ha_open_smooth_{self._smooth_length}{suffix}",
+            f"ha_close_smooth_{self._smooth_length}{suffix}",
+            f"ha_high_smooth_{self._smooth_length}{suffix}",
+            f"ha_low_smooth_{self._smooth_length}{suffix}",
         ]
 
+    def get_dependencies(self) -> List[DataFeature]:
+        return [DataFeatureHeikinAshi(self._recursive_open)]
+
     def add_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
-        sm_ha_open_column, sm_ha_close_column, sm_ha_high_column, sm_ha_low_column = self.get_columns()
         if all(column in data_frame for column in self.get_columns()):
             return data_frame
 
         check_df_sorted(data_frame)
         check_enough_rows(data_frame)
 
-        ha_feature = DataFeatureHeikinAshi()
-        ha_open, ha_close, ha_high, ha_low = ha_feature.get_columns()
-        data_frame = ha_feature.add_feature(data_frame)
-
-        data_frame[sm_ha_open_column] = data_frame[ha_open].ewm(span=self._smooth_length, adjust=False).mean()
-        data_frame[sm_ha_close_column] = data_frame[ha_close].ewm(span=self._smooth_length, adjust=False).mean()
-        data_frame[sm_ha_high_column] = data_frame[ha_high].ewm(span=self._smooth_length, adjust=False).mean()
-        data_frame[sm_ha_low_column] = data_frame[ha_low].ewm(span=self._smooth_length, adjust=False).mean()
+        ha_columns = DataFeatureHeikinAshi(self._recursive_open).get_columns()
+        if all(column in data_frame for column in ha_columns):
+            ha_candles = np.stack([data_frame[column].to_numpy(dtype=np.float64) for column in ha_columns])
+            smoothed = pd.DataFrame(ha_candles.T).ewm(span=self._smooth_length, adjust=False).mean().to_numpy().T
+            candles = np.concatenate([ha_candles, smoothed])
+        else:
+            candles = heikin_ashi(
+                open_=data_frame["open"].to_numpy(),
+                high=data_frame["high"].to_numpy(),
+                low=data_frame["low"].to_numpy(),
+                close=data_frame["close"].to_numpy(),
+                smooth_length=self._smooth_length,
+                recursive_open=self._recursive_open,
+            )
+        candles[4:, : self._smooth_length] = np.nan
 
-        data_frame[sm_ha_open_column][: self._smooth_length] = np.nan
-        data_frame[sm_ha_close_column][: self._smooth_length] = np.nan
-        data_frame[sm_ha_high_column][: self._smooth_length] = np.nan
-        data_frame[sm_ha_low_column][: self._smooth_length] = np.nan
+        for column, values in zip(ha_columns + self.get_columns(), candles):
+            if column not in data_frame:
+                data_frame[column] = values
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> SmoothedHeikinAshiState:
+        ha_feature = DataFeatureHeikinAshi(self._recursive_open)
+        history = ha_feature.add_feature(data_frame[["date", "open", "high", "low", "close"]].copy())
+
+        return SmoothedHeikinAshiState(
+            heikin_ashi=ha_feature.init_state(history),
+            **{
+                name: ExponentialMovingAverage(self._smooth_length, history[column].tolist())
+                for name, column in zip(("open", "close", "high", "low"), ha_feature.get_columns())
+            },
+        )
+
+    def update(self, state: SmoothedHeikinAshiState, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        ha_feature = DataFeatureHeikinAshi(self._recursive_open)
+        ha_values = ha_feature.update(state.heikin_ashi, new_bar)
+
+        result = {}
+        for average, ha_column, column in zip(
+            (state.open, state.close, state.high, state.low), ha_feature.get_columns(), self.get_columns()
+        ):
+            average.push(ha_values[ha_column])
+            result[column] = average.mean()
+
+        return result
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         sm_ha_open_column, sm_ha_close_column, sm_ha_high_column, sm_ha_low_column = self.get_columns()
         (
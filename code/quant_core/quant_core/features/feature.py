@@ -1,5 +1,5 @@
 import abc
-from typing import List
+from typing import Any, Dict, List, Mapping
 
 import pandas as pd
 
@@ -17,8 +17,27 @@ class DataFeature(abc.ABC):
 
     @abc.abstractmethod
     def add_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
-        """Add the feature to the DataFrame."""
+        """Add the feature to the DataFrame (or an `OhlcvFrame`, which is updated in place)."""
 
     @abc.abstractmethod
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         """Normalize the feature values in the DataFrame."""
+
+    def get_dependencies(self) -> List["DataFeature"]:
+        """Return the features whose columns `add_feature` reuses when they are already present."""
+        return []
+
+    def update_matches_add_feature(self) -> bool:
+        """Whether `update` returns the values `add_feature` computes on the extended candles, up to float rounding."""
+        return False
+
+    def init_state(self, data_frame: pd.DataFrame) -> Any:
+        """Build the state for incremental updates from the candle history in the DataFrame."""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support incremental updates.")
+
+    def update(self, state: Any, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Advance the state by one candle in O(1) and return the values of `get_columns()` for that candle.
+        The state is updated in place, `new_bar` needs the same price columns as `add_feature`.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support incremental updates.")
@@ -0,0 +1,121 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from quant_core.enums.time_period import TimePeriod
+from quant_core.features.feature import DataFeature
+from quant_core.features.feature_pipeline import FeaturePipeline
+
+FrameKey = Tuple[str, TimePeriod]
+
+_PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+@dataclass
+class _FrameSlice:
+    """Location of one frame in the shared price and date blocks."""
+
+    price_offset: int
+    date_offset: int
+    length: int
+    columns: List[str]
+
+
+def _read_frame(price_memory: SharedMemory, date_memory: SharedMemory, frame_slice: _FrameSlice) -> pd.DataFrame:
+    prices = np.ndarray(
+        (len(frame_slice.columns), frame_slice.length),
+        dtype=np.float64,
+        buffer=price_memory.buf,
+        offset=frame_slice.price_offset * 8,
+    )
+    dates = np.ndarray(frame_slice.length, dtype=np.int64, buffer=date_memory.buf, offset=frame_slice.date_offset * 8)
+
+    # copy out of the shared block, so it can be closed while the frame lives on
+    data_frame = pd.DataFrame({column: prices[i].copy() for i, column in enumerate(frame_slice.columns)})
+    data_frame.insert(0, "date", pd.to_datetime(dates.copy()))
+
+    return data_frame
+
+
+def _compute_frame(
+    price_memory_name: str, date_memory_name: str, frame_slice: _FrameSlice, features: List[DataFeature]
+) -> Dict[str, np.ndarray]:
+    price_memory = SharedMemory(name=price_memory_name)
+    date_memory = SharedMemory(name=date_memory_name)
+    try:
+        data_frame = _read_frame(price_memory, date_memory, frame_slice)
+    finally:
+        price_memory.close()
+        date_memory.close()
+
+    result = FeaturePipeline(features, max_workers=1).run(data_frame)
+
+    return {column: result[column].to_numpy() for column in result.columns if column not in data_frame.columns}
+
+
+def _write_frames(
+    frames: Dict[FrameKey, pd.DataFrame],
+    slices: Dict[FrameKey, _FrameSlice],
+    price_memory: SharedMemory,
+    date_memory: SharedMemory,
+) -> None:
+    price_block = np.ndarray(price_memory.size // 8, dtype=np.float64, buffer=price_memory.buf)
+    date_block = np.ndarray(date_memory.size // 8, dtype=np.int64, buffer=date_memory.buf)
+    for key, data_frame in frames.items():
+        frame_slice = slices[key]
+        for i, column in enumerate(frame_slice.columns):
+            start = frame_slice.price_offset + i * frame_slice.length
+            price_block[start : start + frame_slice.length] = data_frame[column].to_numpy(dtype=np.float64)
+        date_block[frame_slice.date_offset : frame_slice.date_offset + frame_slice.length] = (
+            pd.to_datetime(data_frame["date"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        )
+
+
+def compute_features(  # pylint: disable=too-many-locals
+    frames: Dict[FrameKey, pd.DataFrame], features: List[DataFeature], max_workers: Optional[int] = None
+) -> Dict[FrameKey, pd.DataFrame]:
+    """
+    Add the features to many (symbol, time period) frames at once on a process pool.
+    - The OHLCV columns of all frames are written once into shared memory, workers only receive offsets
+    - Each worker runs a FeaturePipeline and sends back the new feature columns only
+    - Returns copies of the input frames with the feature columns appended
+    """
+    slices: Dict[FrameKey, _FrameSlice] = {}
+    price_size = 0
+    date_size = 0
+    for key, data_frame in frames.items():
+        columns = [column for column in _PRICE_COLUMNS if column in data_frame.columns]
+        slices[key] = _FrameSlice(
+            price_offset=price_size, date_offset=date_size, length=len(data_frame), columns=columns
+        )
+        price_size += len(columns) * len(data_frame)
+        date_size += len(data_frame)
+
+    price_memory = SharedMemory(create=True, size=max(price_size, 1) * 8)
+    date_memory = SharedMemory(create=True, size=max(date_size, 1) * 8)
+    try:
+        _write_frames(frames, slices, price_memory, date_memory)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                key: executor.submit(_compute_frame, price_memory.name, date_memory.name, frame_slice, features)
+                for key, frame_slice in slices.items()
+            }
+            feature_columns = {key: future.result() for key, future in futures.items()}
+    finally:
+        price_memory.close()
+        price_memory.unlink()
+        date_memory.close()
+        date_memory.unlink()
+
+    enriched_frames = {}
+    for key, data_frame in frames.items():
+        new_columns = {
+            column: values for column, values in feature_columns[key].items() if column not in data_frame.columns
+        }
+        enriched_frames[key] = pd.concat([data_frame, pd.DataFrame(new_columns, index=data_frame.index)], axis=1)
+
+    return enriched_frames
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from quant_core.enums.time_period import TimePeriod
+from quant_core.features.candles.smoothed_heikin_ashi import DataFeatureSmoothedHeikinAshi
+from quant_core.features.feature_batch import compute_features
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.squeeze_momentum import DataFeatureSqueezeMomentum
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_dev.builder import Builder
+
+
+class TestComputeFeatures:
+    def test_matches_sequential_add_feature(self) -> None:
+        features = [DataFeatureSuperTrend(3.0, 10), DataFeatureSqueezeMomentum(), DataFeatureSmoothedHeikinAshi(10)]
+        frames = {
+            ("EURUSD", TimePeriod.MINUTE_5): Builder.build_random_walk_chart_data_frame(length=1200, seed=1),
+            ("EURUSD", TimePeriod.HOUR_1): Builder.build_random_walk_chart_data_frame(length=1500, seed=2, freq="1h"),
+            ("GBPUSD", TimePeriod.MINUTE_5): Builder.build_random_walk_chart_data_frame(length=1000, seed=3),
+        }
+        frames[("GBPUSD", TimePeriod.MINUTE_5)].index += 500
+
+        result = compute_features(frames, features, max_workers=2)
+
+        assert set(result) == set(frames)
+        for key, data_frame in frames.items():
+            expected = data_frame.copy()
+            for feature in features:
+                expected = feature.add_feature(expected)
+
+            assert list(data_frame.columns) == ["date", "open", "high", "low", "close", "volume"]
+            pd.testing.assert_frame_equal(result[key][expected.columns], expected)
+
+    def test_existing_columns_are_kept(self) -> None:
+        data_frame = DataFeatureAverageTrueRange(10).add_feature(Builder.build_random_walk_chart_data_frame(seed=4))
+
+        result = compute_features({("EURUSD", TimePeriod.DAY): data_frame}, [DataFeatureSuperTrend(3.0, 10)])
+
+        assert list(result[("EURUSD", TimePeriod.DAY)].columns).count("atr_10") == 1
+
+    def test_feature_errors_are_raised(self) -> None:
+        frames = {("EURUSD", TimePeriod.DAY): Builder.build_random_walk_chart_data_frame(length=100, seed=4)}
+
+        with pytest.raises(AssertionError):
+            compute_features(frames, [DataFeatureSuperTrend(3.0, 10)], max_workers=1)
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from quant_core.enums.time_period import TimePeriod
+from quant_core.features.feature import DataFeature
+from quant_core.features.feature_pipeline import FeaturePipeline
+
+_PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+# segments of an entry beyond which they are merged back into one
+_MAX_SEGMENTS = 16
+# seconds after which files no entry points to are deleted, a writer points its entry to them right after writing
+_ORPHAN_AGE = 60.0
+
+
+@dataclass
+class FeatureCacheEntry:  # pylint: disable=too-many-instance-attributes
+    """Metadata of one cached feature block, stored next to it as JSON."""
+
+    symbol: str
+    time_period: str
+    signature: str
+    columns: List[str]
+    dtypes: List[str]
+    length: int
+    last_timestamp: int
+    content_hash: str
+    # file names of the row segments of the block in order, and their rows
+    segments: List[str]
+    segment_lengths: List[int]
+    # file name of the pickled update states, empty without
+    states: str
+
+
+def _hash_prices(dates: np.ndarray, prices: Dict[str, np.ndarray], length: int) -> str:
+    """Hash of the first `length` candles, used to detect changed history."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dates[:length].tobytes())
+    for column, values in prices.items():
+        digest.update(column.encode())
+        digest.update(values[:length].tobytes())
+
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Disk cache for feature columns, keyed by (symbol, time period, last candle, content hash, columns).
+    - Features are stored as row-major float64 segments which are read memory-mapped, new bars are appended as a
+      segment of their own and the segments are merged once there are more than `_MAX_SEGMENTS`
+    - When the candles only gained new bars, the cached prefix is kept and the new bars are added with
+      `DataFeature.update` if every feature declares that it matches `add_feature`, otherwise everything is
+      recomputed, so the cached values never depend on the bars the cache was first filled with
+    - Segments and update states are written to new files, the metadata pointing to them is replaced in one step
+    - Entries are evicted least recently used once the cache grows beyond `max_bytes`
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_signature(pipeline: FeaturePipeline) -> str:
+        """Signature of the columns a pipeline adds, part of the cache key."""
+        return hashlib.blake2b(json.dumps(pipeline.get_columns()).encode(), digest_size=16).hexdigest()
+
+    def _get_stem(self, symbol: str, time_period: TimePeriod, signature: str) -> str:
+        """
+        Path of the `.json` metadata of an entry without extension.
+        Its `.bin` segments and `.pkl` update states are named by the stem and a unique suffix, see `_create_file`.
+        """
+        name = hashlib.blake2b(f"{symbol}|{time_period.name}|{signature}".encode(), digest_size=16).hexdigest()
+
+        return os.path.join(self._cache_dir, name)
+
+    @staticmethod
+    def _read_entry(meta_path: str) -> Optional[FeatureCacheEntry]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                return FeatureCacheEntry(**json.load(meta_file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _create_file(self, stem: str, suffix: str) -> IO[bytes]:
+        # unique names, writers of the same entry never share a file
+        return tempfile.NamedTemporaryFile(  # pylint: disable=consider-using-with
+            "wb", suffix=suffix, prefix=f"{os.path.basename(stem)}.", dir=self._cache_dir, delete=False
+        )
+
+    def _get_files(self, entry: FeatureCacheEntry) -> List[str]:
+        """Paths of the segments and states the entry points to."""
+        names = entry.segments + ([entry.states] if entry.states else [])
+
+        return [os.path.join(self._cache_dir, name) for name in names]
+
+    def _write_entry(self, stem: str, entry: FeatureCacheEntry, replaced_files: List[str]) -> None:
+        # the segments and states are written before, a reader never gets metadata pointing to missing files
+        with self._create_file(stem, ".json.tmp") as meta_file:
+            meta_file.write(json.dumps(asdict(entry)).encode())
+        os.replace(meta_file.name, f"{stem}.json")
+
+        for path in set(replaced_files) - set(self._get_files(entry)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _read_block(self, entry: FeatureCacheEntry) -> pd.DataFrame:
+        if not entry.columns:
+            return pd.DataFrame(index=pd.RangeIndex(entry.length))
+
+        segments = [
+            np.memmap(
+                os.path.join(self._cache_dir, name), dtype=np.float64, mode="r", shape=(length, len(entry.columns))
+            )
+            for name, length in zip(entry.segments, entry.segment_lengths)
+            if length
+        ]
+        block = segments[0] if len(segments) == 1 else np.concatenate(segments)
+
+        return pd.DataFrame(
+            {column: block[:, i].astype(dtype) for i, (column, dtype) in enumerate(zip(entry.columns, entry.dtypes))}
+        )
+
+    def _write_segment(self, stem: str, rows: np.ndarray) -> str:
+        """Write the rows to a new segment, returns its file name."""
+        with self._create_file(stem, ".bin") as block_file:
+            block_file.write(np.ascontiguousarray(rows, dtype=np.float64).tobytes())
+
+        return os.path.basename(block_file.name)
+
+    def _read_states(self, entry: FeatureCacheEntry) -> Optional[List[Any]]:
+        if not entry.states:
+            return None
+        with open(os.path.join(self._cache_dir, entry.states), "rb") as state_file:
+            return pickle.load(state_file)
+
+    def _write_states(self, stem: str, states: Optional[List[Any]]) -> str:
+        """Write the update states to a new file, returns its file name (empty without states)."""
+        if states is None:
+            return ""
+        with self._create_file(stem, ".pkl") as state_file:
+            pickle.dump(states, state_file)
+
+        return os.path.basename(state_file.name)
+
+    @staticmethod
+    def _can_extend(pipeline: FeaturePipeline) -> bool:
+        return all(node.feature.update_matches_add_feature() for node in pipeline.get_nodes())
+
+    def _init_states(self, pipeline: FeaturePipeline, data_frame: pd.DataFrame) -> Optional[List[Any]]:
+        if not self._can_extend(pipeline):
+            return None
+        try:
+            return [node.feature.init_state(data_frame) for node in pipeline.get_nodes()]
+        except (NotImplementedError, ValueError):
+            return None
+
+    @staticmethod
+    def _extend(
+        pipeline: FeaturePipeline, states: List[Any], new_bars: pd.DataFrame, columns: List[str]
+    ) -> pd.DataFrame:
+        rows = []
+        for bar in new_bars.to_dict("records"):
+            values: Dict[str, Any] = {}
+            for node, state in zip(pipeline.get_nodes(), states):
+                values.update(node.feature.update(state, bar))
+            rows.append(values)
+
+        return pd.DataFrame(rows, columns=columns).astype(np.float64)
+
+    def _load(
+        self, pipeline: FeaturePipeline, entry: FeatureCacheEntry, stem: str, data_frame: pd.DataFrame
+    ) -> Optional[pd.DataFrame]:
+        """Read the cached features and extend them by the new bars, None if that is not possible."""
+        cached = self._read_block(entry)
+        if entry.length == len(data_frame):
+            return cached
+
+        states = self._read_states(entry)
+        if states is None or not self._can_extend(pipeline):
+            return None
+
+        new_rows = self._extend(pipeline, states, data_frame.iloc[entry.length :], entry.columns)
+        if len(entry.segments) < _MAX_SEGMENTS:
+            entry.segments = entry.segments + [self._write_segment(stem, new_rows.to_numpy())]
+            entry.segment_lengths = entry.segment_lengths + [len(new_rows)]
+        else:
+            block = np.concatenate([cached.to_numpy(dtype=np.float64), new_rows.to_numpy()])
+            entry.segments, entry.segment_lengths = [self._write_segment(stem, block)], [len(block)]
+        entry.states = self._write_states(stem, states)
+
+        return pd.concat([cached, new_rows.astype(dict(zip(entry.columns, entry.dtypes)))], ignore_index=True)
+
+    def _compute(
+        self, pipeline: FeaturePipeline, entry: FeatureCacheEntry, stem: str, data_frame: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Compute all features and replace the cached block and states."""
+        result = pipeline.run(data_frame)
+        entry.columns = [column for column in pipeline.get_columns() if column in result and column not in data_frame]
+        computed = result[entry.columns].reset_index(drop=True)
+        entry.dtypes = [str(dtype) for dtype in computed.dtypes]
+
+        entry.segments = [self._write_segment(stem, computed.to_numpy(dtype=np.float64))]
+        entry.segment_lengths = [len(computed)]
+        entry.states = self._write_states(stem, self._init_states(pipeline, data_frame))
+
+        return computed
+
+    def get_features(
+        self, symbol: str, time_period: TimePeriod, data_frame: pd.DataFrame, features: List[DataFeature]
+    ) -> pd.DataFrame:
+        """Add the feature columns to a copy of the DataFrame, reading from and updating the cache."""
+        pipeline = FeaturePipeline(features)
+        signature = self.get_signature(pipeline)
+        stem = self._get_stem(symbol, time_period, signature)
+
+        dates = pd.to_datetime(data_frame["date"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        prices = {
+            column: data_frame[column].to_numpy(dtype=np.float64)
+            for column in _PRICE_COLUMNS
+            if column in data_frame.columns
+        }
+
+        entry = self._read_entry(f"{stem}.json")
+        replaced_files = [] if entry is None else self._get_files(entry)
+        cached = None
+        if (
+            entry is not None
+            and 0 < entry.length <= len(data_frame)
+            and entry.last_timestamp == dates[entry.length - 1]
+            and entry.content_hash == _hash_prices(dates, prices, entry.length)
+        ):
+            try:
+                cached = self._load(pipeline, entry, stem, data_frame)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                # replaced by a concurrent writer in the meantime
+                cached = None
+
+        if entry is None or cached is None:
+            entry = FeatureCacheEntry(symbol, time_period.name, signature, [], [], 0, 0, "", [], [], "")
+            cached = self._compute(pipeline, entry, stem, data_frame)
+
+        if entry.length != len(data_frame):
+            entry.length = len(data_frame)
+            entry.last_timestamp = int(dates[-1])
+            entry.content_hash = _hash_prices(dates, prices, entry.length)
+            self._write_entry(stem, entry, replaced_files)
+            self.evict(keep=f"{stem}.json")
+        else:
+            access_time = time.time_ns()
+            os.utime(f"{stem}.json", ns=(access_time, access_time))
+
+        cached.index = data_frame.index
+        return pd.concat([data_frame, cached.drop(columns=list(data_frame.columns), errors="ignore")], axis=1)
+
+    def get_size(self) -> int:
+        """Return the bytes held by the cache directory."""
+        return sum(entry.stat().st_size for entry in os.scandir(self._cache_dir) if entry.is_file())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Delete the least recently used entries until the cache fits into `max_bytes`.
+        Files no entry points to any more (left by concurrent writers of an entry) are deleted first.
+        """
+        entries = []
+        referenced = set()
+        for meta_entry in os.scandir(self._cache_dir):
+            if not meta_entry.name.endswith(".json"):
+                continue
+            entry = self._read_entry(meta_entry.path)
+            paths = [meta_entry.path] + ([] if entry is None else self._get_files(entry))
+            referenced.update(paths)
+            if meta_entry.path != keep:
+                entries.append((meta_entry.stat().st_mtime_ns, [path for path in paths if os.path.exists(path)]))
+
+        orphaned_before = time.time() - _ORPHAN_AGE
+        for file_entry in os.scandir(self._cache_dir):
+            if (
+                file_entry.is_file()
+                and file_entry.path not in referenced
+                and file_entry.stat().st_mtime < orphaned_before
+            ):
+                os.remove(file_entry.path)
+
+        size = self.get_size()
+        for _, paths in sorted(entries):
+            if size <= self._max_bytes:
+                break
+            for path in paths:
+                size -= os.path.getsize(path)
+                os.remove(path)
+
+    def clear(self) -> None:
+        """Delete all cached entries."""
+        for entry in os.scandir(self._cache_dir):
+            if entry.is_file():
+                os.remove(entry.path)
@@ -0,0 +1,151 @@
+import os
+from typing import List
+
+import pandas as pd
+from quant_core.enums.time_period import TimePeriod
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.features.candles.smoothed_heikin_ashi import DataFeatureSmoothedHeikinAshi
+from quant_core.features.feature import DataFeature
+from quant_core.features.feature_cache import _MAX_SEGMENTS, _ORPHAN_AGE, FeatureCache
+from quant_core.features.feature_pipeline import FeaturePipeline
+from quant_core.features.indicators.adaptive_super_trend import DataFeatureAdaptiveSuperTrend
+from quant_core.features.indicators.bollinger_bands import DataFeatureBollingerBands
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_core.features.performance.returns import DataFeatureReturns
+from quant_dev.builder import Builder
+
+
+def _get_features() -> List[DataFeature]:
+    return [DataFeatureSuperTrend(3.0, 10), DataFeatureSmoothedHeikinAshi(10), DataFeatureBollingerBands(20, 2)]
+
+
+class TestFeatureCache:
+    def test_hit_returns_the_computed_features(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1200, seed=3)
+        expected = FeaturePipeline(_get_features()).run(data_frame)
+
+        first = cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, _get_features())
+        second = cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, _get_features())
+
+        pd.testing.assert_frame_equal(first, expected[first.columns])
+        pd.testing.assert_frame_equal(second, first)
+        assert list(data_frame.columns) == ["date", "open", "high", "low", "close", "volume"]
+
+    def test_new_bars_extend_the_cached_prefix(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1300, seed=4)
+        expected = FeaturePipeline(_get_features()).run(data_frame)
+
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame.iloc[:1100], _get_features())
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame.iloc[:1250], _get_features())
+        result = cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, _get_features())
+
+        pd.testing.assert_frame_equal(result, expected[result.columns], rtol=1e-9, atol=1e-9)
+
+    def test_new_bars_are_appended_as_segments(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1300, seed=4)
+
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame.iloc[:1100], _get_features())
+        (first_segment,) = _get_segments(tmp_path)
+        written_at = os.stat(first_segment).st_mtime_ns
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, _get_features())
+
+        # the cached segment is kept as it is, only the new bars are written
+        assert first_segment in _get_segments(tmp_path)
+        assert len(_get_segments(tmp_path)) == 2
+        assert os.stat(first_segment).st_mtime_ns == written_at
+
+    def test_segments_are_merged(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1100 + 5 * _MAX_SEGMENTS, seed=9)
+
+        for length in range(1100, len(data_frame) + 1, 5):
+            result = cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame.iloc[:length], _get_features())
+
+        assert len(_get_segments(tmp_path)) == 1
+        expected = FeaturePipeline(_get_features()).run(data_frame)
+        pd.testing.assert_frame_equal(result, expected[result.columns], rtol=1e-9, atol=1e-9)
+
+    def test_changed_history_is_recomputed(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1200, seed=5)
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, _get_features())
+
+        changed = data_frame.copy()
+        changed.loc[10, "close"] += 1.0
+        result = cache.get_features("EURUSD", TimePeriod.HOUR_1, changed, _get_features())
+
+        pd.testing.assert_frame_equal(result, FeaturePipeline(_get_features()).run(changed)[result.columns])
+
+    def test_features_without_update_are_recomputed_on_new_bars(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        features: List[DataFeature] = [DataFeatureReturns(TradeDirection.LONG, 5)]
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1200, seed=6)
+
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame.iloc[:1100], features)
+        result = cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, features)
+
+        pd.testing.assert_frame_equal(result, FeaturePipeline(features).run(data_frame)[result.columns])
+
+    def test_features_whose_update_differs_are_recomputed_on_new_bars(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        features: List[DataFeature] = [DataFeatureAdaptiveSuperTrend(atr_period=10, max_data=1000)]
+        data_frame = Builder.build_random_walk_chart_data_frame(length=3000, seed=8)
+
+        cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame.iloc[:1100], features)
+        result = cache.get_features("EURUSD", TimePeriod.HOUR_1, data_frame, features)
+
+        pd.testing.assert_frame_equal(result, FeaturePipeline(features).run(data_frame)[result.columns])
+        assert not [name for name in os.listdir(tmp_path) if name.endswith((".pkl", ".tmp"))]
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path: str) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1000, seed=7)
+        features: List[DataFeature] = [DataFeatureBollingerBands(20, 2)]
+
+        cache = FeatureCache(str(tmp_path))
+        cache.get_features("A", TimePeriod.HOUR_1, data_frame, features)
+        entry_size = cache.get_size()
+
+        cache = FeatureCache(str(tmp_path), max_bytes=2 * entry_size)
+        cache.get_features("B", TimePeriod.HOUR_1, data_frame, features)
+        cache.get_features("A", TimePeriod.HOUR_1, data_frame, features)
+        cache.get_features("C", TimePeriod.HOUR_1, data_frame, features)
+
+        assert cache.get_size() <= 2 * entry_size
+        assert len([name for name in os.listdir(tmp_path) if name.endswith(".json")]) == 2
+        assert not os.path.exists(cache._get_stem("B", TimePeriod.HOUR_1, _signature(features)) + ".json")
+
+    def test_files_of_no_entry_are_evicted(self, tmp_path: str) -> None:
+        cache = FeatureCache(str(tmp_path))
+        cache.get_features(
+            "EURUSD",
+            TimePeriod.HOUR_1,
+            Builder.build_random_walk_chart_data_frame(length=1000, seed=7),
+            _get_features(),
+        )
+        orphan, recent = os.path.join(tmp_path, "orphan.bin"), os.path.join(tmp_path, "recent.bin")
+        for path in (orphan, recent):
+            with open(path, "wb") as orphan_file:
+                orphan_file.write(b"0" * 8)
+        os.utime(orphan, (0, os.stat(orphan).st_mtime - 2 * _ORPHAN_AGE))
+
+        cache.evict()
+
+        assert not os.path.exists(orphan)
+        assert os.path.exists(recent)
+        assert len(_get_segments(tmp_path)) == 2
+
+    def test_signature_depends_on_the_columns(self) -> None:
+        assert FeatureCache.get_signature(FeaturePipeline([DataFeatureBollingerBands(20, 2)])) != (
+            FeatureCache.get_signature(FeaturePipeline([DataFeatureBollingerBands(20, 1)]))
+        )
+
+
+def _signature(features: List[DataFeature]) -> str:
+    return FeatureCache.get_signature(FeaturePipeline(features))
+
+
+def _get_segments(cache_dir: str) -> List[str]:
+    return sorted(os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".bin"))
@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from quant_core.features.feature import DataFeature
+
+
+@dataclass
+class FeatureNode:
+    """A feature of the pipeline together with the nodes it depends on."""
+
+    key: Tuple[str, ...]
+    feature: DataFeature
+    dependencies: List[Tuple[str, ...]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        """Readable name of the node, used for the timings."""
+        return f"{self.feature.__class__.__name__}[{', '.join(self.key[1:])}]"
+
+
+class FeaturePipeline:
+    """
+    Computes a list of features as a dependency DAG.
+    - Features with the same class and columns are merged into one node, so shared intermediates
+      (ATR, Bollinger Bands, Heikin Ashi, ...) are computed once and kept in a column store
+    - Every node only sees the price columns and the columns of its dependencies, independent nodes run in parallel
+    - The wall-clock time per node of the last run is kept in `timings`
+    """
+
+    def __init__(self, features: List[DataFeature], max_workers: Optional[int] = None) -> None:
+        self._max_workers = max_workers
+        self._nodes: Dict[Tuple[str, ...], FeatureNode] = {}
+        self._order: List[Tuple[str, ...]] = []
+        self.timings: Dict[str, float] = {}
+
+        for feature in features:
+            self._add_node(feature, visiting=set())
+
+    @staticmethod
+    def _get_key(feature: DataFeature) -> Tuple[str, ...]:
+        return (feature.__class__.__name__, *feature.get_columns())
+
+    def _add_node(self, feature: DataFeature, visiting: Set[Tuple[str, ...]]) -> Tuple[str, ...]:
+        key = self._get_key(feature)
+        if key in self._nodes:
+            return key
+        if key in visiting:
+            raise ValueError(f"Cyclic feature dependency at {feature.__class__.__name__}.")
+
+        visiting.add(key)
+        dependencies = []
+        for dependency in feature.get_dependencies():
+            dependency_key = self._add_node(dependency, visiting)
+            if dependency_key not in dependencies:
+                dependencies.append(dependency_key)
+        visiting.discard(key)
+
+        self._nodes[key] = FeatureNode(key=key, feature=feature, dependencies=dependencies)
+        self._order.append(key)
+
+        return key
+
+    def get_nodes(self) -> List[FeatureNode]:
+        """Return the nodes in topological order."""
+        return [self._nodes[key] for key in self._order]
+
+    def get_columns(self) -> List[str]:
+        """Return all columns the pipeline adds, intermediates included."""
+        return [column for node in self.get_nodes() for column in node.feature.get_columns()]
+
+    def _get_ancestors(self, key: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+        ancestors: List[Tuple[str, ...]] = []
+        stack = list(self._nodes[key].dependencies)
+        while stack:
+            dependency_key = stack.pop()
+            if dependency_key not in ancestors:
+                ancestors.append(dependency_key)
+                stack.extend(self._nodes[dependency_key].dependencies)
+
+        return ancestors
+
+    def _run_node(
+        self, key: Tuple[str, ...], data_frame: pd.DataFrame, column_store: Dict[str, pd.Series]
+    ) -> Tuple[Dict[str, pd.Series], float]:
+        node = self._nodes[key]
+        start_time = time.perf_counter()
+
+        node_frame = data_frame.copy(deep=False)
+        for ancestor_key in self._get_ancestors(key):
+            for column in self._nodes[ancestor_key].feature.get_columns():
+                if column in column_store:
+                    node_frame[column] = column_store[column]
+
+        known_columns = set(node_frame.columns)
+        node_frame = node.feature.add_feature(node_frame)
+        new_columns = {column: node_frame[column] for column in node_frame.columns if column not in known_columns}
+
+        return new_columns, time.perf_counter() - start_time
+
+    def run(self, data_frame: pd.DataFrame) -> pd.DataFrame:
+        """Add the columns of all features to a copy of the DataFrame."""
+        column_store: Dict[str, pd.Series] = {}
+        timings: Dict[str, float] = {}
+        pending = {key: set(self._nodes[key].dependencies) for key in self._order}
+        running: Dict[Future, Tuple[str, ...]] = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while pending or running:
+                ready = [key for key in self._order if key in pending and not pending[key]]
+                for key in ready:
+                    del pending[key]
+                    running[executor.submit(self._run_node, key, data_frame, dict(column_store))] = key
+
+                if not running:
+                    raise ValueError("Feature dependencies can not be resolved.")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    new_columns, seconds = future.result()
+                    column_store.update(new_columns)
+                    timings[self._nodes[key].name] = seconds
+                    for dependencies in pending.values():
+                        dependencies.discard(key)
+
+        self.timings = timings
+        new_columns = {
+            column: column_store[column]
+            for column in self.get_columns()
+            if column in column_store and column not in data_frame.columns
+        }
+
+        return pd.concat([data_frame, pd.DataFrame(new_columns, index=data_frame.index)], axis=1)
@@ -0,0 +1,79 @@
+from typing import List
+
+import pandas as pd
+import pytest
+from quant_core.features.candles.heikin_ashi import DataFeatureHeikinAshi
+from quant_core.features.candles.smoothed_heikin_ashi import DataFeatureSmoothedHeikinAshi
+from quant_core.features.feature import DataFeature
+from quant_core.features.feature_pipeline import FeaturePipeline
+from quant_core.features.indicators.adaptive_super_trend import DataFeatureAdaptiveSuperTrend
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.bollinger_bands import DataFeatureBollingerBands
+from quant_core.features.indicators.squeeze_momentum import DataFeatureSqueezeMomentum
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_dev.builder import Builder
+
+
+def _get_features() -> List[DataFeature]:
+    return [
+        DataFeatureSuperTrend(3.0, 10),
+        DataFeatureAdaptiveSuperTrend(atr_period=10, max_data=500),
+        DataFeatureSqueezeMomentum(20, 2, 20, 1, 20),
+        DataFeatureBollingerBands(20, 2),
+        DataFeatureSmoothedHeikinAshi(10),
+    ]
+
+
+class _CyclicFeature(DataFeatureHeikinAshi):
+    def get_dependencies(self) -> List[DataFeature]:
+        return [_CyclicFeature()]
+
+
+class TestFeaturePipeline:
+    def test_shared_intermediates_are_single_nodes(self) -> None:
+        pipeline = FeaturePipeline(_get_features())
+        node_names = [node.name for node in pipeline.get_nodes()]
+
+        assert len(node_names) == len(set(node_names)) == 8
+        assert node_names.index("DataFeatureAverageTrueRange[atr_10]") < node_names.index(
+            "DataFeatureSuperTrend[super_trend_3.0_10, st_direction_3.0_10]"
+        )
+
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_run_matches_sequential_add_feature(self, max_workers: int) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1500, seed=5)
+
+        expected = data_frame.copy()
+        for feature in _get_features():
+            expected = feature.add_feature(expected)
+
+        pipeline = FeaturePipeline(_get_features(), max_workers=max_workers)
+        result = pipeline.run(data_frame)
+
+        assert list(data_frame.columns) == ["date", "open", "high", "low", "close", "volume"]
+        assert set(result.columns) == set(expected.columns)
+        pd.testing.assert_frame_equal(result[expected.columns], expected)
+        assert set(pipeline.timings) == {node.name for node in pipeline.get_nodes()}
+
+    def test_existing_columns_are_reused(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1000, seed=5)
+        data_frame = DataFeatureAverageTrueRange(10).add_feature(data_frame)
+
+        result = FeaturePipeline([DataFeatureSuperTrend(3.0, 10)]).run(data_frame)
+
+        assert list(result.columns).count("atr_10") == 1
+        pd.testing.assert_series_equal(result["atr_10"], data_frame["atr_10"])
+
+    @pytest.mark.parametrize("recursive_open", [False, True])
+    def test_existing_heikin_ashi_candles_are_smoothed(self, recursive_open: bool) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1000, seed=6)
+        feature = DataFeatureSmoothedHeikinAshi(10, recursive_open=recursive_open)
+
+        expected = feature.add_feature(data_frame.copy())
+        result = feature.add_feature(DataFeatureHeikinAshi(recursive_open).add_feature(data_frame.copy()))
+
+        pd.testing.assert_frame_equal(result[expected.columns], expected, rtol=1e-12, atol=1e-12)
+
+    def test_cyclic_dependencies(self) -> None:
+        with pytest.raises(ValueError):
+            FeaturePipeline([_CyclicFeature()])
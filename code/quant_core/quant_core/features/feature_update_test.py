@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.features.candles.heikin_ashi import DataFeatureHeikinAshi
+from quant_core.features.candles.smoothed_heikin_ashi import DataFeatureSmoothedHeikinAshi
+from quant_core.features.feature import DataFeature
+from quant_core.features.indicators.adaptive_super_trend import DataFeatureAdaptiveSuperTrend
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.bollinger_bands import DataFeatureBollingerBands
+from quant_core.features.indicators.keltner_channel import DataFeatureKeltnerChannel
+from quant_core.features.indicators.squeeze_momentum import DataFeatureSqueezeMomentum
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_dev.builder import Builder
+
+_HISTORY_LENGTH = 1500
+_STREAM_LENGTH = 300
+
+
+def _stream(feature: DataFeature, data_frame: pd.DataFrame) -> pd.DataFrame:
+    state = feature.init_state(data_frame.iloc[:_HISTORY_LENGTH].reset_index(drop=True))
+    rows = [feature.update(state, bar) for bar in data_frame.iloc[_HISTORY_LENGTH:].to_dict("records")]
+
+    return pd.DataFrame(rows, columns=feature.get_columns())
+
+
+class TestDataFeatureUpdate:
+    @pytest.mark.parametrize(
+        "feature",
+        [
+            DataFeatureAverageTrueRange(14),
+            DataFeatureSuperTrend(3.0, 10),
+            DataFeatureHeikinAshi(),
+            DataFeatureHeikinAshi(recursive_open=True),
+            DataFeatureSmoothedHeikinAshi(10),
+            DataFeatureSmoothedHeikinAshi(10, recursive_open=True),
+        ],
+    )
+    def test_update_matches_add_feature_exactly(self, feature: DataFeature) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=_HISTORY_LENGTH + _STREAM_LENGTH, seed=7)
+
+        expected = feature.add_feature(data_frame.copy())[feature.get_columns()].iloc[_HISTORY_LENGTH:]
+        result = _stream(feature, data_frame)
+
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_dtype=False, rtol=0, atol=0)
+
+    @pytest.mark.parametrize(
+        "feature",
+        [
+            DataFeatureBollingerBands(20, 2),
+            DataFeatureKeltnerChannel(20, 2),
+            DataFeatureSqueezeMomentum(20, 2, 10, 1, 20),
+        ],
+    )
+    def test_update_matches_add_feature_rolling(self, feature: DataFeature) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=_HISTORY_LENGTH + _STREAM_LENGTH, seed=11)
+
+        expected = feature.add_feature(data_frame.copy())[feature.get_columns()].iloc[_HISTORY_LENGTH:]
+        result = _stream(feature, data_frame)
+
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_dtype=False, rtol=1e-9, atol=1e-9)
+
+    def test_adaptive_super_trend_with_frozen_clusters(self) -> None:
+        feature = DataFeatureAdaptiveSuperTrend(atr_period=10, max_data=1000)
+        data_frame = Builder.build_random_walk_chart_data_frame(length=_HISTORY_LENGTH + _STREAM_LENGTH, seed=3)
+
+        state = feature.init_state(data_frame.iloc[:_HISTORY_LENGTH])
+        result = _stream(feature, data_frame)
+
+        # the reference run keeps the clustering of the history and only extends the final SuperTrend pass
+        history = feature.add_feature(data_frame.iloc[:_HISTORY_LENGTH].copy())
+        assert history[feature.get_columns()[2]].iloc[-1] == state.chosen_factor
+        assert (result[feature.get_columns()[2]] == state.chosen_factor).all()
+        assert result[feature.get_columns()[1]].isin([0, 1]).all()
+        assert not result[feature.get_columns()[0]].isna().any()
+
+    def test_update_not_supported(self) -> None:
+        class _StaticFeature(DataFeatureHeikinAshi):
+            init_state = DataFeature.init_state
+            update = DataFeature.update
+
+        with pytest.raises(NotImplementedError):
+            _StaticFeature().init_state(Builder.build_random_walk_chart_data_frame(length=10, seed=1))
+
+        with pytest.raises(NotImplementedError):
+            _StaticFeature().update(None, {"open": np.nan})
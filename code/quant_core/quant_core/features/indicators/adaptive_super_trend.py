@@ -1,13 +1,36 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from quant_core.features.feature import DataFeature
-from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.average_true_range import AverageTrueRangeState, DataFeatureAverageTrueRange
+from quant_core.features.kernels.adaptive_super_trend_kernel import (
+    adaptive_super_trend,
+    adaptive_super_trend_step,
+    adaptive_super_trend_with_bands,
+    factor_performances,
+)
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
 from sklearn.cluster import KMeans
 
 
+@dataclass
+class AdaptiveSuperTrendState:  # pylint: disable=too-many-instance-attributes
+    """Incremental state of the Adaptive SuperTrend, the clustering is frozen at `init_state`."""
+
+    atr: AverageTrueRangeState
+    chosen_factor: float
+    perf_idx: float
+    worst_center: float
+    avg_center: float
+    best_center: float
+    upper: float
+    lower: float
+    direction: int
+    perf_ama: float
+
+
 class DataFeatureAdaptiveSuperTrend(DataFeature):  # pylint: disable=too-many-instance-attributes
     """Data Feature for Adaptive SuperTrend."""
 
@@ -57,9 +80,10 @@ class DataFeatureAdaptiveSuperTrend(DataFeature):  # pylint: disable=too-many-in
             hv_new_column,
         ]
 
-    def add_feature(  # pylint: disable=too-many-statements,too-many-branches,too-many-locals
-        self, data_frame: pd.DataFrame
-    ) -> pd.DataFrame:
+    def get_dependencies(self) -> List[DataFeature]:
+        return [DataFeatureAverageTrueRange(self._atr_period)]
+
+    def add_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:  # pylint: disable=too-many-locals
         (
             adapt_super_trend_column,
             adapt_direction_column,
@@ -84,17 +108,113 @@ class DataFeatureAdaptiveSuperTrend(DataFeature):  # pylint: disable=too-many-in
         check_df_sorted(data_frame=data_frame)
         check_enough_rows(data_frame=data_frame)
 
-        df = data_frame.copy()
+        # 1) ATR Calculation (Wilder), reused if the column is already present
+        close = data_frame["close"].to_numpy(dtype=np.float64)
+        hl2 = 0.5 * (data_frame["high"].to_numpy(dtype=np.float64) + data_frame["low"].to_numpy(dtype=np.float64))
+        atr = self._get_atr(data_frame)
+
+        fit = self._fit(close, hl2, atr)
+        if fit is None:
+            return data_frame
+        chosen_factor, perf_idx, worst_center, avg_center, best_center = fit
+
+        # 6) Final pass => chosen_factor supertrend + AMA
+        st_arr, os_arr, _ = adaptive_super_trend(close=close, hl2=hl2, atr=atr, factor=chosen_factor, perf_idx=perf_idx)
+
+        # 7) Save to DataFrame
+        data_frame[adapt_super_trend_column] = st_arr
+        data_frame[adapt_direction_column] = os_arr
+        data_frame[chosen_factor_column] = chosen_factor
+        data_frame[lv_new_column] = worst_center
+        data_frame[mv_new_column] = avg_center
+        data_frame[hv_new_column] = best_center
 
-        # 1) ATR Calculation
-        # Using your existing "DataFeatureAverageTrueRange" => just be mindful that
-        # it's likely an EMA, not Wilder's. If you want to match Pine exactly, implement Wilder's.
-        atr_feat = DataFeatureAverageTrueRange(self._atr_period)
-        atr_name = atr_feat.get_columns()[0]
-        df = atr_feat.add_feature(df)
+        return data_frame
 
-        df["_hl2_"] = 0.5 * (df["high"] + df["low"])
+    def init_state(self, data_frame: pd.DataFrame) -> AdaptiveSuperTrendState:
+        """
+        Fit the factor clusters on the history and seed the SuperTrend pass with its last values.
+        - The chosen factor, perf_idx and centers stay fixed until the state is rebuilt
+        """
+        close = data_frame["close"].to_numpy(dtype=np.float64)
+        hl2 = 0.5 * (data_frame["high"].to_numpy(dtype=np.float64) + data_frame["low"].to_numpy(dtype=np.float64))
+        atr = self._get_atr(data_frame)
+
+        fit = self._fit(close, hl2, atr)
+        if fit is None:
+            raise ValueError("No SuperTrend factors between min_factor and max_factor.")
+        chosen_factor, perf_idx, worst_center, avg_center, best_center = fit
+
+        _, os_arr, perf_ama, upper, lower = adaptive_super_trend_with_bands(
+            close=close, hl2=hl2, atr=atr, factor=chosen_factor, perf_idx=perf_idx
+        )
+
+        return AdaptiveSuperTrendState(
+            atr=AverageTrueRangeState(prev_close=float(close[-1]), atr=float(atr[-1])),
+            chosen_factor=float(chosen_factor),
+            perf_idx=float(perf_idx),
+            worst_center=float(worst_center),
+            avg_center=float(avg_center),
+            best_center=float(best_center),
+            upper=float(upper[-1]),
+            lower=float(lower[-1]),
+            direction=int(os_arr[-1]),
+            perf_ama=float(perf_ama[-1]),
+        )
 
+    def update(self, state: AdaptiveSuperTrendState, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        (
+            adapt_super_trend_column,
+            adapt_direction_column,
+            chosen_factor_column,
+            lv_new_column,
+            mv_new_column,
+            hv_new_column,
+        ) = self.get_columns()
+        atr_feature = DataFeatureAverageTrueRange(self._atr_period)
+
+        prev_close = state.atr.prev_close
+        atr = atr_feature.update(state.atr, new_bar)[atr_feature.get_columns()[0]]
+
+        state.upper, state.lower, state.direction, supertrend, state.perf_ama = adaptive_super_trend_step(
+            close=float(new_bar["close"]),
+            prev_close=prev_close,
+            hl2=0.5 * (float(new_bar["high"]) + float(new_bar["low"])),
+            atr=atr,
+            factor=state.chosen_factor,
+            perf_idx=state.perf_idx,
+            prev_upper=state.upper,
+            prev_lower=state.lower,
+            prev_os=state.direction,
+            prev_perf_ama=state.perf_ama,
+        )
+
+        return {
+            adapt_super_trend_column: supertrend,
+            adapt_direction_column: state.direction,
+            chosen_factor_column: state.chosen_factor,
+            lv_new_column: state.worst_center,
+            mv_new_column: state.avg_center,
+            hv_new_column: state.best_center,
+        }
+
+    def _get_atr(self, data_frame: pd.DataFrame) -> np.ndarray:
+        atr_feature = DataFeatureAverageTrueRange(self._atr_period)
+        atr_name = atr_feature.get_columns()[0]
+        if atr_name not in data_frame:
+            # only the needed columns are copied, the ATR column is not added to the caller's frame
+            atr_frame = pd.DataFrame({column: data_frame[column] for column in ("date", "high", "low", "close")})
+            data_frame = atr_feature.add_feature(atr_frame)
+
+        return data_frame[atr_name].to_numpy(dtype=np.float64)
+
+    def _fit(  # pylint: disable=too-many-locals
+        self, close: np.ndarray, hl2: np.ndarray, atr: np.ndarray
+    ) -> Optional[Tuple[float, float, float, float, float]]:
+        """
+        Pick the factor from the clustered SuperTrend performances.
+        - Returns (chosen_factor, perf_idx, worst_center, avg_center, best_center), None without factors
+        """
         factor_values = []
         v = self._min_factor
         while v <= self._max_factor + 1e-9:
@@ -102,91 +222,23 @@ class DataFeatureAdaptiveSuperTrend(DataFeature):  # pylint: disable=too-many-in
             v += self._step
 
         if not factor_values:
-            return data_frame
-
-        df_factors = df.tail(self._max_data).copy()
-        df_factors.dropna(subset=[atr_name, "_hl2_", "close"], inplace=True)
-
-        class _SuperTrendState:  # pylint: disable=too-few-public-methods
-            __slots__ = ("upper", "lower", "trend", "output", "perf")
+            return None
 
-            def __init__(self):
-                self.upper = np.nan
-                self.lower = np.nan
-                self.trend = 0
-                self.output = np.nan
-                self.perf = 0.0
-
-        st_list = [_SuperTrendState() for _ in factor_values]
+        start = max(len(close) - self._max_data, 0)
+        complete = ~(np.isnan(atr[start:]) | np.isnan(hl2[start:]) | np.isnan(close[start:]))
 
         alpha = 2.0 / (self._perf_alpha + 1.0)
 
-        for i in range(len(df_factors)):
-            c = df_factors["close"].iloc[i]
-            c1 = df_factors["close"].iloc[i - 1] if i > 0 else c
-            hl2_ = df_factors["_hl2_"].iloc[i]
-            atr_ = df_factors[atr_name].iloc[i]
-
-            if np.isnan(atr_):
-                continue
-
-            for st_state, factor in zip(st_list, factor_values):
-                # up/dn for this bar
-                up_ = hl2_ + factor * atr_
-                dn_ = hl2_ - factor * atr_
-
-                if i == 0:
-                    # init
-                    st_state.upper = up_
-                    st_state.lower = dn_
-                    # trend
-                    if c > st_state.upper:
-                        st_state.trend = 1
-                    elif c < st_state.lower:
-                        st_state.trend = 0
-                    # output
-                    st_state.output = st_state.lower if st_state.trend == 1 else st_state.upper
-                    # performance init
-                    st_state.perf = 0.0
-                else:
-                    # *Compare the PREVIOUS bar's close to the PREVIOUS bar's upper/lower*
-                    prev_close = c1
-                    prev_upper = st_state.upper
-                    prev_lower = st_state.lower
-                    prev_output = st_state.output
-
-                    # Update upper
-                    if prev_close < prev_upper:
-                        st_state.upper = min(up_, prev_upper)
-                    else:
-                        st_state.upper = up_
-                    # Update lower
-                    if prev_close > prev_lower:
-                        st_state.lower = max(dn_, prev_lower)
-                    else:
-                        st_state.lower = dn_
-
-                    # Update trend => using the CURRENT bar's close
-                    # Pine: close > upper => 1, close < lower => 0
-                    if c > st_state.upper:
-                        st_state.trend = 1
-                    elif c < st_state.lower:
-                        st_state.trend = 0
-                    # else remain the same
-
-                    # Perf update => diff = sign(close[1] - output_previous)
-                    diff = np.sign(c1 - prev_output)
-                    st_state.perf += alpha * ((c - c1) * diff - st_state.perf)
-
-                    # Final output => if trend=1 => lower, else upper
-                    if st_state.trend == 1:
-                        st_state.output = st_state.lower
-                    else:
-                        st_state.output = st_state.upper
+        # 2) + 3) SuperTrend performance of all factors, evolved together as a (bars x factors) matrix
+        final_perfs = factor_performances(
+            close=close[start:][complete],
+            hl2=hl2[start:][complete],
+            atr=atr[start:][complete],
+            factors=np.array(factor_values),
+            alpha=alpha,
+        ).reshape(-1, 1)
 
         # 4) K-Means => cluster final performances
-        final_perfs = np.array([s.perf for s in st_list]).reshape(-1, 1)
-
         km = KMeans(n_clusters=3, n_init=10, max_iter=self._max_iter, random_state=42)
         labels = km.fit_predict(final_perfs)
         centroids = km.cluster_centers_.flatten()
@@ -231,8 +283,7 @@ class DataFeatureAdaptiveSuperTrend(DataFeature):  # pylint: disable=too-many-in
         # Pine does:
         #  perf_idx = max(avgPerf,0) / den
         #  den=ta.ema(abs(close-close[1]),perfAlpha)
-        df["_abs_chg_"] = (df["close"] - df["close"].shift(1)).abs()
-        den_series = df["_abs_chg_"].ewm(span=int(self._perf_alpha), min_periods=1).mean()
+        den_series = pd.Series(close).diff().abs().ewm(span=int(self._perf_alpha), min_periods=1).mean()
         cluster_perf_vals = final_perfs[factor_ranks == chosen_rank]
         avg_perf = cluster_perf_vals.mean() if len(cluster_perf_vals) else 0.0
         avg_perf = max(avg_perf, 0.0)
@@ -242,93 +293,7 @@ class DataFeatureAdaptiveSuperTrend(DataFeature):  # pylint: disable=too-many-in
             final_den = 1e-9
         perf_idx = avg_perf / final_den
 
-        # 6) Final pass => chosen_factor supertrend + AMA
-        n = len(df)
-        st_arr = np.full(n, np.nan)
-        os_arr = np.full(n, 0, dtype=int)
-        upper = np.full(n, np.nan)
-        lower = np.full(n, np.nan)
-        perf_ama = np.full(n, np.nan)
-
-        for i in range(n):
-            c = df["close"].iloc[i]
-            c1 = df["close"].iloc[i - 1] if i > 0 else c
-            hl2_ = df["_hl2_"].iloc[i]
-            atr_ = df[atr_name].iloc[i]
-
-            if np.isnan(hl2_) or np.isnan(atr_):
-                continue
-
-            up_ = hl2_ + chosen_factor * atr_
-            dn_ = hl2_ - chosen_factor * atr_
-
-            if i == 0:
-                upper[i] = up_
-                lower[i] = dn_
-                # os => 1 if c>up else 0 if c<dn else remain
-                if c > up_:
-                    os_arr[i] = 1
-                elif c < dn_:
-                    os_arr[i] = 0
-                st_arr[i] = lower[i] if os_arr[i] == 1 else upper[i]
-                perf_ama[i] = st_arr[i]
-            else:
-                prev_close = c1
-                upper_prev = upper[i - 1]
-                lower_prev = lower[i - 1]
-                os_prev = os_arr[i - 1]
-
-                # upper[i]
-                if prev_close < upper_prev:
-                    upper[i] = min(up_, upper_prev)
-                else:
-                    upper[i] = up_
-
-                # lower[i]
-                if prev_close > lower_prev:
-                    lower[i] = max(dn_, lower_prev)
-                else:
-                    lower[i] = dn_
-
-                # os => 1 if c>upper[i], 0 if c<lower[i], else old
-                if c > upper[i]:
-                    os_arr[i] = 1
-                elif c < lower[i]:
-                    os_arr[i] = 0
-                else:
-                    os_arr[i] = os_prev
-
-                st_arr[i] = lower[i] if os_arr[i] == 1 else upper[i]
-
-                # AMA => perf_ama[i] = perf_ama[i-1] + perf_idx*(st_arr[i] - perf_ama[i-1])
-                perf_ama[i] = perf_ama[i - 1] + perf_idx * (st_arr[i] - perf_ama[i - 1])
-
-        # 7) Save to DataFrame
-        df[adapt_super_trend_column] = st_arr
-        df[adapt_direction_column] = os_arr
-        df[chosen_factor_column] = chosen_factor
-        df[lv_new_column] = worst_center
-        df[mv_new_column] = avg_center
-        df[hv_new_column] = best_center
-
-        # Cleanup
-        df.drop(columns=["_hl2_", "_abs_chg_", atr_name], inplace=True, errors="ignore")
-
-        # Join back to original data_frame
-        data_frame = data_frame.join(
-            df[
-                [
-                    adapt_super_trend_column,
-                    adapt_direction_column,
-                    chosen_factor_column,
-                    lv_new_column,
-                    mv_new_column,
-                    hv_new_column,
-                ]
-            ],
-            how="left",
-        )
-        return data_frame
+        return chosen_factor, perf_idx, worst_center, avg_center, best_center
 
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         indicator_column_name = self.get_columns()[0]
@@ -1,10 +1,19 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
 
 import numpy as np
 import pandas as pd
 from quant_core.features.feature import DataFeature
+from quant_core.features.kernels.average_true_range_kernel import average_true_range
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
-from ta.volatility import AverageTrueRange
+
+
+@dataclass
+class AverageTrueRangeState:
+    """Incremental state of the Average True Range."""
+
+    prev_close: float
+    atr: float
 
 
 class DataFeatureAverageTrueRange(DataFeature):
@@ -24,14 +33,38 @@ class DataFeatureAverageTrueRange(DataFeature):
         check_df_sorted(data_frame=data_frame)
         check_enough_rows(data_frame=data_frame)
 
-        data_frame[indicator_column_name] = AverageTrueRange(
-            high=data_frame["high"], low=data_frame["low"], close=data_frame["close"], window=self._atr_period
-        ).average_true_range()
+        atr = average_true_range(
+            high=data_frame["high"].to_numpy(),
+            low=data_frame["low"].to_numpy(),
+            close=data_frame["close"].to_numpy(),
+            window=self._atr_period,
+        )
+        atr[: self._atr_period] = np.nan
 
-        data_frame[indicator_column_name][: self._atr_period] = np.nan
+        data_frame[indicator_column_name] = atr
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> AverageTrueRangeState:
+        indicator_column_name = self.get_columns()[0]
+        history = self.add_feature(data_frame[["date", "high", "low", "close"]].copy())
+
+        return AverageTrueRangeState(
+            prev_close=float(history["close"].iloc[-1]), atr=float(history[indicator_column_name].iloc[-1])
+        )
+
+    def update(self, state: AverageTrueRangeState, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        high, low, close = float(new_bar["high"]), float(new_bar["low"]), float(new_bar["close"])
+
+        true_range = max(high - low, abs(high - state.prev_close), abs(low - state.prev_close))
+        state.atr = (state.atr * (self._atr_period - 1) + true_range) / float(self._atr_period)
+        state.prev_close = close
+
+        return {self.get_columns()[0]: state.atr}
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         indicator_column_name = self.get_columns()[0]
         normalized_column_name = self.get_feature_columns()[0]
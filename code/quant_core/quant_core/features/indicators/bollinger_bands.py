@@ -1,8 +1,9 @@
-from typing import List
+from typing import Any, Dict, List, Mapping
 
 import pandas as pd
 from quant_core.features.feature import DataFeature
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
+from quant_core.utils.rolling_utils import RollingWindow
 from ta.volatility import BollingerBands
 
 
@@ -37,6 +38,28 @@ class DataFeatureBollingerBands(DataFeature):
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> RollingWindow:
+        check_df_sorted(data_frame=data_frame)
+        check_enough_rows(data_frame=data_frame)
+
+        return RollingWindow(self._bb_length, data_frame["close"].iloc[-self._bb_length :].tolist())
+
+    def update(self, state: RollingWindow, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        bb_mavg_column, bb_upper_column, bb_lower_column = self.get_columns()
+        state.push(float(new_bar["close"]))
+
+        mavg = state.mean()
+        mstd = state.std(ddof=0)
+
+        return {
+            bb_mavg_column: mavg,
+            bb_upper_column: mavg + self._bb_mult_factor * mstd,
+            bb_lower_column: mavg - self._bb_mult_factor * mstd,
+        }
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         bb_mavg, bb_upper, bb_lower = self.get_columns()
         bb_mavg_normalized, bb_upper_normalized, bb_lower_normalized = self.get_feature_columns()
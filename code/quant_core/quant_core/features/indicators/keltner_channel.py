@@ -1,11 +1,22 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
 
 import pandas as pd
 from quant_core.features.feature import DataFeature
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
+from quant_core.utils.rolling_utils import RollingWindow
 from ta.volatility import KeltnerChannel
 
 
+@dataclass
+class KeltnerChannelState:
+    """Incremental state of the Keltner Channel (rolling means of the typical, high and low prices)."""
+
+    typical_price: RollingWindow
+    high_price: RollingWindow
+    low_price: RollingWindow
+
+
 class DataFeatureKeltnerChannel(DataFeature):
     """Data Feature for the Keltner Channel."""
 
@@ -43,6 +54,36 @@ class DataFeatureKeltnerChannel(DataFeature):
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> KeltnerChannelState:
+        check_df_sorted(data_frame=data_frame)
+        check_enough_rows(data_frame=data_frame)
+
+        tail = data_frame.iloc[-self._kc_length :]
+        high, low, close = tail["high"], tail["low"], tail["close"]
+
+        return KeltnerChannelState(
+            typical_price=RollingWindow(self._kc_length, ((high + low + close) / 3.0).tolist()),
+            high_price=RollingWindow(self._kc_length, (((4 * high) - (2 * low) + close) / 3.0).tolist()),
+            low_price=RollingWindow(self._kc_length, (((-2 * high) + (4 * low) + close) / 3.0).tolist()),
+        )
+
+    def update(self, state: KeltnerChannelState, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        kc_mavg_column, kc_upper_column, kc_lower_column = self.get_columns()
+        high, low, close = float(new_bar["high"]), float(new_bar["low"]), float(new_bar["close"])
+
+        state.typical_price.push((high + low + close) / 3.0)
+        state.high_price.push(((4 * high) - (2 * low) + close) / 3.0)
+        state.low_price.push(((-2 * high) + (4 * low) + close) / 3.0)
+
+        return {
+            kc_mavg_column: state.typical_price.mean(),
+            kc_upper_column: state.high_price.mean(),
+            kc_lower_column: state.low_price.mean(),
+        }
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         kc_mavg, kc_upper, kc_lower = self.get_columns()
         kc_mavg_normalized, kc_upper_normalized, kc_lower_normalized = self.get_feature_columns()
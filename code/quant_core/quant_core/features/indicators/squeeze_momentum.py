@@ -1,10 +1,28 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
 
-import numpy as np
 import pandas as pd
 from quant_core.features.feature import DataFeature
 from quant_core.features.indicators.bollinger_bands import DataFeatureBollingerBands
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
+from quant_core.utils.rolling_utils import (
+    RollingExtremes,
+    RollingLinearRegression,
+    RollingWindow,
+    rolling_linear_regression,
+)
+
+
+@dataclass
+class SqueezeMomentumState:
+    """Incremental state of the Squeeze Momentum Indicator."""
+
+    bollinger: RollingWindow
+    keltner: RollingWindow
+    high: RollingExtremes
+    low: RollingExtremes
+    close: RollingWindow
+    target: RollingLinearRegression
 
 
 class DataFeatureSqueezeMomentum(DataFeature):
@@ -42,6 +60,12 @@ class DataFeatureSqueezeMomentum(DataFeature):
             f"sqz_val_{suffix}",
         ]
 
+    def get_dependencies(self) -> List[DataFeature]:
+        return [
+            DataFeatureBollingerBands(self._bb_length, self._bb_mult_factor),
+            DataFeatureBollingerBands(self._kc_length, self._kc_mult_factor),
+        ]
+
     def add_feature(self, data_frame) -> pd.DataFrame:  # pylint: disable=too-many-locals
         sqz_on_column, sqz_off_column, no_sqz_column, squeeze_val_column = self.get_columns()
         if all(col in data_frame.columns for col in (sqz_on_column, sqz_off_column, no_sqz_column, squeeze_val_column)):
@@ -77,26 +101,60 @@ class DataFeatureSqueezeMomentum(DataFeature):
         baseline = 0.5 * (avg_hl + avg_cl)
         target_series = data_frame["close"] - baseline
 
-        def rolling_linreg(series: pd.Series, window: int):
-            results = np.full(len(series), np.nan)
-            x_vals = np.arange(window)
-            for i in range(window - 1, len(series)):
-                y_window = series.iloc[i - window + 1 : i + 1]
-                if y_window.isnull().any():
-                    continue
-                x_mean = x_vals.mean()
-                y_mean = y_window.mean()
-                num = np.sum((x_vals - x_mean) * (y_window - y_mean))
-                den = np.sum((x_vals - x_mean) ** 2)
-                slope = num / den if den != 0 else 0
-                intercept = y_mean - slope * x_mean
-                results[i] = intercept + slope * (window - 1)
-            return pd.Series(results, index=series.index)
-
-        data_frame[squeeze_val_column] = rolling_linreg(target_series, self._linreg_window)
+        _, squeeze_values = rolling_linear_regression(target_series.to_numpy(), self._linreg_window)
+        data_frame[squeeze_val_column] = squeeze_values
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> SqueezeMomentumState:
+        check_df_sorted(data_frame=data_frame)
+        check_enough_rows(data_frame=data_frame)
+
+        window = self._linreg_window
+        rolling_high = data_frame["high"].rolling(window).max()
+        rolling_low = data_frame["low"].rolling(window).min()
+        avg_cl = data_frame["close"].rolling(window).mean()
+        target_series = data_frame["close"] - 0.5 * (0.5 * (rolling_high + rolling_low) + avg_cl)
+
+        return SqueezeMomentumState(
+            bollinger=DataFeatureBollingerBands(self._bb_length, self._bb_mult_factor).init_state(data_frame),
+            keltner=DataFeatureBollingerBands(self._kc_length, self._kc_mult_factor).init_state(data_frame),
+            high=RollingExtremes(window, data_frame["high"].iloc[-window:].tolist()),
+            low=RollingExtremes(window, data_frame["low"].iloc[-window:].tolist()),
+            close=RollingWindow(window, data_frame["close"].iloc[-window:].tolist()),
+            target=RollingLinearRegression(window, target_series.iloc[-window:].tolist()),
+        )
+
+    def update(  # pylint: disable=too-many-locals
+        self, state: SqueezeMomentumState, new_bar: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        sqz_on_column, sqz_off_column, no_sqz_column, squeeze_val_column = self.get_columns()
+
+        bb_feature = DataFeatureBollingerBands(self._bb_length, self._bb_mult_factor)
+        _, bb_upper, bb_lower = bb_feature.update(state.bollinger, new_bar).values()
+        kc_feature = DataFeatureBollingerBands(self._kc_length, self._kc_mult_factor)
+        _, kc_upper, kc_lower = kc_feature.update(state.keltner, new_bar).values()
+
+        sqz_on = bb_lower > kc_lower and bb_upper < kc_upper
+        sqz_off = bb_lower < kc_lower and bb_upper > kc_upper
+
+        close = float(new_bar["close"])
+        state.high.push(float(new_bar["high"]))
+        state.low.push(float(new_bar["low"]))
+        state.close.push(close)
+        baseline = 0.5 * (0.5 * (state.high.max() + state.low.min()) + state.close.mean())
+        state.target.push(close - baseline)
+
+        return {
+            sqz_on_column: sqz_on,
+            sqz_off_column: sqz_off,
+            no_sqz_column: not (sqz_on or sqz_off),
+            squeeze_val_column: state.target.value(),
+        }
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         squeeze_val_column = self.get_columns()[-1]
         squeeze_val_feature_column = self.get_feature_columns()[-1]
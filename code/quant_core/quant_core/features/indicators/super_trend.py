@@ -1,12 +1,23 @@
-from typing import List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
 
-import numpy as np
 import pandas as pd
 from quant_core.features.feature import DataFeature
-from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.average_true_range import AverageTrueRangeState, DataFeatureAverageTrueRange
+from quant_core.features.kernels.super_trend_kernel import super_trend, super_trend_step, super_trend_with_bands
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
 
 
+@dataclass
+class SuperTrendState:
+    """Incremental state of the SuperTrend."""
+
+    atr: AverageTrueRangeState
+    final_upper_band: float
+    final_lower_band: float
+    supertrend: float
+
+
 class DataFeatureSuperTrend(DataFeature):
     """Data Feature for SuperTrend indicator."""
 
@@ -17,7 +28,10 @@ class DataFeatureSuperTrend(DataFeature):
     def get_columns(self) -> List[str]:
         return [f"super_trend_{self._factor}_{self._atr_period}", f"st_direction_{self._factor}_{self._atr_period}"]
 
-    def add_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:  # pylint: disable=too-many-branches
+    def get_dependencies(self) -> List[DataFeature]:
+        return [DataFeatureAverageTrueRange(self._atr_period)]
+
+    def add_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         st_value_column, st_direction_column = self.get_columns()
         if all(col in data_frame.columns for col in (st_value_column, st_direction_column)):
             return data_frame
@@ -29,58 +43,64 @@ class DataFeatureSuperTrend(DataFeature):
         atr_column = atr_feature.get_columns()[0]
         data_frame = atr_feature.add_feature(data_frame)
 
-        mid = (data_frame["high"] + data_frame["low"]) / 2.0
-        basic_upper_band = mid + self._factor * data_frame[atr_column]
-        basic_lower_band = mid - self._factor * data_frame[atr_column]
-
-        final_upper_band = np.zeros(len(data_frame))
-        final_lower_band = np.zeros(len(data_frame))
-        supertrend = np.zeros(len(data_frame))
-        direction = np.zeros(len(data_frame))
-
-        final_upper_band[0] = basic_upper_band.iloc[0]
-        final_lower_band[0] = basic_lower_band.iloc[0]
-        supertrend[0] = np.nan
-        direction[0] = 1
-
-        for i in range(1, len(data_frame)):
-            if data_frame["close"].iloc[i - 1] <= final_upper_band[i - 1]:
-                final_upper_band[i] = min(basic_upper_band.iloc[i], final_upper_band[i - 1])  # type: ignore
-            else:
-                final_upper_band[i] = basic_upper_band.iloc[i]
-
-            if data_frame["close"].iloc[i - 1] >= final_lower_band[i - 1]:
-                final_lower_band[i] = max(basic_lower_band.iloc[i], final_lower_band[i - 1])  # type: ignore
-            else:
-                final_lower_band[i] = basic_lower_band.iloc[i]
-
-            if supertrend[i - 1] == final_upper_band[i - 1]:
-                if data_frame["close"].iloc[i] <= final_upper_band[i]:
-                    supertrend[i] = final_upper_band[i]
-                    direction[i] = -1
-                else:
-                    supertrend[i] = final_lower_band[i]
-                    direction[i] = 1
-            elif supertrend[i - 1] == final_lower_band[i - 1]:
-                if data_frame["close"].iloc[i] >= final_lower_band[i]:
-                    supertrend[i] = final_lower_band[i]
-                    direction[i] = 1
-                else:
-                    supertrend[i] = final_upper_band[i]
-                    direction[i] = -1
-            else:
-                if data_frame["close"].iloc[i] >= final_lower_band[i]:
-                    supertrend[i] = final_lower_band[i]
-                    direction[i] = 1
-                else:
-                    supertrend[i] = final_upper_band[i]
-                    direction[i] = -1
+        supertrend, direction = super_trend(
+            high=data_frame["high"].to_numpy(),
+            low=data_frame["low"].to_numpy(),
+            close=data_frame["close"].to_numpy(),
+            atr=data_frame[atr_column].to_numpy(),
+            factor=self._factor,
+        )
 
         data_frame[st_value_column] = supertrend
-        data_frame[st_direction_column] = np.where(direction > 0, 1, -1)
+        data_frame[st_direction_column] = direction
 
         return data_frame
 
+    def update_matches_add_feature(self) -> bool:
+        return True
+
+    def init_state(self, data_frame: pd.DataFrame) -> SuperTrendState:
+        atr_feature = DataFeatureAverageTrueRange(self._atr_period)
+        atr_column = atr_feature.get_columns()[0]
+        history = atr_feature.add_feature(data_frame[["date", "high", "low", "close"]].copy())
+
+        supertrend, _, final_upper_band, final_lower_band = super_trend_with_bands(
+            high=history["high"].to_numpy(),
+            low=history["low"].to_numpy(),
+            close=history["close"].to_numpy(),
+            atr=history[atr_column].to_numpy(),
+            factor=self._factor,
+        )
+
+        return SuperTrendState(
+            atr=AverageTrueRangeState(
+                prev_close=float(history["close"].iloc[-1]), atr=float(history[atr_column].iloc[-1])
+            ),
+            final_upper_band=float(final_upper_band[-1]),
+            final_lower_band=float(final_lower_band[-1]),
+            supertrend=float(supertrend[-1]),
+        )
+
+    def update(self, state: SuperTrendState, new_bar: Mapping[str, Any]) -> Dict[str, Any]:
+        st_value_column, st_direction_column = self.get_columns()
+        atr_feature = DataFeatureAverageTrueRange(self._atr_period)
+
+        prev_close = state.atr.prev_close
+        atr = atr_feature.update(state.atr, new_bar)[atr_feature.get_columns()[0]]
+
+        mid = (float(new_bar["high"]) + float(new_bar["low"])) / 2.0
+        state.final_upper_band, state.final_lower_band, state.supertrend, direction = super_trend_step(
+            close=float(new_bar["close"]),
+            prev_close=prev_close,
+            basic_upper_band=mid + self._factor * atr,
+            basic_lower_band=mid - self._factor * atr,
+            prev_final_upper_band=state.final_upper_band,
+            prev_final_lower_band=state.final_lower_band,
+            prev_supertrend=state.supertrend,
+        )
+
+        return {st_value_column: state.supertrend, st_direction_column: direction}
+
     def normalize_feature(self, data_frame: pd.DataFrame) -> pd.DataFrame:
         indicator_column_name = self.get_columns()[0]
         normalized_column_name = self.get_feature_columns()[0]
@@ -0,0 +1,196 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from quant_core.utils.jit_utils import is_jit_available, optional_jit
+
+
+def _factor_performance_loop(
+    close: np.ndarray, upper_bands: np.ndarray, lower_bands: np.ndarray, alpha: float
+) -> np.ndarray:
+    """Evolve the SuperTrend state of every factor (columns) bar by bar (rows) and return the final performances."""
+    n, k = upper_bands.shape
+    perf = np.zeros(k)
+    if n == 0:
+        return perf
+
+    upper = upper_bands[0].copy()
+    lower = lower_bands[0].copy()
+    trend = close[0] > upper
+    output = np.where(trend, lower, upper)
+
+    for i in range(1, n):
+        c = close[i]
+        c1 = close[i - 1]
+
+        # min(up, prev_upper) / max(dn, prev_lower) with Python's tie and NaN semantics
+        upper = np.where((c1 < upper) & (upper < upper_bands[i]), upper, upper_bands[i])
+        lower = np.where((c1 > lower) & (lower > lower_bands[i]), lower, lower_bands[i])
+
+        # close > upper => 1, close < lower => 0, else keep the previous trend
+        trend[c < lower] = False
+        trend[c > upper] = True
+
+        perf += alpha * ((c - c1) * np.sign(c1 - output) - perf)
+
+        output = np.where(trend, lower, upper)
+
+    return perf
+
+
+def _adaptive_super_trend_loop(  # pylint: disable=too-many-locals,too-many-branches
+    close: np.ndarray, hl2: np.ndarray, atr: np.ndarray, factor: float, perf_idx: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """SuperTrend pass for the chosen factor including the adaptive moving average of its output."""
+    n = close.shape[0]
+    st_arr = np.full(n, np.nan)
+    os_arr = np.zeros(n, dtype=np.int64)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    perf_ama = np.full(n, np.nan)
+
+    for i in range(n):
+        if np.isnan(hl2[i]) or np.isnan(atr[i]):
+            continue
+
+        c = close[i]
+        up_ = hl2[i] + factor * atr[i]
+        dn_ = hl2[i] - factor * atr[i]
+
+        if i == 0:
+            upper[i] = up_
+            lower[i] = dn_
+            if c > up_:
+                os_arr[i] = 1
+            elif c < dn_:
+                os_arr[i] = 0
+            st_arr[i] = lower[i] if os_arr[i] == 1 else upper[i]
+            perf_ama[i] = st_arr[i]
+        else:
+            prev_close = close[i - 1]
+
+            if prev_close < upper[i - 1]:
+                upper[i] = upper[i - 1] if upper[i - 1] < up_ else up_
+            else:
+                upper[i] = up_
+
+            if prev_close > lower[i - 1]:
+                lower[i] = lower[i - 1] if lower[i - 1] > dn_ else dn_
+            else:
+                lower[i] = dn_
+
+            if c > upper[i]:
+                os_arr[i] = 1
+            elif c < lower[i]:
+                os_arr[i] = 0
+            else:
+                os_arr[i] = os_arr[i - 1]
+
+            st_arr[i] = lower[i] if os_arr[i] == 1 else upper[i]
+            perf_ama[i] = perf_ama[i - 1] + perf_idx * (st_arr[i] - perf_ama[i - 1])
+
+    return st_arr, os_arr, perf_ama, upper, lower
+
+
+_factor_performance_loop_jit = optional_jit(_factor_performance_loop)
+_adaptive_super_trend_loop_jit = optional_jit(_adaptive_super_trend_loop)
+
+
+def _check_jit(use_jit: Optional[bool]) -> None:
+    if use_jit and not is_jit_available():
+        raise RuntimeError("numba is not installed, the JIT backend is not available.")
+
+
+def factor_performances(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    close: np.ndarray,
+    hl2: np.ndarray,
+    atr: np.ndarray,
+    factors: np.ndarray,
+    alpha: float,
+    use_jit: Optional[bool] = None,
+) -> np.ndarray:
+    """
+    Calculate the smoothed SuperTrend performance of all factors at once.
+    - The bands of every factor are built as one (bars x factors) matrix and evolved together
+    - Inputs must not contain NaNs (the caller drops incomplete rows)
+    """
+    _check_jit(use_jit)
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    hl2 = np.ascontiguousarray(hl2, dtype=np.float64)
+    atr = np.ascontiguousarray(atr, dtype=np.float64)
+    factors = np.ascontiguousarray(factors, dtype=np.float64)
+
+    upper_bands = hl2[:, None] + factors[None, :] * atr[:, None]
+    lower_bands = hl2[:, None] - factors[None, :] * atr[:, None]
+
+    loop = _factor_performance_loop_jit if use_jit is not False else _factor_performance_loop
+    return loop(close, upper_bands, lower_bands, float(alpha))
+
+
+def adaptive_super_trend_with_bands(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    close: np.ndarray,
+    hl2: np.ndarray,
+    atr: np.ndarray,
+    factor: float,
+    perf_idx: float,
+    use_jit: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate the adaptive SuperTrend line, direction (1 / 0), its adaptive moving average and the bands."""
+    _check_jit(use_jit)
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    hl2 = np.ascontiguousarray(hl2, dtype=np.float64)
+    atr = np.ascontiguousarray(atr, dtype=np.float64)
+
+    loop = _adaptive_super_trend_loop_jit if use_jit is not False else _adaptive_super_trend_loop
+    return loop(close, hl2, atr, float(factor), float(perf_idx))
+
+
+def adaptive_super_trend(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    close: np.ndarray,
+    hl2: np.ndarray,
+    atr: np.ndarray,
+    factor: float,
+    perf_idx: float,
+    use_jit: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate the adaptive SuperTrend line, its direction (1 / 0) and its adaptive moving average."""
+    st_arr, os_arr, perf_ama, _, _ = adaptive_super_trend_with_bands(close, hl2, atr, factor, perf_idx, use_jit)
+
+    return st_arr, os_arr, perf_ama
+
+
+def adaptive_super_trend_step(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    close: float,
+    prev_close: float,
+    hl2: float,
+    atr: float,
+    factor: float,
+    perf_idx: float,
+    prev_upper: float,
+    prev_lower: float,
+    prev_os: int,
+    prev_perf_ama: float,
+) -> Tuple[float, float, int, float, float]:
+    """Advance the adaptive SuperTrend by one bar, returns (upper, lower, direction, supertrend, perf_ama)."""
+    if math.isnan(hl2) or math.isnan(atr):
+        return math.nan, math.nan, 0, math.nan, math.nan
+
+    up_ = hl2 + factor * atr
+    dn_ = hl2 - factor * atr
+
+    upper = prev_upper if prev_close < prev_upper < up_ else up_
+    lower = prev_lower if prev_close > prev_lower > dn_ else dn_
+
+    if close > upper:
+        os_ = 1
+    elif close < lower:
+        os_ = 0
+    else:
+        os_ = prev_os
+
+    st_ = lower if os_ == 1 else upper
+    perf_ama = prev_perf_ama + perf_idx * (st_ - prev_perf_ama)
+
+    return upper, lower, os_, st_, perf_ama
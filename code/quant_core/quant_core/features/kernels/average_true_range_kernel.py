@@ -0,0 +1,48 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from quant_core.utils.jit_utils import is_jit_available, optional_jit
+
+
+def _wilder_loop(true_range: np.ndarray, window: int, seed: float) -> np.ndarray:
+    """Wilder smoothing of the true range, seeded with the mean of the first window."""
+    n = true_range.shape[0]
+    atr = np.zeros(n)
+    if n < window:
+        return atr
+
+    atr[window - 1] = seed
+    for i in range(window, n):
+        atr[i] = (atr[i - 1] * (window - 1) + true_range[i]) / float(window)
+
+    return atr
+
+
+_wilder_loop_jit = optional_jit(_wilder_loop)
+
+
+def average_true_range(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int, use_jit: Optional[bool] = None
+) -> np.ndarray:
+    """
+    Calculate the Average True Range from raw arrays, identical to `ta.volatility.AverageTrueRange`.
+    - Values before the first full window are 0 like in `ta`, callers mask the warm-up themselves
+    """
+    if use_jit and not is_jit_available():
+        raise RuntimeError("numba is not installed, the JIT backend is not available.")
+
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    if not len(high) == len(low) == len(close):
+        raise ValueError("high, low and close must have the same length.")
+
+    prev_close = np.concatenate(([np.nan], close[:-1])) if len(close) else close
+    # NaN-skipping maximum, like the DataFrame.max(axis=1) used by `ta`
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    seed = float(pd.Series(true_range[:window]).mean()) if len(true_range) >= window else np.nan
+
+    loop = _wilder_loop_jit if use_jit is not False else _wilder_loop
+    return loop(true_range, int(window), seed)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from quant_core.features.kernels.average_true_range_kernel import average_true_range
+from quant_core.utils.jit_utils import is_jit_available
+from quant_dev.builder import Builder
+from ta.volatility import AverageTrueRange
+
+
+class TestAverageTrueRangeKernel:
+    @pytest.mark.parametrize("use_jit", [False, True] if is_jit_available() else [False])
+    @pytest.mark.parametrize("window", [1, 2, 14, 100])
+    def test_matches_ta(self, window: int, use_jit: bool) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=5000, seed=window)
+        data_frame.loc[500:505, "high"] = np.nan
+        data_frame.loc[700, "close"] = np.nan
+
+        expected = AverageTrueRange(
+            high=data_frame["high"], low=data_frame["low"], close=data_frame["close"], window=window
+        ).average_true_range()
+        result = average_true_range(
+            data_frame["high"], data_frame["low"], data_frame["close"], window=window, use_jit=use_jit
+        )
+
+        np.testing.assert_array_equal(result, expected.to_numpy())
+
+    def test_short_input(self) -> None:
+        result = average_true_range(np.ones(3), np.zeros(3), np.ones(3), window=5)
+
+        np.testing.assert_array_equal(result, np.zeros(3))
+
+    def test_length_mismatch(self) -> None:
+        with pytest.raises(ValueError):
+            average_true_range(np.ones(3), np.zeros(2), np.ones(3), window=2)
@@ -0,0 +1,138 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from quant_core.utils.jit_utils import is_jit_available, optional_jit
+
+
+def _heikin_ashi_loop(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    alpha: float,
+    recursive_open: bool,
+) -> np.ndarray:
+    """
+    Heikin Ashi open/close/high/low (rows 0-3) and their EWMs (rows 4-7) in one pass over the candles.
+    - The EWM follows pandas `ewm(adjust=False)`: NaNs before the first value stay NaN, later ones decay the weight
+    - High/low skip NaNs like `DataFrame.max(axis=1)` / `min(axis=1)`
+    """
+    # pylint: disable=too-many-branches
+    n = close.shape[0]
+    result = np.full((8, n), np.nan)
+    weighted = np.full(4, np.nan)
+    old_weight = np.ones(4)
+    values = np.empty(4)
+
+    for i in range(n):
+        if i == 0:
+            ha_open = (open_[0] + close[0]) / 2 if recursive_open else np.nan
+        elif recursive_open:
+            ha_open = (result[0, i - 1] + result[1, i - 1]) / 2
+        else:
+            ha_open = (open_[i - 1] + close[i - 1]) / 2
+        ha_close = (open_[i] + high[i] + low[i] + close[i]) / 4
+
+        ha_high = high[i]
+        if np.isnan(ha_high) or ha_open > ha_high:
+            ha_high = ha_open
+        if np.isnan(ha_high) or ha_close > ha_high:
+            ha_high = ha_close
+
+        ha_low = low[i]
+        if np.isnan(ha_low) or ha_open < ha_low:
+            ha_low = ha_open
+        if np.isnan(ha_low) or ha_close < ha_low:
+            ha_low = ha_close
+
+        values[0] = ha_open
+        values[1] = ha_close
+        values[2] = ha_high
+        values[3] = ha_low
+
+        for row in range(4):
+            value = values[row]
+            result[row, i] = value
+
+            if np.isnan(weighted[row]):
+                weighted[row] = value
+            else:
+                old_weight[row] *= 1.0 - alpha
+                if not np.isnan(value):
+                    if weighted[row] != value:
+                        weighted[row] = (old_weight[row] * weighted[row] + alpha * value) / (old_weight[row] + alpha)
+                    old_weight[row] = 1.0
+
+            result[4 + row, i] = weighted[row]
+
+    return result
+
+
+_heikin_ashi_loop_jit = optional_jit(_heikin_ashi_loop)
+
+
+def _heikin_ashi_numpy(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    smooth_length: int,
+    recursive_open: bool,
+) -> np.ndarray:
+    """Fallback without numba: vectorized candles and the pandas EWM, which beat a per-bar Python loop."""
+    n = close.shape[0]
+    result = np.full((8, n), np.nan)
+    ha_open, ha_close, ha_high, ha_low = result[:4]
+
+    ha_close[:] = (open_ + high + low + close) / 4
+    if n and recursive_open:
+        previous_open = (open_[0] + close[0]) / 2
+        ha_open[0] = previous_open
+        for i, previous_close in enumerate(ha_close[:-1].tolist(), start=1):
+            previous_open = (previous_open + previous_close) / 2
+            ha_open[i] = previous_open
+    elif n:
+        ha_open[1:] = (open_[:-1] + close[:-1]) / 2
+
+    ha_high[:] = np.fmax(np.fmax(high, ha_open), ha_close)
+    ha_low[:] = np.fmin(np.fmin(low, ha_open), ha_close)
+    result[4:] = pd.DataFrame(result[:4].T).ewm(span=smooth_length, adjust=False).mean().to_numpy().T
+
+    return result
+
+
+def heikin_ashi(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    smooth_length: int = 1,
+    recursive_open: bool = False,
+    use_jit: Optional[bool] = None,
+) -> np.ndarray:
+    """
+    Calculate the Heikin Ashi candles and their EWM smoothing (span `smooth_length`) from raw arrays.
+    - With numba everything is computed in one fused pass, otherwise with vectorized NumPy and the pandas EWM
+    - Returns an (8 x bars) array: open, close, high, low followed by the smoothed open, close, high, low
+    - `recursive_open=False` opens at the midpoint of the previous raw candle (first open is NaN),
+      `recursive_open=True` at the midpoint of the previous Heikin Ashi candle (first open is (open + close) / 2)
+    """
+    if use_jit and not is_jit_available():
+        raise RuntimeError("numba is not installed, the JIT backend is not available.")
+    if smooth_length < 1:
+        raise ValueError("smooth_length must be at least 1.")
+
+    open_ = np.ascontiguousarray(open_, dtype=np.float64)
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+
+    if not len(open_) == len(high) == len(low) == len(close):
+        raise ValueError("open, high, low and close must have the same length.")
+
+    if use_jit is False or not is_jit_available():
+        return _heikin_ashi_numpy(open_, high, low, close, smooth_length, bool(recursive_open))
+
+    alpha = 1.0 / (1.0 + (smooth_length - 1) / 2.0)
+    return _heikin_ashi_loop_jit(open_, high, low, close, alpha, bool(recursive_open))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.features.candles.smoothed_heikin_ashi import DataFeatureSmoothedHeikinAshi
+from quant_core.features.kernels.heikin_ashi_kernel import heikin_ashi
+from quant_core.utils.jit_utils import is_jit_available
+from quant_dev.builder import Builder
+
+_BACKENDS = [False, True] if is_jit_available() else [False]
+
+
+def _reference_heikin_ashi(data_frame: pd.DataFrame, smooth_length: int, recursive_open: bool) -> pd.DataFrame:
+    """Former pandas implementation, with a plain loop for the recursive open."""
+    ha = pd.DataFrame(index=data_frame.index)
+    ha["close"] = (data_frame["open"] + data_frame["high"] + data_frame["low"] + data_frame["close"]) / 4
+    if recursive_open:
+        ha_open = [(data_frame["open"].iloc[0] + data_frame["close"].iloc[0]) / 2]
+        for i in range(1, len(data_frame)):
+            ha_open.append((ha_open[i - 1] + ha["close"].iloc[i - 1]) / 2)
+        ha["open"] = ha_open
+    else:
+        ha["open"] = (data_frame["open"].shift(1) + data_frame["close"].shift(1)) / 2
+    ha["high"] = pd.concat([data_frame["high"], ha["open"], ha["close"]], axis=1).max(axis=1)
+    ha["low"] = pd.concat([data_frame["low"], ha["open"], ha["close"]], axis=1).min(axis=1)
+    ha = ha[["open", "close", "high", "low"]]
+
+    return pd.concat([ha, ha.ewm(span=smooth_length, adjust=False).mean().add_suffix("_smooth")], axis=1)
+
+
+class TestHeikinAshiKernel:
+    @pytest.mark.parametrize("use_jit", _BACKENDS)
+    @pytest.mark.parametrize("recursive_open", [False, True])
+    @pytest.mark.parametrize("smooth_length", [1, 3, 10])
+    def test_matches_pandas(self, smooth_length: int, recursive_open: bool, use_jit: bool) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=2000, seed=smooth_length)
+        data_frame.loc[100:103, "high"] = np.nan
+        data_frame.loc[500, "close"] = np.nan
+
+        expected = _reference_heikin_ashi(data_frame, smooth_length, recursive_open)
+        result = heikin_ashi(
+            data_frame["open"],
+            data_frame["high"],
+            data_frame["low"],
+            data_frame["close"],
+            smooth_length=smooth_length,
+            recursive_open=recursive_open,
+            use_jit=use_jit,
+        )
+
+        np.testing.assert_array_equal(result, expected.to_numpy().T)
+
+    def test_smoothed_feature_has_no_chained_assignment(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1000, seed=1)
+
+        with pd.option_context("mode.chained_assignment", "raise"):
+            data_frame = DataFeatureSmoothedHeikinAshi(10).add_feature(data_frame)
+
+        assert data_frame["ha_open_smooth_10"].iloc[:10].isna().all()
+        assert data_frame["ha_open_smooth_10"].iloc[10:].notna().all()
+
+    def test_invalid_input(self) -> None:
+        with pytest.raises(ValueError):
+            heikin_ashi(np.ones(3), np.ones(3), np.ones(2), np.ones(3))
+
+        with pytest.raises(ValueError):
+            heikin_ashi(np.ones(3), np.ones(3), np.ones(3), np.ones(3), smooth_length=0)
@@ -0,0 +1,246 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from quant_core.utils.jit_utils import is_jit_available, optional_jit
+
+
+def _super_trend_loop(  # pylint: disable=too-many-branches
+    close: np.ndarray, basic_upper_band: np.ndarray, basic_lower_band: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Recursive SuperTrend band/direction update over raw float64 arrays."""
+    n = close.shape[0]
+    final_upper_band = np.zeros(n)
+    final_lower_band = np.zeros(n)
+    supertrend = np.zeros(n)
+    direction = np.zeros(n)
+
+    if n == 0:
+        return supertrend, direction, final_upper_band, final_lower_band
+
+    final_upper_band[0] = basic_upper_band[0]
+    final_lower_band[0] = basic_lower_band[0]
+    supertrend[0] = np.nan
+    direction[0] = 1
+
+    for i in range(1, n):
+        # Mirrors Python's min()/max(): the first argument is kept unless the second one compares strictly
+        # smaller/greater. This keeps the NaN warm-up of the ATR bit-identical to the DataFrame implementation.
+        if close[i - 1] <= final_upper_band[i - 1]:
+            if final_upper_band[i - 1] < basic_upper_band[i]:
+                final_upper_band[i] = final_upper_band[i - 1]
+            else:
+                final_upper_band[i] = basic_upper_band[i]
+        else:
+            final_upper_band[i] = basic_upper_band[i]
+
+        if close[i - 1] >= final_lower_band[i - 1]:
+            if final_lower_band[i - 1] > basic_lower_band[i]:
+                final_lower_band[i] = final_lower_band[i - 1]
+            else:
+                final_lower_band[i] = basic_lower_band[i]
+        else:
+            final_lower_band[i] = basic_lower_band[i]
+
+        if supertrend[i - 1] == final_upper_band[i - 1]:
+            if close[i] <= final_upper_band[i]:
+                supertrend[i] = final_upper_band[i]
+                direction[i] = -1
+            else:
+                supertrend[i] = final_lower_band[i]
+                direction[i] = 1
+        elif supertrend[i - 1] == final_lower_band[i - 1]:
+            if close[i] >= final_lower_band[i]:
+                supertrend[i] = final_lower_band[i]
+                direction[i] = 1
+            else:
+                supertrend[i] = final_upper_band[i]
+                direction[i] = -1
+        else:
+            if close[i] >= final_lower_band[i]:
+                supertrend[i] = final_lower_band[i]
+                direction[i] = 1
+            else:
+                supertrend[i] = final_upper_band[i]
+                direction[i] = -1
+
+    return supertrend, direction, final_upper_band, final_lower_band
+
+
+def _super_trend_directions_loop(
+    close: np.ndarray, basic_upper_bands: np.ndarray, basic_lower_bands: np.ndarray
+) -> np.ndarray:
+    """Same recursion as `_super_trend_loop`, evolved for every factor (columns) at once, returns the directions."""
+    n, k = basic_upper_bands.shape
+    directions = np.ones((n, k), dtype=np.int8)
+    if n == 0:
+        return directions
+
+    final_upper_band = basic_upper_bands[0].copy()
+    final_lower_band = basic_lower_bands[0].copy()
+    supertrend = np.full(k, np.nan)
+
+    for i in range(1, n):
+        c = close[i]
+        c1 = close[i - 1]
+        was_upper = supertrend == final_upper_band
+
+        final_upper_band = np.where(
+            (c1 <= final_upper_band) & (final_upper_band < basic_upper_bands[i]), final_upper_band, basic_upper_bands[i]
+        )
+        final_lower_band = np.where(
+            (c1 >= final_lower_band) & (final_lower_band > basic_lower_bands[i]), final_lower_band, basic_lower_bands[i]
+        )
+
+        # coming from the upper band the trend turns up only above it, otherwise it stays up on the lower band
+        is_up = np.where(was_upper, ~(c <= final_upper_band), c >= final_lower_band)
+        supertrend = np.where(is_up, final_lower_band, final_upper_band)
+        directions[i] = np.where(is_up, 1, -1)
+
+    return directions
+
+
+def _super_trend_directions_scalar_loop(  # pylint: disable=too-many-locals
+    close: np.ndarray, mid: np.ndarray, atr: np.ndarray, factors: np.ndarray
+) -> np.ndarray:
+    """Scalar form of `_super_trend_directions_loop` for numba, bands are built on the fly one factor at a time."""
+    n = close.shape[0]
+    k = factors.shape[0]
+    directions = np.ones((k, n), dtype=np.int8)
+
+    for j in range(k):
+        if n == 0:
+            break
+        factor = factors[j]
+        final_upper_band = mid[0] + factor * atr[0]
+        final_lower_band = mid[0] - factor * atr[0]
+        supertrend = np.nan
+
+        for i in range(1, n):
+            basic_upper_band = mid[i] + factor * atr[i]
+            basic_lower_band = mid[i] - factor * atr[i]
+            was_upper = supertrend == final_upper_band
+
+            if not close[i - 1] <= final_upper_band < basic_upper_band:
+                final_upper_band = basic_upper_band
+            if not close[i - 1] >= final_lower_band > basic_lower_band:
+                final_lower_band = basic_lower_band
+
+            is_up = not close[i] <= final_upper_band if was_upper else close[i] >= final_lower_band
+            supertrend = final_lower_band if is_up else final_upper_band
+            directions[j, i] = 1 if is_up else -1
+
+    return directions.T
+
+
+_super_trend_loop_jit = optional_jit(_super_trend_loop)
+_super_trend_directions_scalar_loop_jit = optional_jit(_super_trend_directions_scalar_loop)
+
+
+def super_trend_with_bands(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    factor: float,
+    use_jit: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate the SuperTrend line, direction (1 / -1) and the final upper/lower bands from raw arrays.
+    - `use_jit=None` compiles the loop with numba if it is installed, otherwise runs the NumPy fallback
+    - `use_jit=True` raises if numba is not installed
+    """
+    if use_jit and not is_jit_available():
+        raise RuntimeError("numba is not installed, the JIT backend is not available.")
+
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    atr = np.ascontiguousarray(atr, dtype=np.float64)
+
+    if not len(high) == len(low) == len(close) == len(atr):
+        raise ValueError("high, low, close and atr must have the same length.")
+
+    mid = (high + low) / 2.0
+    basic_upper_band = mid + factor * atr
+    basic_lower_band = mid - factor * atr
+
+    loop = _super_trend_loop_jit if use_jit is not False else _super_trend_loop
+    supertrend, direction, final_upper_band, final_lower_band = loop(close, basic_upper_band, basic_lower_band)
+
+    return supertrend, np.where(direction > 0, 1, -1), final_upper_band, final_lower_band
+
+
+def super_trend(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    factor: float,
+    use_jit: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate the SuperTrend line and direction (1 / -1) from raw arrays."""
+    supertrend, direction, _, _ = super_trend_with_bands(high, low, close, atr, factor, use_jit)
+
+    return supertrend, direction
+
+
+def super_trend_directions(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    factors: np.ndarray,
+    use_jit: Optional[bool] = None,
+) -> np.ndarray:
+    """
+    Calculate the SuperTrend directions (1 / -1) of many factors sharing one ATR as a (bars x factors) int8 matrix.
+    - Every column is identical to the direction of `super_trend` with that factor
+    """
+    if use_jit and not is_jit_available():
+        raise RuntimeError("numba is not installed, the JIT backend is not available.")
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    atr = np.ascontiguousarray(atr, dtype=np.float64)
+    factors = np.ascontiguousarray(factors, dtype=np.float64)
+    mid = (np.asarray(high, dtype=np.float64) + np.asarray(low, dtype=np.float64)) / 2.0
+
+    if not len(mid) == len(close) == len(atr):
+        raise ValueError("high, low, close and atr must have the same length.")
+
+    if use_jit is not False and is_jit_available():
+        return _super_trend_directions_scalar_loop_jit(close, mid, atr, factors)
+
+    basic_upper_bands = mid[:, None] + factors[None, :] * atr[:, None]
+    basic_lower_bands = mid[:, None] - factors[None, :] * atr[:, None]
+
+    return _super_trend_directions_loop(close, basic_upper_bands, basic_lower_bands)
+
+
+def super_trend_step(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    close: float,
+    prev_close: float,
+    basic_upper_band: float,
+    basic_lower_band: float,
+    prev_final_upper_band: float,
+    prev_final_lower_band: float,
+    prev_supertrend: float,
+) -> Tuple[float, float, float, int]:
+    """Advance the SuperTrend by one bar, returns (final upper band, final lower band, supertrend, direction)."""
+    if prev_close <= prev_final_upper_band < basic_upper_band:
+        final_upper_band = prev_final_upper_band
+    else:
+        final_upper_band = basic_upper_band
+
+    if prev_close >= prev_final_lower_band > basic_lower_band:
+        final_lower_band = prev_final_lower_band
+    else:
+        final_lower_band = basic_lower_band
+
+    if prev_supertrend == prev_final_upper_band:
+        if close <= final_upper_band:
+            return final_upper_band, final_lower_band, final_upper_band, -1
+        return final_upper_band, final_lower_band, final_lower_band, 1
+
+    if close >= final_lower_band:
+        return final_upper_band, final_lower_band, final_lower_band, 1
+    return final_upper_band, final_lower_band, final_upper_band, -1
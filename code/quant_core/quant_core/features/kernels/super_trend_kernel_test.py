@@ -0,0 +1,114 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_core.features.kernels.super_trend_kernel import super_trend
+from quant_core.utils.jit_utils import is_jit_available
+from quant_dev.builder import Builder
+
+
+def _reference_super_trend(  # pylint: disable=too-many-branches
+    data_frame: pd.DataFrame, factor: float, atr_column: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Previous row-by-row DataFrame implementation, kept as the ground truth."""
+    mid = (data_frame["high"] + data_frame["low"]) / 2.0
+    basic_upper_band = mid + factor * data_frame[atr_column]
+    basic_lower_band = mid - factor * data_frame[atr_column]
+
+    final_upper_band = np.zeros(len(data_frame))
+    final_lower_band = np.zeros(len(data_frame))
+    supertrend = np.zeros(len(data_frame))
+    direction = np.zeros(len(data_frame))
+
+    final_upper_band[0] = basic_upper_band.iloc[0]
+    final_lower_band[0] = basic_lower_band.iloc[0]
+    supertrend[0] = np.nan
+    direction[0] = 1
+
+    for i in range(1, len(data_frame)):
+        if data_frame["close"].iloc[i - 1] <= final_upper_band[i - 1]:
+            final_upper_band[i] = min(basic_upper_band.iloc[i], final_upper_band[i - 1])
+        else:
+            final_upper_band[i] = basic_upper_band.iloc[i]
+
+        if data_frame["close"].iloc[i - 1] >= final_lower_band[i - 1]:
+            final_lower_band[i] = max(basic_lower_band.iloc[i], final_lower_band[i - 1])
+        else:
+            final_lower_band[i] = basic_lower_band.iloc[i]
+
+        if supertrend[i - 1] == final_upper_band[i - 1]:
+            if data_frame["close"].iloc[i] <= final_upper_band[i]:
+                supertrend[i] = final_upper_band[i]
+                direction[i] = -1
+            else:
+                supertrend[i] = final_lower_band[i]
+                direction[i] = 1
+        elif supertrend[i - 1] == final_lower_band[i - 1]:
+            if data_frame["close"].iloc[i] >= final_lower_band[i]:
+                supertrend[i] = final_lower_band[i]
+                direction[i] = 1
+            else:
+                supertrend[i] = final_upper_band[i]
+                direction[i] = -1
+        else:
+            if data_frame["close"].iloc[i] >= final_lower_band[i]:
+                supertrend[i] = final_lower_band[i]
+                direction[i] = 1
+            else:
+                supertrend[i] = final_upper_band[i]
+                direction[i] = -1
+
+    return supertrend, np.where(direction > 0, 1, -1)
+
+
+class TestSuperTrendKernel:
+    @pytest.mark.parametrize(
+        "use_jit",
+        [False, pytest.param(True, marks=pytest.mark.skipif(not is_jit_available(), reason="numba not installed"))],
+    )
+    @pytest.mark.parametrize("factor,atr_period,seed", [(3.0, 10, 1), (5, 14, 2), (1.5, 7, 3)])
+    def test_bit_identical_to_reference(self, use_jit: bool, factor: float, atr_period: int, seed: int) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=2000, seed=seed)
+        atr_feature = DataFeatureAverageTrueRange(atr_period)
+        atr_column = atr_feature.get_columns()[0]
+        data_frame = atr_feature.add_feature(data_frame)
+
+        expected_supertrend, expected_direction = _reference_super_trend(data_frame, factor, atr_column)
+        supertrend, direction = super_trend(
+            high=data_frame["high"].to_numpy(),
+            low=data_frame["low"].to_numpy(),
+            close=data_frame["close"].to_numpy(),
+            atr=data_frame[atr_column].to_numpy(),
+            factor=factor,
+            use_jit=use_jit,
+        )
+
+        np.testing.assert_array_equal(supertrend, expected_supertrend)
+        np.testing.assert_array_equal(direction, expected_direction)
+        assert direction.dtype == expected_direction.dtype
+
+    def test_feature_uses_kernel(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=2000, seed=4)
+        feature = DataFeatureSuperTrend(factor=3.0, atr_period=10)
+        supertrend_column, direction_column = feature.get_columns()
+
+        data_frame = feature.add_feature(data_frame)
+        expected_supertrend, expected_direction = _reference_super_trend(data_frame, 3.0, "atr_10")
+
+        np.testing.assert_array_equal(data_frame[supertrend_column].to_numpy(), expected_supertrend)
+        np.testing.assert_array_equal(data_frame[direction_column].to_numpy(), expected_direction)
+
+    def test_empty_input(self) -> None:
+        empty = np.array([], dtype=np.float64)
+
+        supertrend, direction = super_trend(empty, empty, empty, empty, factor=3.0, use_jit=False)
+
+        assert len(supertrend) == 0
+        assert len(direction) == 0
+
+    def test_length_mismatch(self) -> None:
+        with pytest.raises(ValueError):
+            super_trend(np.ones(3), np.ones(3), np.ones(2), np.ones(3), factor=3.0)
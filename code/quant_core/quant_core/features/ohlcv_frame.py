@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+_PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class OhlcvFrame:
+    """
+    Compact columnar candles: int64 epoch timestamps (ns) and contiguous float32 / float64 arrays.
+    - Implements the part of the DataFrame interface the features use, so `add_feature` runs on it directly
+    - Columns are handed out as Series views on the arrays, nothing is copied on access, the date as a
+      datetime64[ns] view
+    - Float feature columns are stored in the frame dtype, other dtypes (bool, int) are kept as they are
+    """
+
+    def __init__(self, date: np.ndarray, columns: Mapping[str, np.ndarray], dtype: Any = np.float32) -> None:
+        self._dtype = np.dtype(dtype)
+        if self._dtype not in (np.float32, np.float64):
+            raise ValueError("OhlcvFrame only supports float32 and float64 columns.")
+
+        self._date = np.ascontiguousarray(date, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+        for column, values in columns.items():
+            self[column] = values
+
+    @classmethod
+    def from_data_frame(cls, data_frame: pd.DataFrame, dtype: Any = np.float32) -> "OhlcvFrame":
+        """Build the frame from the date and OHLCV columns of a DataFrame."""
+        date = pd.to_datetime(data_frame["date"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        columns = {column: data_frame[column].to_numpy() for column in _PRICE_COLUMNS if column in data_frame}
+
+        return cls(date=date, columns=columns, dtype=dtype)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Float dtype of the price and feature columns."""
+        return self._dtype
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names including the date."""
+        return ["date"] + list(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by all columns."""
+        return self._date.nbytes + sum(values.nbytes for values in self._columns.values())
+
+    def __len__(self) -> int:
+        return len(self._date)
+
+    def __contains__(self, column: object) -> bool:
+        return column == "date" or column in self._columns
+
+    def __getitem__(self, key: Union[str, List[str]]) -> Union[pd.Series, pd.DataFrame]:
+        if isinstance(key, list):
+            return pd.DataFrame({column: self[column] for column in key})
+
+        if key == "date":
+            return pd.Series(self._date.view("datetime64[ns]"), name=key, copy=False)
+
+        return pd.Series(self.to_numpy(key), name=key, copy=False)
+
+    def __setitem__(self, column: str, values: Any) -> None:
+        if column == "date":
+            raise KeyError("The date column of an OhlcvFrame is read-only.")
+
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(len(self), values)
+        if len(values) != len(self):
+            raise ValueError(f"Column '{column}' has {len(values)} values, expected {len(self)}.")
+        if np.issubdtype(values.dtype, np.floating) or column in _PRICE_COLUMNS:
+            values = values.astype(self._dtype, copy=False)
+
+        self._columns[column] = np.ascontiguousarray(values)
+
+    def to_numpy(self, column: str) -> np.ndarray:
+        """Return the array behind a column, the date as int64 nanoseconds since epoch."""
+        if column == "date":
+            return self._date
+
+        return self._columns[column]
+
+    def to_data_frame(self) -> pd.DataFrame:
+        """Convert to a regular DataFrame with a datetime64 date column."""
+        data_frame = pd.DataFrame(self._columns)
+        data_frame.insert(0, "date", pd.to_datetime(self._date))
+
+        return data_frame
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.features.candles.heikin_ashi import DataFeatureHeikinAshi
+from quant_core.features.candles.smoothed_heikin_ashi import DataFeatureSmoothedHeikinAshi
+from quant_core.features.feature import DataFeature
+from quant_core.features.indicators.adaptive_super_trend import DataFeatureAdaptiveSuperTrend
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.indicators.bollinger_bands import DataFeatureBollingerBands
+from quant_core.features.indicators.keltner_channel import DataFeatureKeltnerChannel
+from quant_core.features.indicators.squeeze_momentum import DataFeatureSqueezeMomentum
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_core.features.ohlcv_frame import OhlcvFrame
+from quant_core.features.performance.draw_down_up import DataFeatureDrawDownAndUp
+from quant_core.features.performance.returns import DataFeatureReturns
+from quant_core.features.performance.sharpe_ratio import DataFeatureSharpeRatio
+from quant_core.features.performance.sortino_ratio import DataFeatureSortinoRatio
+from quant_dev.builder import Builder
+
+_FEATURES = [
+    DataFeatureAverageTrueRange(14),
+    DataFeatureBollingerBands(20, 2),
+    DataFeatureKeltnerChannel(20, 2),
+    DataFeatureSuperTrend(3.0, 10),
+    DataFeatureAdaptiveSuperTrend(atr_period=10, max_data=1000),
+    DataFeatureSqueezeMomentum(),
+    DataFeatureHeikinAshi(),
+    DataFeatureSmoothedHeikinAshi(10),
+    DataFeatureReturns(TradeDirection.LONG, 5),
+    DataFeatureDrawDownAndUp(TradeDirection.SHORT, 5),
+    DataFeatureSharpeRatio(TradeDirection.LONG),
+    DataFeatureSortinoRatio(TradeDirection.SHORT),
+]
+
+
+class TestOhlcvFrame:
+    def test_round_trip(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=100, seed=1)
+
+        ohlcv_frame = OhlcvFrame.from_data_frame(data_frame, dtype=np.float64)
+
+        assert len(ohlcv_frame) == 100
+        assert ohlcv_frame.columns == ["date", "open", "high", "low", "close", "volume"]
+        assert ohlcv_frame["date"].dtype == "datetime64[ns]"
+        pd.testing.assert_frame_equal(ohlcv_frame.to_data_frame(), data_frame, check_index_type=False)
+
+    def test_columns_are_views(self) -> None:
+        ohlcv_frame = OhlcvFrame.from_data_frame(Builder.build_random_walk_chart_data_frame(length=100, seed=1))
+
+        close = ohlcv_frame["close"]
+        close[:10] = np.nan
+
+        assert close.dtype == np.float32
+        assert np.shares_memory(close.to_numpy(), ohlcv_frame.to_numpy("close"))
+        assert np.isnan(ohlcv_frame.to_numpy("close")[:10]).all()
+
+    def test_compact_memory(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=10_000, seed=1)
+
+        ohlcv_frame = OhlcvFrame.from_data_frame(data_frame)
+
+        assert ohlcv_frame.nbytes < 0.6 * data_frame.memory_usage(deep=True).sum()
+
+    def test_invalid_columns(self) -> None:
+        ohlcv_frame = OhlcvFrame.from_data_frame(Builder.build_random_walk_chart_data_frame(length=10, seed=1))
+
+        with pytest.raises(ValueError):
+            ohlcv_frame["close"] = np.ones(5)
+
+        with pytest.raises(KeyError):
+            ohlcv_frame["date"] = np.ones(10)
+
+        with pytest.raises(ValueError):
+            OhlcvFrame(date=np.arange(3), columns={}, dtype=np.int64)
+
+    @pytest.mark.parametrize("feature", _FEATURES)
+    def test_feature_matches_data_frame(self, feature: DataFeature) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1500, seed=2)
+        ohlcv_frame = OhlcvFrame.from_data_frame(data_frame, dtype=np.float64)
+
+        expected = feature.add_feature(data_frame.copy())
+        result = feature.add_feature(ohlcv_frame)
+
+        assert result is ohlcv_frame
+        for column in feature.get_columns():
+            np.testing.assert_array_equal(result.to_numpy(column), expected[column].to_numpy())
+
+    @pytest.mark.parametrize("feature", [DataFeatureSuperTrend(3.0, 10), DataFeatureSqueezeMomentum()])
+    def test_feature_on_float32(self, feature: DataFeature) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1500, seed=2)
+        ohlcv_frame = OhlcvFrame.from_data_frame(data_frame, dtype=np.float32)
+
+        expected = feature.add_feature(data_frame.copy())
+        result = feature.add_feature(ohlcv_frame)
+
+        for column in feature.get_columns():
+            values = result.to_numpy(column)
+            if np.issubdtype(values.dtype, np.floating):
+                assert values.dtype == np.float32
+                np.testing.assert_allclose(values, expected[column], rtol=1e-3, atol=1e-3)
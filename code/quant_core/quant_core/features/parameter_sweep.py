@@ -0,0 +1,158 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.features.indicators.adaptive_super_trend import DataFeatureAdaptiveSuperTrend
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.kernels.super_trend_kernel import super_trend_directions
+from quant_core.features.performance.returns import DataFeatureReturns
+from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
+
+_FORWARD_RETURN_COLUMN = "_forward_return_"
+
+# candles of the running sweep, set once per worker process by `_init_worker`
+_SWEEP_FRAME: Optional[pd.DataFrame] = None
+
+
+def _init_worker(sweep_frame: pd.DataFrame) -> None:
+    global _SWEEP_FRAME  # pylint: disable=global-statement
+    _SWEEP_FRAME = sweep_frame
+
+
+def score_directions(directions: np.ndarray, forward_returns: np.ndarray, valid: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Score trend directions (1 / -1, one column per parameter set) against the forward returns.
+    - accuracy: share of valid bars whose direction matches the sign of the forward return
+    - mean_return: average forward return when following the direction
+    """
+    directions = directions.reshape(len(forward_returns), -1)
+    mask = valid & ~np.isnan(forward_returns)
+    masked_directions = directions[mask]
+    masked_returns = forward_returns[mask]
+    signals = int(mask.sum())
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hits = (masked_directions == np.sign(masked_returns).astype(np.int8)[:, None]).sum(axis=0)
+        accuracy = hits / signals
+        mean_return = masked_returns @ masked_directions / signals
+
+    return {"accuracy": accuracy, "mean_return": mean_return, "signals": np.full(directions.shape[1], signals)}
+
+
+def _build_sweep_frame(data_frame: pd.DataFrame, atr_periods: Sequence[int], horizon: int) -> pd.DataFrame:
+    check_df_sorted(data_frame=data_frame)
+    check_enough_rows(data_frame=data_frame)
+
+    sweep_frame = data_frame[["date", "high", "low", "close"]].copy()
+    for atr_period in sorted(set(atr_periods)):
+        sweep_frame = DataFeatureAverageTrueRange(atr_period).add_feature(sweep_frame)
+
+    returns_feature = DataFeatureReturns(TradeDirection.LONG, horizon)
+    returns_column = returns_feature.get_columns()[0]
+    sweep_frame = returns_feature.add_feature(sweep_frame)
+    sweep_frame[_FORWARD_RETURN_COLUMN] = sweep_frame.pop(returns_column).shift(-horizon)
+
+    return sweep_frame
+
+
+def _sweep_super_trend_period(atr_period: int, factors: List[float]) -> pd.DataFrame:
+    sweep_frame = _SWEEP_FRAME
+    atr = sweep_frame[DataFeatureAverageTrueRange(atr_period).get_columns()[0]].to_numpy()
+
+    directions = super_trend_directions(
+        high=sweep_frame["high"].to_numpy(),
+        low=sweep_frame["low"].to_numpy(),
+        close=sweep_frame["close"].to_numpy(),
+        atr=atr,
+        factors=np.array(factors),
+    )
+    scores = score_directions(directions, sweep_frame[_FORWARD_RETURN_COLUMN].to_numpy(), ~np.isnan(atr))
+
+    return pd.DataFrame({"atr_period": atr_period, "factor": factors, **scores})
+
+
+def _sweep_adaptive_super_trend(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    feature = DataFeatureAdaptiveSuperTrend(**parameters)
+    st_column, direction_column = feature.get_columns()[:2]
+
+    # the shallow copy keeps the added columns out of the shared frame, the ATR column is reused
+    result = feature.add_feature(_SWEEP_FRAME.copy(deep=False))
+    if st_column not in result:
+        return {**parameters, "accuracy": np.nan, "mean_return": np.nan, "signals": 0}
+
+    directions = np.where(result[direction_column].to_numpy() == 1, 1, -1)
+    scores = score_directions(
+        directions, result[_FORWARD_RETURN_COLUMN].to_numpy(), ~np.isnan(result[st_column].to_numpy())
+    )
+
+    return {**parameters, **{name: values[0] for name, values in scores.items()}}
+
+
+def sweep_super_trend(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    data_frame: pd.DataFrame,
+    atr_periods: Sequence[int],
+    factors: Sequence[float],
+    horizon: int = 1,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Score every (atr_period, factor) SuperTrend by its directional accuracy on the `horizon` bar forward returns.
+    - Each ATR period is computed once and all factors are evolved together by the batched kernel
+    - ATR periods run in parallel, returns one row per parameter set sorted by accuracy
+    """
+    sweep_frame = _build_sweep_frame(data_frame, atr_periods, horizon)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(sweep_frame,)) as executor:
+        futures = [
+            executor.submit(_sweep_super_trend_period, atr_period, list(factors))
+            for atr_period in sorted(set(atr_periods))
+        ]
+        results = [future.result() for future in futures]
+
+    return pd.concat(results, ignore_index=True).sort_values(
+        "accuracy", ascending=False, kind="stable", ignore_index=True
+    )
+
+
+def sweep_adaptive_super_trend(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    data_frame: pd.DataFrame,
+    atr_periods: Sequence[int],
+    min_factors: Sequence[float],
+    max_factors: Sequence[float],
+    steps: Sequence[float],
+    perf_alphas: Sequence[float],
+    from_clusters: Sequence[str] = ("Best",),
+    horizon: int = 1,
+    max_data: int = 10000,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Score every Adaptive SuperTrend parameter combination by its directional accuracy on the forward returns.
+    - Each ATR period is computed once up front and shared by all combinations using it
+    - Combinations run in parallel, returns one row per parameter set sorted by accuracy
+    """
+    sweep_frame = _build_sweep_frame(data_frame, atr_periods, horizon)
+
+    grid = [
+        {
+            "atr_period": atr_period,
+            "min_factor": min_factor,
+            "max_factor": max_factor,
+            "step": step,
+            "perf_alpha": perf_alpha,
+            "from_cluster": from_cluster,
+            "max_data": max_data,
+        }
+        for atr_period, min_factor, max_factor, step, perf_alpha, from_cluster in itertools.product(
+            atr_periods, min_factors, max_factors, steps, perf_alphas, from_clusters
+        )
+        if min_factor <= max_factor
+    ]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(sweep_frame,)) as executor:
+        results = list(executor.map(_sweep_adaptive_super_trend, grid, chunksize=max(1, len(grid) // 64)))
+
+    return pd.DataFrame(results).sort_values("accuracy", ascending=False, kind="stable", ignore_index=True)
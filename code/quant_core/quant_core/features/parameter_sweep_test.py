@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.features.indicators.adaptive_super_trend import DataFeatureAdaptiveSuperTrend
+from quant_core.features.indicators.super_trend import DataFeatureSuperTrend
+from quant_core.features.kernels.super_trend_kernel import super_trend, super_trend_directions
+from quant_core.features.parameter_sweep import score_directions, sweep_adaptive_super_trend, sweep_super_trend
+from quant_core.utils.jit_utils import is_jit_available
+from quant_dev.builder import Builder
+
+
+def _accuracy(data_frame: pd.DataFrame, direction: pd.Series, valid: pd.Series, horizon: int) -> float:
+    forward_returns = data_frame["close"].pct_change(periods=horizon).shift(-horizon)
+    mask = valid & forward_returns.notna()
+
+    return float(((direction[mask] * forward_returns[mask]) > 0).mean())
+
+
+class TestParameterSweep:
+    @pytest.mark.parametrize("use_jit", [False, True] if is_jit_available() else [False])
+    def test_super_trend_directions_match_single_factor(self, use_jit: bool) -> None:
+        rng = np.random.default_rng(0)
+        close = 100 + rng.normal(size=2000).cumsum()
+        high, low = close + rng.random(2000), close - rng.random(2000)
+        atr = pd.Series(high - low).rolling(10).mean().to_numpy()
+        factors = np.arange(0.5, 5.5, 0.5)
+
+        directions = super_trend_directions(high, low, close, atr, factors, use_jit=use_jit)
+
+        for i, factor in enumerate(factors):
+            np.testing.assert_array_equal(directions[:, i], super_trend(high, low, close, atr, factor)[1])
+
+    def test_score_directions(self) -> None:
+        scores = score_directions(
+            np.array([[1, -1], [1, 1], [-1, -1], [1, 1]]),
+            np.array([0.1, -0.2, 0.3, np.nan]),
+            np.array([True, True, True, True]),
+        )
+
+        np.testing.assert_allclose(scores["accuracy"], [1 / 3, 0])
+        np.testing.assert_allclose(scores["mean_return"], [-0.4 / 3, -0.6 / 3])
+        np.testing.assert_array_equal(scores["signals"], [3, 3])
+
+    def test_sweep_super_trend(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1500, seed=4)
+
+        result = sweep_super_trend(data_frame, atr_periods=[7, 14], factors=[1.0, 2.0, 3.0], horizon=3, max_workers=2)
+
+        assert len(result) == 6
+        assert result["accuracy"].is_monotonic_decreasing
+        for row in result.itertuples():
+            feature = DataFeatureSuperTrend(row.factor, row.atr_period)
+            features = feature.add_feature(data_frame.copy())
+            valid = features[f"atr_{row.atr_period}"].notna()
+            expected = _accuracy(data_frame, features[feature.get_columns()[1]], valid, horizon=3)
+            assert row.accuracy == pytest.approx(expected)
+
+    def test_sweep_adaptive_super_trend(self) -> None:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=1500, seed=5)
+
+        result = sweep_adaptive_super_trend(
+            data_frame,
+            atr_periods=[10],
+            min_factors=[1.0],
+            max_factors=[3.0, 5.0],
+            steps=[0.5],
+            perf_alphas=[10.0],
+            max_data=1000,
+            max_workers=2,
+        )
+
+        assert len(result) == 2
+        for row in result.itertuples():
+            feature = DataFeatureAdaptiveSuperTrend(
+                atr_period=10, min_factor=1.0, max_factor=row.max_factor, step=0.5, max_data=1000
+            )
+            st_column, direction_column = feature.get_columns()[:2]
+            features = feature.add_feature(data_frame.copy())
+            direction = features[direction_column].map({1: 1, 0: -1})
+            expected = _accuracy(data_frame, direction, features[st_column].notna(), horizon=1)
+            assert row.accuracy == pytest.approx(expected)
@@ -6,7 +6,7 @@ from quant_core.features.feature import DataFeature
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows
 
 
-class DataFeatureDrawDownAndUp(DataFeature):
+class DataFeatureDrawDownAndUp(DataFeature):  # pylint: disable=abstract-method
     """Data Feature for calculating draw down and draw up values."""
 
     def __init__(
@@ -8,7 +8,7 @@ from quant_core.features.performance.returns import DataFeatureReturns
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows, get_data_frame_period
 
 
-class DataFeatureSharpeRatio(DataFeature):
+class DataFeatureSharpeRatio(DataFeature):  # pylint: disable=abstract-method
     """Data Feature for calculating the Sharpe Ratio."""
 
     def __init__(
@@ -46,10 +46,12 @@ class DataFeatureSharpeRatio(DataFeature):
         data_frame = return_feature.add_feature(data_frame)
         return_column = return_feature.get_columns()[0]
 
-        data_frame[sharpe_column] = np.nan
+        # the values are collected in an array and written once, an OhlcvFrame has no label based setters
+        returns = data_frame[return_column]
+        sharpe_values = np.full(len(data_frame), np.nan)
         for i in range(self._rolling_window_bars - 1, len(data_frame)):
             start_idx = i - (self._rolling_window_bars - 1)
-            window_rets = data_frame[return_column].iloc[start_idx : i + 1].dropna()
+            window_rets = returns.iloc[start_idx : i + 1].dropna()
             if len(window_rets) < 2:
                 continue
 
@@ -66,9 +68,9 @@ class DataFeatureSharpeRatio(DataFeature):
                 annual_std = std_return * np.sqrt(annual_factor)
                 sharpe_val = (annual_mean - self._annual_risk_free_percent) / annual_std
 
-            data_frame.at[data_frame.index[i], sharpe_column] = sharpe_val
+            sharpe_values[i] = sharpe_val
 
-        data_frame.loc[data_frame.index[: self._rolling_window_bars - 1], sharpe_column] = np.nan
+        data_frame[sharpe_column] = sharpe_values
 
         return data_frame
 
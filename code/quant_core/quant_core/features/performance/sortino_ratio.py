@@ -8,7 +8,7 @@ from quant_core.features.performance.returns import DataFeatureReturns
 from quant_core.utils.chart_utils import check_df_sorted, check_enough_rows, get_data_frame_period
 
 
-class DataFeatureSortinoRatio(DataFeature):
+class DataFeatureSortinoRatio(DataFeature):  # pylint: disable=abstract-method
     """Data Feature for Sortino Ratio."""
 
     def __init__(
@@ -47,23 +47,21 @@ class DataFeatureSortinoRatio(DataFeature):
         data_frame = return_feature.add_feature(data_frame)
         return_column = return_feature.get_columns()[0]
 
-        data_frame[sortino_column] = np.nan
-
+        returns = data_frame[return_column]
+        sortino_values = np.full(len(data_frame), np.nan)
         for i in range(self._rolling_window_bars - 1, len(data_frame)):
             start_idx = i - (self._rolling_window_bars - 1)
-            window_rets = data_frame[return_column].iloc[start_idx : i + 1].dropna()
+            window_rets = returns.iloc[start_idx : i + 1].dropna()
             if len(window_rets) < self._rolling_window_bars:
                 continue
 
             mean_return = window_rets.mean()
             neg_rets = window_rets[window_rets < 0]
             if len(neg_rets) == 0:
-                data_frame.at[data_frame.index[i], sortino_column] = np.nan
                 continue
 
             neg_std = neg_rets.std()
             if np.isnan(neg_std) or neg_std == 0:
-                data_frame.at[data_frame.index[i], sortino_column] = np.nan
                 continue
 
             total_minutes = len(window_rets) * time_period.value
@@ -71,8 +69,9 @@ class DataFeatureSortinoRatio(DataFeature):
             annual_factor = 1.0 / fractional_years if fractional_years != 0 else np.nan
             annual_mean = mean_return * annual_factor
             annual_neg_std = neg_std * np.sqrt(annual_factor)
-            sortino_val = (annual_mean - self._annual_risk_free_percent) / annual_neg_std
-            data_frame.at[data_frame.index[i], sortino_column] = sortino_val
+            sortino_values[i] = (annual_mean - self._annual_risk_free_percent) / annual_neg_std
+
+        data_frame[sortino_column] = sortino_values
 
         return data_frame
 
@@ -1,13 +1,29 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from quant_core.enums.trade_direction import TradeDirection
 from quant_core.enums.trade_event_type import TradeEventType
 from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
 from quant_core.services.core_logger import CoreLogger
 
+BALANCE_COLUMNS = ["initial_balance", "absolute_balance", "initial_balance_pct", "relative_balance"]
 
-class AccountBalanceOverTime(TradeMetricOverTime):
+
+@dataclass
+class AccountBalanceState:
+    """Running balances of `AccountBalanceOverTime`, enough to append new trades without the history."""
+
+    groups: List[str]
+    group_by_account_id: bool
+    initial_balances: Dict[str, float]
+    last_closed_at: Dict[str, pd.Timestamp]
+    cumulative_nets: pd.DataFrame
+    frame: pd.DataFrame
+
+
+class AccountBalanceOverTime(TradeMetricOverTime):  # pylint: disable=abstract-method
     """Account Balance Over Time (Absolute Value)."""
 
     def calculate(  # pylint: disable=too-many-arguments, too-many-positional-arguments
@@ -20,9 +36,12 @@ class AccountBalanceOverTime(TradeMetricOverTime):
         group_by_hour: bool = False,
         group_by_weekday: bool = False,
         rolling_window: Optional[int] = 1,
+        max_workers: Optional[int] = None,
     ) -> pd.DataFrame:
         if rolling_window != 1:
             CoreLogger().warning("Rolling window days is not supported for the Account Balance Metric. Ignoring it.")
+        if max_workers:
+            CoreLogger().warning("Parallel calculation is not supported for the Account Balance Metric. Ignoring it.")
 
         groups = self.groups(
             group_by_account_id=group_by_account_id,
@@ -32,37 +51,154 @@ class AccountBalanceOverTime(TradeMetricOverTime):
             group_by_hour=group_by_hour,
             group_by_weekday=group_by_weekday,
         )
+        balance_df = self._get_balance_rows(self._prepare(data_frame, groups, group_by_account_id), groups)
+
+        return self._to_frame(balance_df, groups)
+
+    def _prepare(self, data_frame: pd.DataFrame, groups: List[str], group_by_account_id: bool) -> pd.DataFrame:
         balance_df = self._normalize_time(data_frame)
 
         if not all(group in balance_df.columns for group in groups):
             raise ValueError(f"Some group columns are missing in the DataFrame: {groups}")
 
-        balance_df = self.set_initial_balances(balance_df, group_by_account_id)
+        return self.set_initial_balances(balance_df, group_by_account_id)
 
+    @staticmethod
+    def _to_frame(balance_df: pd.DataFrame, groups: List[str], stable: bool = False) -> pd.DataFrame:
+        balance_df = balance_df.sort_values("closed_at", kind="stable" if stable else "quicksort")
+
+        return balance_df[["closed_at"] + groups + BALANCE_COLUMNS]
+
+    @staticmethod
+    def _get_balance_rows(
+        balance_df: pd.DataFrame, groups: List[str], offsets: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Running balance of every trade in (account, close time) order.
+        - `offsets` (groups + net) continue the cumulative net of the groups, they are summed first and dropped
+        """
         balance_df["net"] = balance_df["profit"] + balance_df["commission"] + balance_df["swap"]
         balance_df = balance_df.sort_values(by=["account_id", "closed_at"]).reset_index(drop=True)
         balance_df = balance_df[balance_df["direction"] != TradeDirection.NEUTRAL.value]
 
+        skip_rows = 0
+        if offsets is not None and not offsets.empty:
+            skip_rows = len(offsets)
+            balance_df = pd.concat([offsets.assign(event=np.nan), balance_df])
+
         if groups:
             balance_df["cumulative_net"] = (
                 balance_df.where(balance_df["event"] != TradeEventType.DEPOSIT.value)
-                .groupby(groups)["net"]
+                .groupby(groups, observed=True)["net"]
                 .cumsum()
                 .fillna(0.0)
             )
-            balance_df["absolute_balance"] = balance_df["initial_balance"] + balance_df["cumulative_net"]
         else:
-            balance_df["absolute_balance"] = (
-                balance_df["initial_balance"]
-                + balance_df.where(balance_df["event"] != TradeEventType.DEPOSIT.value)["net"].cumsum()
-            )
+            balance_df["cumulative_net"] = balance_df.where(balance_df["event"] != TradeEventType.DEPOSIT.value)[
+                "net"
+            ].cumsum()
+        balance_df = balance_df.iloc[skip_rows:].copy()
+
+        balance_df["absolute_balance"] = balance_df["initial_balance"] + balance_df["cumulative_net"]
         balance_df["relative_balance"] = (
             1 + (balance_df["absolute_balance"] - balance_df["initial_balance"]) / balance_df["initial_balance"]
         ) * 100
         balance_df["initial_balance_pct"] = 100
 
-        balance_df.sort_values("closed_at", inplace=True)
+        return balance_df
+
+    @staticmethod
+    def _get_cumulative_nets(balance_df: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
+        """The last cumulative net of every group (groups + net), the offsets to continue the balances from."""
+        trades = balance_df[balance_df["event"] != TradeEventType.DEPOSIT.value]
+        if groups:
+            return trades.groupby(groups, observed=True)["cumulative_net"].last().rename("net").reset_index()
+
+        cumulative_net = trades["cumulative_net"].dropna()
+        return pd.DataFrame({"net": cumulative_net.iloc[-1:].to_numpy()})
+
+    def init_state(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        data_frame: pd.DataFrame,
+        group_by_account_id: bool = True,
+        group_by_symbol: bool = False,
+        group_by_asset_type: bool = False,
+        group_by_direction: bool = False,
+        group_by_hour: bool = False,
+        group_by_weekday: bool = False,
+        rolling_window: Optional[int] = 1,
+    ) -> AccountBalanceState:
+        groups = self.groups(
+            group_by_account_id=group_by_account_id,
+            group_by_symbol=group_by_symbol,
+            group_by_asset_type=group_by_asset_type,
+            group_by_direction=group_by_direction,
+            group_by_hour=group_by_hour,
+            group_by_weekday=group_by_weekday,
+        )
+        balance_df = self._prepare(data_frame, groups, group_by_account_id)
+        initial_balances = self._get_initial_balances(balance_df)
+        last_closed_at = balance_df.groupby("account_id", observed=True)["closed_at"].max().to_dict()
+        balance_df = self._get_balance_rows(balance_df, groups)
+
+        return AccountBalanceState(
+            groups=groups,
+            group_by_account_id=group_by_account_id,
+            initial_balances=initial_balances,
+            last_closed_at=last_closed_at,
+            cumulative_nets=self._get_cumulative_nets(balance_df, groups),
+            frame=self._to_frame(balance_df, groups),
+        )
+
+    def update(self, state: AccountBalanceState, new_trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        Append the balances of new trades, which have to close after the known trades of their account.
+        - New deposits change the initial balances and trades of several accounts share one running balance without
+          the account group, both raise a ValueError
+        """
+        new_df = self._normalize_time(new_trades)
+        if not all(group in new_df.columns for group in state.groups):
+            raise ValueError(f"Some group columns are missing in the DataFrame: {state.groups}")
+        if (new_df["event"] == TradeEventType.DEPOSIT.value).any():
+            raise ValueError("New deposits change the initial balances, the state has to be rebuilt.")
+        if new_df["closed_at"].isna().any():
+            raise ValueError("Only closed trades can be added to the balance.")
+
+        accounts = set(state.last_closed_at) | set(new_df["account_id"])
+        if "account_id" not in state.groups and len(accounts) > 1:
+            raise ValueError("Without the account group all accounts share one balance, the state has to be rebuilt.")
+
+        last_closed_at = new_df["account_id"].map(state.last_closed_at).astype(new_df["closed_at"].dtype)
+        if (new_df["closed_at"] <= last_closed_at).any():
+            raise ValueError("New trades have to close after the known trades of their account.")
+
+        if state.group_by_account_id:
+            new_df["initial_balance"] = new_df["account_id"].map(state.initial_balances).astype(np.float64).fillna(0.0)
+        else:
+            new_df["initial_balance"] = sum(state.initial_balances.values())
+
+        balance_df = self._get_balance_rows(new_df, state.groups, offsets=state.cumulative_nets)
+        balance_df.index = pd.RangeIndex(len(state.frame), len(state.frame) + len(balance_df))
+
+        state.last_closed_at.update(new_df.groupby("account_id", observed=True)["closed_at"].max().to_dict())
+        cumulative_nets = pd.concat([state.cumulative_nets, self._get_cumulative_nets(balance_df, state.groups)])
+        state.cumulative_nets = (
+            cumulative_nets.drop_duplicates(subset=state.groups, keep="last") if state.groups else cumulative_nets[-1:]
+        ).reset_index(drop=True)
+        state.frame = self._merge_frame(state.frame, self._to_frame(balance_df, state.groups, stable=True))
+
+        return state.frame
+
+    @staticmethod
+    def _merge_frame(frame: pd.DataFrame, new_frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge the new rows into the frame, both sorted by close time.
+        - Only the rows of the frame closing after the first new row are sorted again, usually none of them
+        """
+        if new_frame.empty:
+            return frame
+
+        start = frame["closed_at"].searchsorted(new_frame["closed_at"].iloc[0], side="right")
+        tail = pd.concat([frame.iloc[start:], new_frame]).sort_values("closed_at", kind="stable")
 
-        return balance_df[
-            ["closed_at"] + groups + ["initial_balance", "absolute_balance", "initial_balance_pct", "relative_balance"]
-        ]
+        return pd.concat([frame.iloc[:start], tail])
@@ -2,6 +2,7 @@
 from typing import Dict, Union
 
 import numpy as np
+import pandas as pd
 import pytest
 from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
 from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
@@ -7674,3 +7675,73 @@ class TestAccountBalanceOverTimeAbsolute:
         assert actual_relative_result == expected_relative_result
         assert len(actual_absolute_result) == len(expected_absolute_result)
         assert len(actual_relative_result) == len(expected_relative_result)
+
+
+def _get_unique_close_history() -> pd.DataFrame:
+    # tied close times are ordered by an unstable sort, unique ones keep the running balances comparable row by row
+    data_frame = Builder.get_trade_history()
+    return data_frame.drop_duplicates("closed_at").reset_index(drop=True)
+
+
+class TestAccountBalanceOverTimeIncremental:
+    @pytest.mark.parametrize(
+        "group_by_account_id,group_by_symbol,group_by_direction", [(True, False, False), (True, True, True)]
+    )
+    def test_updates_match_the_full_calculation(
+        self, group_by_account_id: bool, group_by_symbol: bool, group_by_direction: bool
+    ) -> None:
+        data_frame = _get_unique_close_history()
+        closed_at = pd.to_datetime(data_frame["closed_at"])
+        first_cut, second_cut = closed_at.quantile(0.6), closed_at.quantile(0.8)
+        flags = {
+            "group_by_account_id": group_by_account_id,
+            "group_by_symbol": group_by_symbol,
+            "group_by_direction": group_by_direction,
+        }
+        metric = AccountBalanceOverTime()
+
+        state = metric.init_state(data_frame[closed_at <= first_cut], **flags)
+        metric.update(state, data_frame[(closed_at > first_cut) & (closed_at <= second_cut)])
+        result = metric.update(state, data_frame[closed_at > second_cut])
+
+        expected = metric.calculate(data_frame, **flags)
+        order = ["closed_at"] + TradeMetricOverTime.groups(
+            group_by_account_id, group_by_symbol, False, False, False, False
+        )
+        pd.testing.assert_frame_equal(
+            result.sort_values(order).reset_index(drop=True), expected.sort_values(order).reset_index(drop=True)
+        )
+
+    def test_new_trades_are_merged_by_close_time(self) -> None:
+        data_frame = _get_unique_close_history()
+        closed_at = pd.to_datetime(data_frame["closed_at"])
+        is_first_account = data_frame["account_id"] == data_frame["account_id"].iloc[0]
+        # the other accounts were synced less recently, their new trades close before the known ones of the first
+        known = np.where(is_first_account, closed_at <= closed_at.quantile(0.8), closed_at <= closed_at.quantile(0.6))
+        metric = AccountBalanceOverTime()
+
+        state = metric.init_state(data_frame[known])
+        result = metric.update(state, data_frame[~known])
+
+        expected = metric.calculate(data_frame)
+        assert result["closed_at"].is_monotonic_increasing
+        pd.testing.assert_frame_equal(
+            result.sort_values(["closed_at", "account_id"]).reset_index(drop=True),
+            expected.sort_values(["closed_at", "account_id"]).reset_index(drop=True),
+        )
+
+    def test_trades_which_can_not_be_appended_raise(self) -> None:
+        data_frame = _get_unique_close_history()
+        closed_at = pd.to_datetime(data_frame["closed_at"])
+        cut = closed_at.quantile(0.6)
+        metric = AccountBalanceOverTime()
+
+        state = metric.init_state(data_frame[closed_at <= cut])
+        with pytest.raises(ValueError):
+            metric.update(state, data_frame[closed_at <= cut].tail(1))
+        with pytest.raises(ValueError):
+            metric.update(state, data_frame[data_frame["event"] == 0])
+
+        ungrouped_state = metric.init_state(data_frame[closed_at <= cut], group_by_account_id=False)
+        with pytest.raises(ValueError):
+            metric.update(ungrouped_state, data_frame[closed_at > cut])
@@ -0,0 +1,113 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_core.services.core_logger import CoreLogger
+
+DRAWDOWN_COLUMNS = [
+    "absolute_balance",
+    "peak_balance",
+    "drawdown",
+    "drawdown_pct",
+    "max_drawdown_pct",
+    "time_under_water",
+    "recovery_time",
+]
+
+
+class DrawdownOverTime(TradeMetricOverTime):  # pylint: disable=abstract-method
+    """
+    Drawdown of the account balance over time, on the rows of `AccountBalanceOverTime`.
+    - The running peak starts at the initial balance, drawdown / drawdown_pct are the loss from it (<= 0)
+    - max_drawdown_pct is the deepest drawdown so far
+    - time_under_water is the time since the last peak (since the first trade while below the initial balance)
+    - recovery_time is set on the trades which reach the peak again, the time the recovery took
+    """
+
+    def calculate(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        data_frame: pd.DataFrame,
+        group_by_account_id: bool = True,
+        group_by_symbol: bool = False,
+        group_by_asset_type: bool = False,
+        group_by_direction: bool = False,
+        group_by_hour: bool = False,
+        group_by_weekday: bool = False,
+        rolling_window: Optional[int] = 1,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        if rolling_window != 1:
+            CoreLogger().warning("Rolling window days is not supported for the Drawdown Metric. Ignoring it.")
+        if max_workers:
+            CoreLogger().warning("Parallel calculation is not supported for the Drawdown Metric. Ignoring it.")
+
+        groups = self.groups(
+            group_by_account_id=group_by_account_id,
+            group_by_symbol=group_by_symbol,
+            group_by_asset_type=group_by_asset_type,
+            group_by_direction=group_by_direction,
+            group_by_hour=group_by_hour,
+            group_by_weekday=group_by_weekday,
+        )
+        balance_df = AccountBalanceOverTime().calculate(
+            data_frame,
+            group_by_account_id=group_by_account_id,
+            group_by_symbol=group_by_symbol,
+            group_by_asset_type=group_by_asset_type,
+            group_by_direction=group_by_direction,
+            group_by_hour=group_by_hour,
+            group_by_weekday=group_by_weekday,
+        )
+
+        return self.get_drawdowns(balance_df, groups)
+
+    @staticmethod
+    def get_drawdowns(balance_df: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
+        """
+        Add the drawdown columns to balance rows (closed_at, groups, initial_balance, absolute_balance).
+        - Every column is a cumulative group-by on the rows in close time order, O(n) for all groups at once
+        """
+        drawdown_df = balance_df[["closed_at"] + groups].copy()
+        if balance_df.empty:
+            return drawdown_df.reindex(columns=["closed_at"] + groups + DRAWDOWN_COLUMNS)
+
+        balance = balance_df["absolute_balance"]
+        closed_at = pd.to_datetime(balance_df["closed_at"])
+        keys = [balance_df[group] for group in groups] or [pd.Series(0, index=balance_df.index)]
+        grouped = balance_df.groupby(keys, sort=False, dropna=False, observed=True)
+
+        peak = np.maximum(grouped["absolute_balance"].cummax(), balance_df["initial_balance"])
+        drawdown = balance - peak
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drawdown_pct = pd.Series(np.where(peak > 0, drawdown / peak * 100, 0.0), index=balance_df.index)
+
+        # the initial balance is the peak until the first new one, it is reached with the deposit before all trades
+        is_peak = drawdown >= 0
+        peak_time = closed_at.where(is_peak).groupby(keys, sort=False, dropna=False, observed=True).ffill()
+        peak_time = peak_time.fillna(
+            closed_at.groupby(keys, sort=False, dropna=False, observed=True).transform("first")
+        )
+        previous = pd.DataFrame({"is_peak": is_peak, "peak_time": peak_time}).groupby(
+            keys, sort=False, dropna=False, observed=True
+        )
+        was_under_water = ~previous["is_peak"].shift(fill_value=True).astype(bool)
+
+        drawdown_df["absolute_balance"] = balance
+        drawdown_df["peak_balance"] = peak
+        drawdown_df["drawdown"] = drawdown
+        drawdown_df["drawdown_pct"] = drawdown_pct
+        drawdown_df["max_drawdown_pct"] = drawdown_pct.groupby(keys, sort=False, dropna=False, observed=True).cummin()
+        drawdown_df["time_under_water"] = closed_at - peak_time
+        drawdown_df["recovery_time"] = (closed_at - previous["peak_time"].shift()).where(is_peak & was_under_water)
+
+        return drawdown_df
+
+    @staticmethod
+    def get_latest(drawdown_df: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
+        """The last row of every group, e.g. to check the current and maximum drawdown against prop firm limits."""
+        if not groups:
+            return drawdown_df.iloc[-1:].reset_index(drop=True)
+
+        return drawdown_df.groupby(groups, sort=True, dropna=False, observed=True).tail(1).reset_index(drop=True)
@@ -0,0 +1,90 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
+from quant_core.metrics.drawdown_over_time.drawdown import DRAWDOWN_COLUMNS, DrawdownOverTime
+from quant_dev.builder import Builder
+
+
+def _expected(balance_df: pd.DataFrame) -> pd.DataFrame:
+    """Drawdowns of one group, one trade at a time."""
+    rows = []
+    peak, peak_time = balance_df["initial_balance"].iloc[0], balance_df["closed_at"].iloc[0]
+    max_drawdown_pct, under_water_since = 0.0, None
+    for _, row in balance_df.iterrows():
+        recovery_time = pd.NaT
+        if row["absolute_balance"] >= peak:
+            if under_water_since is not None:
+                recovery_time = row["closed_at"] - under_water_since
+            peak, peak_time, under_water_since = row["absolute_balance"], row["closed_at"], None
+        elif under_water_since is None:
+            under_water_since = peak_time
+        drawdown_pct = (row["absolute_balance"] - peak) / peak * 100
+        max_drawdown_pct = min(max_drawdown_pct, drawdown_pct)
+        rows.append((peak, drawdown_pct, max_drawdown_pct, row["closed_at"] - peak_time, recovery_time))
+
+    return pd.DataFrame(
+        rows,
+        columns=["peak_balance", "drawdown_pct", "max_drawdown_pct", "time_under_water", "recovery_time"],
+        index=balance_df.index,
+    )
+
+
+class TestDrawdownOverTime:
+    @pytest.mark.parametrize("groups", [[], ["account_id"], ["account_id", "symbol"]])
+    def test_drawdowns_match_a_running_calculation(self, groups: List[str]) -> None:
+        data_frame = Builder.get_trade_history()
+        if not groups:
+            data_frame = data_frame[data_frame["account_id"] == data_frame["account_id"].iloc[0]]
+        flags = {"group_by_account_id": "account_id" in groups, "group_by_symbol": "symbol" in groups}
+
+        drawdown_df = DrawdownOverTime().calculate(data_frame, **flags)
+
+        balance_df = AccountBalanceOverTime().calculate(data_frame, **flags)
+        assert list(drawdown_df.columns) == ["closed_at"] + groups + DRAWDOWN_COLUMNS
+        pd.testing.assert_index_equal(drawdown_df.index, balance_df.index)
+        grouped = balance_df.groupby(groups) if groups else [(None, balance_df)]
+        expected = pd.concat([_expected(group_df) for _, group_df in grouped]).loc[balance_df.index]
+        for column in ["peak_balance", "drawdown_pct", "max_drawdown_pct"]:
+            np.testing.assert_allclose(drawdown_df[column], expected[column], rtol=1e-12)
+        for column in ["time_under_water", "recovery_time"]:
+            pd.testing.assert_series_equal(drawdown_df[column], pd.to_timedelta(expected[column]), check_names=False)
+
+    def test_peak_starts_at_the_initial_balance(self) -> None:
+        balance_df = pd.DataFrame(
+            {
+                "closed_at": pd.to_datetime(["2025-01-01", "2025-01-02", "2025-01-04", "2025-01-05"]),
+                "initial_balance": 100.0,
+                "absolute_balance": [90.0, 95.0, 100.0, 80.0],
+            }
+        )
+
+        drawdown_df = DrawdownOverTime.get_drawdowns(balance_df, [])
+
+        assert list(drawdown_df["peak_balance"]) == [100.0, 100.0, 100.0, 100.0]
+        assert list(drawdown_df["drawdown_pct"]) == [-10.0, -5.0, 0.0, -20.0]
+        assert list(drawdown_df["max_drawdown_pct"]) == [-10.0, -10.0, -10.0, -20.0]
+        assert list(drawdown_df["time_under_water"].dt.days) == [0, 1, 0, 1]
+        assert drawdown_df["recovery_time"].iloc[2] == pd.Timedelta(days=3)
+        assert drawdown_df["recovery_time"].drop(index=2).isna().all()
+
+    def test_latest_drawdown_per_account(self) -> None:
+        drawdown_df = DrawdownOverTime().calculate(Builder.get_trade_history())
+
+        latest_df = DrawdownOverTime.get_latest(drawdown_df, ["account_id"])
+
+        assert list(latest_df["account_id"]) == sorted(drawdown_df["account_id"].unique())
+        for _, row in latest_df.iterrows():
+            account_df = drawdown_df[drawdown_df["account_id"] == row["account_id"]]
+            assert row["closed_at"] == account_df["closed_at"].iloc[-1]
+            assert row["max_drawdown_pct"] == account_df["drawdown_pct"].min()
+
+    def test_no_trades(self) -> None:
+        balance_df = pd.DataFrame(columns=["closed_at", "account_id", "initial_balance", "absolute_balance"])
+
+        drawdown_df = DrawdownOverTime.get_drawdowns(balance_df, ["account_id"])
+
+        assert drawdown_df.empty
+        assert list(drawdown_df.columns) == ["closed_at", "account_id"] + DRAWDOWN_COLUMNS
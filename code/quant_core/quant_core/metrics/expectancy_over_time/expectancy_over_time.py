@@ -1,14 +1,16 @@
-from typing import Optional
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 from quant_core.enums.trade_event_type import TradeEventType
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_core.metrics.metric_partitions import calculate_partitioned
+from quant_core.metrics.trade_metric_over_time import RollingWindowBounds, TradeMetricOverTime
 
 
-class ExpectancyOverTime(TradeMetricOverTime):
+class ExpectancyOverTime(TradeMetricOverTime):  # pylint: disable=abstract-method
     """Calculates the expectancy over time for each account."""
 
-    def calculate(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+    def calculate(  # pylint: disable=too-many-arguments, too-many-positional-arguments
         self,
         data_frame: pd.DataFrame,
         group_by_account_id: bool = True,
@@ -18,6 +20,7 @@ class ExpectancyOverTime(TradeMetricOverTime):
         group_by_hour: bool = False,
         group_by_weekday: bool = False,
         rolling_window: Optional[int] = 30,
+        max_workers: Optional[int] = None,
     ) -> pd.DataFrame:
         data_frame = data_frame.copy()
 
@@ -37,48 +40,47 @@ class ExpectancyOverTime(TradeMetricOverTime):
         if not all(group in data_frame.columns for group in groups):
             raise ValueError(f"Some group columns are missing in the DataFrame: {groups}")
 
-        self.set_initial_balances(data_frame=data_frame, group_by_account_id=group_by_account_id)
-
-        expectancy_window_results = []
-        for current_day, window_df in self.get_rolling_windows(
-            data_frame, skip_head=True, rolling_window=rolling_window
-        ).items():
-            if groups:
-                grouped = window_df.groupby(groups)
-            else:
-                grouped = [((None,), window_df)]
-
-            for group_name, group_df in grouped:
-                window_result = self._calculate_group_expectancy(group_df, current_day, groups, group_name)
-                expectancy_window_results.append(window_result)
-
-        return pd.DataFrame(expectancy_window_results)
-
-    def _calculate_group_expectancy(
-        self,
-        group_df: pd.DataFrame,
-        current_day: pd.Timestamp,
-        group_keys: list[str],
-        group_name: tuple,
-    ) -> dict:
-        group_df = group_df[group_df["event"] != TradeEventType.DEPOSIT.value]
-        winning_trades = group_df[group_df["profit"] > 0]
-        losing_trades = group_df[group_df["profit"] < 0]
+        bounds = self.get_rolling_window_bounds(
+            data_frame, skip_head=True, rolling_window=rolling_window, normalized=True
+        )
+        if max_workers:
+            return calculate_partitioned(self, bounds, groups, rolling_window, max_workers)
 
-        win_rate = len(winning_trades) / len(group_df) if len(group_df) > 0 else 0.0
-        avg_win = winning_trades["profit"].mean() if not winning_trades.empty else 0.0
-        avg_loss = abs(losing_trades["profit"].mean()) if not losing_trades.empty else 0.0
+        return self.calculate_from_bounds(bounds, groups, rolling_window)
 
-        expectancy = (win_rate * avg_win) - ((1 - win_rate) * avg_loss)
-        initial_balance = group_df["initial_balance"].iloc[0] if not group_df.empty else None
+    def calculate_from_bounds(  # pylint: disable=too-many-locals
+        self, bounds: RollingWindowBounds, groups: List[str], rolling_window: int
+    ) -> pd.DataFrame:
+        # shallow copy, the bounds may be shared with other metrics
+        trades = self.set_initial_balances(
+            bounds.data_frame.copy(deep=False), group_by_account_id="account_id" in groups
+        )
+        profit = trades["profit"].to_numpy(dtype=np.float64)
+        is_trade = (trades["event"] != TradeEventType.DEPOSIT.value).to_numpy()
+        is_win = is_trade & (profit > 0)
+        is_loss = is_trade & (profit < 0)
+
+        aggregates = self.get_rolling_aggregates(
+            bounds,
+            groups,
+            {
+                "trades": is_trade,
+                "wins": is_win,
+                "win_profit": np.where(is_win, profit, np.nan),
+                "losses": is_loss,
+                "loss_profit": np.where(is_loss, profit, np.nan),
+            },
+        )
+        sums = aggregates.sums
 
-        result = {
-            "time": current_day,
-            "expectancy": round(expectancy, 2),
-            "expectancy_pct": round(expectancy, 2) / initial_balance if initial_balance else 0.0,
-        }
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = np.where(sums["trades"] > 0, sums["wins"] / sums["trades"], 0.0)
+            avg_win = np.where(sums["wins"] > 0, sums["win_profit"] / sums["wins"], 0.0)
+            avg_loss = np.where(sums["losses"] > 0, np.abs(sums["loss_profit"] / sums["losses"]), 0.0)
+            expectancy = np.round(win_rate * avg_win - (1 - win_rate) * avg_loss, 2)
 
-        for i, key in enumerate(group_keys):
-            result[key] = group_name[i]
+            # the initial balance is constant per group, so the one of its first trade is used
+            initial_balance = trades["initial_balance"].to_numpy(dtype=np.float64)[aggregates.group_rows]
+            expectancy_pct = np.where((sums["trades"] > 0) & (initial_balance != 0), expectancy / initial_balance, 0.0)
 
-        return result
+        return aggregates.to_frame({"expectancy": expectancy, "expectancy_pct": expectancy_pct})
@@ -1,5 +1,14 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class FeesOverTime(TradeMetricOverTime):
-    """Calculates the total commission over time."""
+class FeesOverTime(RollingTradeMetricOverTime):
+    """Calculates the total commission (and swap) paid over time, as booked (usually negative)."""
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+
+        return aggregates.to_frame(
+            {"commission": sums["commission"], "swap": sums["swap"], "fees": sums["commission"] + sums["swap"]}
+        )
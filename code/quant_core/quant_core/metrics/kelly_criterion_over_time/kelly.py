@@ -1,5 +1,24 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import numpy as np
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class KellyCriterionPerAccountOverTime(TradeMetricOverTime):  # pylint: disable=too-few-public-methods
-    """Calculate Kelly Criterion per account."""
+class KellyCriterionPerAccountOverTime(RollingTradeMetricOverTime):
+    """
+    Calculate Kelly Criterion per account.
+    - kelly = win_rate - (1 - win_rate) / (average win / average loss), as a fraction of the balance
+    - NaN for windows without wins or without losses
+    """
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = sums["wins"] / sums["trades"]
+            payoff_ratio = (sums["gross_profit"] / sums["wins"]) / (-sums["gross_loss"] / sums["losses"])
+            kelly = np.where(
+                (sums["wins"] > 0) & (sums["losses"] > 0), win_rate - (1 - win_rate) / payoff_ratio, np.nan
+            )
+
+        return aggregates.to_frame({"kelly": kelly})
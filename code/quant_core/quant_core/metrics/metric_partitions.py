@@ -0,0 +1,193 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.metrics.trade_metric_over_time import RollingWindowBounds, TradeMetricOverTime
+
+
+@dataclass
+class _SharedColumn:
+    """Location of one column in the shared block, object / categorical columns are stored as codes."""
+
+    name: str
+    offset: int
+    dtype: str
+    categories: Optional[List[Any]] = None
+    is_categorical: bool = False
+
+
+@dataclass
+class _Partition:
+    """The key values of a partition, its rows [start, end) and the shared context rows [context_start, length)."""
+
+    values: List[Any]
+    start: int
+    end: int
+    context_start: int
+    length: int
+
+
+def _get_partitions(keys: pd.Series, partitions: int) -> List[List[Any]]:
+    """Split the key values into `partitions` lists with about the same number of trades, largest keys first."""
+    counts = keys.value_counts(sort=False)
+    counts = counts.iloc[np.lexsort((np.arange(len(counts)), -counts.to_numpy()))]
+
+    bins: List[List[Any]] = [[] for _ in range(min(partitions, len(counts)))]
+    sizes = np.zeros(len(bins), dtype=np.int64)
+    for value, count in counts.items():
+        smallest = int(np.argmin(sizes))
+        bins[smallest].append(value)
+        sizes[smallest] += count
+
+    return bins
+
+
+def _write_columns(data_frame: pd.DataFrame, memory: SharedMemory, columns: List[_SharedColumn]) -> None:
+    for column in columns:
+        values = data_frame[column.name]
+        if column.categories is not None:
+            array = pd.Categorical(values, categories=column.categories).codes.astype(np.int64)
+        else:
+            array = values.to_numpy()
+        np.ndarray(len(array), dtype=column.dtype, buffer=memory.buf, offset=column.offset)[:] = array
+
+
+def _read_columns(memory: SharedMemory, columns: List[_SharedColumn], length: int, rows: np.ndarray) -> pd.DataFrame:
+    data = {}
+    for column in columns:
+        # fancy indexing copies out of the shared block, so it can be closed while the frame lives on
+        array = np.ndarray(length, dtype=column.dtype, buffer=memory.buf, offset=column.offset)[rows]
+        if column.categories is None:
+            data[column.name] = array
+        elif column.is_categorical:
+            data[column.name] = pd.Categorical.from_codes(array, categories=column.categories)
+        else:
+            values = np.empty(len(array), dtype=object)
+            values[:] = np.array(column.categories + [np.nan], dtype=object)[array]
+            data[column.name] = values
+
+    return pd.DataFrame(data)
+
+
+def _calculate_partition(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+    metric: TradeMetricOverTime,
+    memory_name: str,
+    columns: List[_SharedColumn],
+    partition: _Partition,
+    bounds: RollingWindowBounds,
+    groups: List[str],
+    rolling_window: int,
+    partition_group: str,
+) -> pd.DataFrame:
+    memory = SharedMemory(name=memory_name)
+    try:
+        # partition and context rows back in their window order, "position" is the row of the full frame
+        rows = np.concatenate(
+            (np.arange(partition.start, partition.end), np.arange(partition.context_start, partition.length))
+        )
+        data_frame = _read_columns(memory, columns, partition.length, rows)
+    finally:
+        memory.close()
+
+    data_frame = data_frame.sort_values("position", kind="stable").reset_index(drop=True)
+    positions = data_frame.pop("position").to_numpy()
+    partition_bounds = RollingWindowBounds(
+        data_frame=data_frame,
+        periods=bounds.periods,
+        starts=np.searchsorted(positions, bounds.starts),
+        ends=np.searchsorted(positions, bounds.ends),
+    )
+
+    result = metric.calculate_from_bounds(partition_bounds, groups, rolling_window)
+    if result.empty:
+        return result
+
+    # context rows of other partitions (deposits) may add groups, they are part of the other partitions' results
+    return result[result[partition_group].isin(partition.values)]
+
+
+def calculate_partitioned(  # pylint: disable=too-many-locals
+    metric: TradeMetricOverTime,
+    bounds: RollingWindowBounds,
+    groups: List[str],
+    rolling_window: int,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Evaluate `metric.calculate_from_bounds` per partition of the first group key on a process pool.
+    - The window frame is written once into shared memory (strings as codes), workers only receive offsets
+    - Key values are spread over the workers by their number of trades, every partition keeps the periods of the
+      full frame, deposits and withdrawals (the initial balances) and rows without a key go to every partition
+    - The results are merged in (time, groups) order, the order of the serial calculation
+    - Without a group to partition by (see `get_partition_group`) the metric is calculated serially
+    """
+    partition_group = metric.get_partition_group(groups)
+    data_frame = bounds.data_frame
+    if partition_group is None or data_frame.empty:
+        return metric.calculate_from_bounds(bounds, groups, rolling_window)
+
+    keys = data_frame[partition_group].astype(object)
+    is_context = keys.isna() | data_frame["event"].isin([TradeEventType.DEPOSIT.value, TradeEventType.WITHDRAW.value])
+    is_context = is_context.to_numpy()
+    # deposits can have a key of their own (e.g. a NEUTRAL direction), its partition keeps the group in its result
+    partitions = _get_partitions(keys.dropna(), max_workers or os.cpu_count() or 1)
+    if len(partitions) < 2:
+        return metric.calculate_from_bounds(bounds, groups, rolling_window)
+
+    # partition rows first (one contiguous range per partition, window order kept), the context rows last
+    partition_index = {value: index for index, values in enumerate(partitions) for value in values}
+    order = keys.map(partition_index).to_numpy(dtype=np.float64)
+    order[is_context] = len(partitions)
+    rows = np.argsort(order, kind="stable")
+    shared_df = data_frame.iloc[rows].assign(position=rows)
+    ends = np.cumsum(np.bincount(order[rows].astype(np.int64), minlength=len(partitions) + 1))
+
+    columns, size = [], 0
+    for name, values in shared_df.items():
+        is_categorical = isinstance(values.dtype, pd.CategoricalDtype)
+        if is_categorical or not isinstance(values.dtype, np.dtype) or values.dtype.kind not in "biufmM":
+            categories = list(values.cat.categories if is_categorical else pd.unique(values.dropna()))
+            columns.append(_SharedColumn(str(name), size, "int64", categories, is_categorical))
+        else:
+            columns.append(_SharedColumn(str(name), size, values.dtype.str))
+        size += -(-len(shared_df) * np.dtype(columns[-1].dtype).itemsize // 8) * 8
+
+    memory = SharedMemory(create=True, size=max(size, 1))
+    try:
+        _write_columns(shared_df, memory, columns)
+        with ProcessPoolExecutor(max_workers=len(partitions)) as executor:
+            futures = [
+                executor.submit(
+                    _calculate_partition,
+                    metric,
+                    memory.name,
+                    columns,
+                    _Partition(
+                        values=values,
+                        start=ends[index - 1] if index else 0,
+                        end=ends[index],
+                        context_start=ends[-2],
+                        length=len(shared_df),
+                    ),
+                    RollingWindowBounds(data_frame.iloc[:0], bounds.periods, bounds.starts, bounds.ends),
+                    groups,
+                    rolling_window,
+                    partition_group,
+                )
+                for index, values in enumerate(partitions)
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        memory.close()
+        memory.unlink()
+
+    results = [result for result in results if not result.empty]
+    if not results:
+        return pd.DataFrame()
+
+    return pd.concat(results).sort_values(["time"] + groups, kind="stable").reset_index(drop=True)
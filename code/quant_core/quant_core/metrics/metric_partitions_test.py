@@ -0,0 +1,33 @@
+from typing import List
+
+import pandas as pd
+import pytest
+from quant_core.metrics.expectancy_over_time.expectancy_over_time import ExpectancyOverTime
+from quant_core.metrics.metric_partitions import calculate_partitioned
+from quant_core.metrics.metric_suite import GROUP_FLAGS
+from quant_core.metrics.sharpe_over_time.sharpe import SharpeRatioOverTime
+from quant_core.metrics.top_traded_symbols_over_time.top_traded import MostTradedSymbols
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_dev.builder import Builder
+
+
+class TestCalculatePartitioned:
+    @pytest.mark.parametrize("metric", [ExpectancyOverTime, SharpeRatioOverTime, MostTradedSymbols])
+    @pytest.mark.parametrize(
+        "groups", [["account_id"], ["account_id", "symbol", "open_hour"], ["direction"], ["symbol", "open_weekday"]]
+    )
+    def test_matches_the_serial_calculation(self, metric: type, groups: List[str]) -> None:
+        data_frame = Builder.get_trade_history()
+        flags = {flag: group in groups for group, flag in GROUP_FLAGS.items()}
+
+        result = metric().calculate(data_frame, **flags, rolling_window=10, max_workers=2)
+
+        pd.testing.assert_frame_equal(result, metric().calculate(data_frame, **flags, rolling_window=10))
+
+    def test_metric_without_partition_group_is_calculated_serially(self) -> None:
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(Builder.get_trade_history(), skip_head=True)
+
+        result = calculate_partitioned(MostTradedSymbols(), bounds, ["symbol"], 30, max_workers=2)
+
+        assert MostTradedSymbols().get_partition_group(["symbol"]) is None
+        pd.testing.assert_frame_equal(result, MostTradedSymbols().calculate_from_bounds(bounds, ["symbol"], 30))
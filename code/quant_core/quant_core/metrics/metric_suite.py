@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates, TradeMetricOverTime
+
+# group column -> `calculate` keyword, the inverse of `TradeMetricOverTime.groups`
+GROUP_FLAGS = {
+    "account_id": "group_by_account_id",
+    "symbol": "group_by_symbol",
+    "asset_type": "group_by_asset_type",
+    "direction": "group_by_direction",
+    "open_hour": "group_by_hour",
+    "open_weekday": "group_by_weekday",
+}
+
+
+class MetricSuite:  # pylint: disable=too-few-public-methods
+    """
+    Calculates several trade metrics on the same trades in one go.
+    - The trades are normalized once (see `TradeMetricOverTime.normalize_trades`) and all rolling window metrics share
+      one window index
+    - Metrics on the shared rolling aggregates (Sharpe, win rate, ...) share the sums as well, one pass per group set
+    - Other metrics (e.g. the account balance) run their own `calculate` on the trades with their default window
+    """
+
+    @staticmethod
+    def calculate(
+        trades_df: pd.DataFrame,
+        metrics: List[TradeMetricOverTime],
+        groups: Optional[List[str]] = None,
+        rolling_window: int = 30,
+    ) -> Dict[str, pd.DataFrame]:
+        """Return the frame of every metric, keyed by its class name."""
+        groups = ["account_id"] if groups is None else list(groups)
+        unknown_groups = [group for group in groups if group not in GROUP_FLAGS]
+        if unknown_groups:
+            raise ValueError(f"Unsupported groups: {unknown_groups}")
+
+        data_frame = TradeMetricOverTime.normalize_trades(trades_df)
+        required_groups = set(groups).union(
+            *(metric.get_groups(groups) for metric in metrics if isinstance(metric, RollingTradeMetricOverTime))
+        )
+        if not required_groups <= set(data_frame.columns):
+            raise ValueError(f"Some group columns are missing in the DataFrame: {sorted(required_groups)}")
+
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(
+            data_frame, skip_head=True, rolling_window=rolling_window, normalized=True
+        )
+        aggregates: Dict[Tuple[str, ...], RollingAggregates] = {}
+        flags = {flag: group in groups for group, flag in GROUP_FLAGS.items()}
+
+        results = {}
+        for metric in metrics:
+            if isinstance(metric, RollingTradeMetricOverTime):
+                metric_groups = tuple(metric.get_groups(groups))
+                if metric_groups not in aggregates:
+                    aggregates[metric_groups] = metric.get_trade_aggregates(bounds, list(metric_groups))
+                results[type(metric).__name__] = metric.calculate_from_aggregates(
+                    aggregates[metric_groups], rolling_window
+                )
+                continue
+
+            try:
+                results[type(metric).__name__] = metric.calculate_from_bounds(bounds, groups, rolling_window)
+            except NotImplementedError:
+                results[type(metric).__name__] = metric.calculate(trades_df, **flags)
+
+        return results
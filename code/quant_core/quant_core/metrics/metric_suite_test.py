@@ -0,0 +1,61 @@
+from typing import List
+
+import pandas as pd
+import pytest
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
+from quant_core.metrics.expectancy_over_time.expectancy_over_time import ExpectancyOverTime
+from quant_core.metrics.metric_suite import GROUP_FLAGS, MetricSuite
+from quant_core.metrics.sharpe_over_time.sharpe import SharpeRatioOverTime
+from quant_core.metrics.top_traded_symbols_over_time.top_traded import MostTradedSymbols
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_core.metrics.win_rate_over_time.win_rate_over_time import WinRateOverTime
+from quant_dev.builder import Builder
+
+
+class TestMetricSuite:
+    @pytest.mark.parametrize("groups", [[], ["account_id"], ["account_id", "direction"], ["symbol", "open_hour"]])
+    def test_results_match_single_metrics(self, groups: List[str]) -> None:
+        data_frame = Builder.get_trade_history()
+        metrics = [ExpectancyOverTime(), SharpeRatioOverTime(), WinRateOverTime(), MostTradedSymbols()]
+        flags = {flag: group in groups for group, flag in GROUP_FLAGS.items()}
+
+        results = MetricSuite.calculate(data_frame, metrics + [AccountBalanceOverTime()], groups, rolling_window=10)
+
+        assert list(results) == [type(metric).__name__ for metric in metrics] + ["AccountBalanceOverTime"]
+        for metric in metrics:
+            expected = metric.calculate(data_frame, **flags, rolling_window=10)
+            pd.testing.assert_frame_equal(results[type(metric).__name__], expected)
+        pd.testing.assert_frame_equal(
+            results["AccountBalanceOverTime"], AccountBalanceOverTime().calculate(data_frame, **flags)
+        )
+
+    @pytest.mark.parametrize("groups", [["account_id"], ["account_id", "symbol", "asset_type"]])
+    def test_metrics_match_on_normalized_trades(self, groups: List[str]) -> None:
+        data_frame = Builder.get_trade_history()
+        metrics = [ExpectancyOverTime(), SharpeRatioOverTime(), MostTradedSymbols(), AccountBalanceOverTime()]
+        flags = {flag: group in groups for group, flag in GROUP_FLAGS.items()}
+
+        normalized_df = TradeMetricOverTime.normalize_trades(data_frame)
+
+        for metric in metrics:
+            pd.testing.assert_frame_equal(
+                metric.calculate(normalized_df, **flags),
+                metric.calculate(data_frame, **flags),
+                check_categorical=False,
+                check_dtype=False,
+            )
+
+    def test_trades_are_not_modified(self) -> None:
+        data_frame = Builder.get_trade_history()
+
+        MetricSuite.calculate(data_frame, [ExpectancyOverTime(), SharpeRatioOverTime()])
+
+        pd.testing.assert_frame_equal(data_frame, Builder.get_trade_history())
+
+    def test_value_error_is_thrown_for_unknown_or_missing_groups(self) -> None:
+        data_frame = Builder.get_trade_history()
+
+        with pytest.raises(ValueError):
+            MetricSuite.calculate(data_frame, [SharpeRatioOverTime()], groups=["platform"])
+        with pytest.raises(ValueError):
+            MetricSuite.calculate(data_frame.drop(columns=["symbol"]), [MostTradedSymbols()])
@@ -1,5 +1,16 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import numpy as np
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class ProfitFactorOverTime(TradeMetricOverTime):
-    """Calculates the profit factor over time."""
+class ProfitFactorOverTime(RollingTradeMetricOverTime):
+    """Calculates the profit factor (gross profit / gross loss) over time, NaN for windows without losses."""
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            profit_factor = np.where(sums["gross_loss"] < 0, sums["gross_profit"] / -sums["gross_loss"], np.nan)
+
+        return aggregates.to_frame({"profit_factor": profit_factor})
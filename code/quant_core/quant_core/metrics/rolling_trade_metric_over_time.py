@@ -0,0 +1,280 @@
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.metrics.metric_partitions import calculate_partitioned
+from quant_core.metrics.trade_metric_over_time import RollingAggregates, RollingWindowBounds, TradeMetricOverTime
+
+
+@dataclass
+class RollingTradeMetricState:
+    """Trade values summed per (close day, group), the rolling windows of new days are summed from them."""
+
+    groups: List[str]
+    rolling_window: int
+    start_time: pd.Timestamp
+    buckets: pd.DataFrame
+    frame: pd.DataFrame
+
+
+class RollingTradeMetricOverTime(TradeMetricOverTime):
+    """
+    Base class of the metrics which are a formula over the rolling trade aggregates of every (window, group).
+    - `get_trade_aggregates` sums everything the metrics need in one pass over the trades, so the same aggregates
+      can feed several metrics
+    - Subclasses only implement `calculate_from_aggregates`
+    """
+
+    default_rolling_window: int = 30
+    required_groups: List[str] = []
+
+    def get_groups(self, groups: List[str]) -> List[str]:
+        """Add the groups the metric always needs (e.g. the symbol) to the requested ones."""
+        return groups + [group for group in self.required_groups if group not in groups]
+
+    @staticmethod
+    def get_trade_aggregates(bounds: RollingWindowBounds, groups: List[str]) -> RollingAggregates:
+        """
+        Sum the trade statistics of every rolling window and group, deposits and withdrawals are not trades.
+        - trades / wins / losses: counts
+        - profit / profit_squared: sum and sum of squares of the trade profits
+        - gross_profit / gross_loss: sum of the winning / losing profits (the loss is negative)
+        - downside_squared: sum of the squared losses
+        - commission / swap: sums of the fees as booked (usually negative)
+        """
+        return TradeMetricOverTime.get_rolling_aggregates(
+            bounds,
+            groups,
+            RollingTradeMetricOverTime._get_trade_values(bounds.data_frame),
+            exact_float_sums=False,
+        )
+
+    @staticmethod
+    def _get_trade_values(trades: pd.DataFrame) -> Dict[str, np.ndarray]:
+        is_trade = (~trades["event"].isin([TradeEventType.DEPOSIT.value, TradeEventType.WITHDRAW.value])).to_numpy()
+        profit = np.where(is_trade, trades["profit"].to_numpy(dtype=np.float64), 0.0)
+        losses = np.where(profit < 0, profit, 0.0)
+
+        return {
+            "trades": is_trade,
+            "wins": is_trade & (profit > 0),
+            "losses": is_trade & (profit < 0),
+            "profit": profit,
+            "profit_squared": profit**2,
+            "gross_profit": np.where(profit > 0, profit, 0.0),
+            "gross_loss": losses,
+            "downside_squared": losses**2,
+            "commission": np.where(is_trade, trades["commission"].to_numpy(dtype=np.float64), 0.0),
+            "swap": np.where(is_trade, trades["swap"].to_numpy(dtype=np.float64), 0.0),
+        }
+
+    @staticmethod
+    def _get_day_buckets(trades: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
+        """Trade values summed per (close day, group), sorted by day."""
+        trades = trades[trades["agg_time_closed"].notna()]
+        buckets = pd.DataFrame(
+            {
+                "agg_time_closed": trades["agg_time_closed"].to_numpy(),
+                **{group: trades[group].to_numpy() for group in groups},
+                **RollingTradeMetricOverTime._get_trade_values(trades),
+            }
+        )
+
+        return buckets.groupby(["agg_time_closed"] + groups, sort=True, observed=True).sum().reset_index()
+
+    @staticmethod
+    def _merge_day_buckets(buckets: pd.DataFrame, new_buckets: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
+        """Add new day buckets, only the buckets from the first new day on are regrouped."""
+        if new_buckets.empty:
+            return buckets
+
+        is_touched = buckets["agg_time_closed"] >= new_buckets["agg_time_closed"].iloc[0]
+        touched = (
+            pd.concat([buckets[is_touched], new_buckets])
+            .groupby(["agg_time_closed"] + groups, sort=True, observed=True)
+            .sum()
+            .reset_index()
+        )
+
+        return pd.concat([buckets[~is_touched], touched], ignore_index=True)
+
+    @staticmethod
+    def _get_bucket_aggregates(
+        buckets: pd.DataFrame, groups: List[str], periods: pd.DatetimeIndex, rolling_window: int
+    ) -> RollingAggregates:
+        """The rolling aggregates of `periods`, summed from the day buckets instead of the trades."""
+        days = buckets["agg_time_closed"].to_numpy(dtype="datetime64[ns]")
+        period_values = periods.to_numpy(dtype="datetime64[ns]")
+        bounds = RollingWindowBounds(
+            data_frame=buckets,
+            periods=periods,
+            starts=np.searchsorted(days, period_values - pd.Timedelta(days=rolling_window).to_timedelta64(), "right"),
+            ends=np.searchsorted(days, period_values, side="right"),
+        )
+        values = {name: buckets[name].to_numpy() for name in buckets.columns.drop(["agg_time_closed"] + groups)}
+
+        return TradeMetricOverTime.get_rolling_aggregates(bounds, groups, values, exact_float_sums=False)
+
+    @abstractmethod
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        """Calculate the metric frame from the aggregates of `get_trade_aggregates`."""
+
+    def get_partition_group(self, groups: List[str]) -> Optional[str]:
+        # the required groups are compared with each other (e.g. the symbol ranking), the others are independent
+        return next((group for group in groups if group not in self.required_groups), None)
+
+    def calculate_from_bounds(
+        self, bounds: RollingWindowBounds, groups: List[str], rolling_window: int
+    ) -> pd.DataFrame:
+        return self.calculate_from_aggregates(
+            self.get_trade_aggregates(bounds, self.get_groups(groups)), rolling_window
+        )
+
+    def calculate(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        data_frame: pd.DataFrame,
+        group_by_account_id: bool = True,
+        group_by_symbol: bool = False,
+        group_by_asset_type: bool = False,
+        group_by_direction: bool = False,
+        group_by_hour: bool = False,
+        group_by_weekday: bool = False,
+        rolling_window: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        if not rolling_window:
+            rolling_window = self.default_rolling_window
+
+        groups = self.get_groups(
+            self.groups(
+                group_by_account_id=group_by_account_id,
+                group_by_symbol=group_by_symbol,
+                group_by_asset_type=group_by_asset_type,
+                group_by_direction=group_by_direction,
+                group_by_hour=group_by_hour,
+                group_by_weekday=group_by_weekday,
+            )
+        )
+        data_frame = self._normalize_time(data_frame=data_frame)
+        if not all(group in data_frame.columns for group in groups):
+            raise ValueError(f"Some group columns are missing in the DataFrame: {groups}")
+
+        bounds = self.get_rolling_window_bounds(
+            data_frame, skip_head=True, rolling_window=rolling_window, normalized=True
+        )
+        if max_workers:
+            return calculate_partitioned(self, bounds, groups, rolling_window, max_workers)
+
+        return self.calculate_from_bounds(bounds, groups, rolling_window)
+
+    def calculate_bucketed(
+        self,
+        data_frame: pd.DataFrame,
+        groups: Optional[List[str]] = None,
+        aggregation_resolution: str = "H",
+        rolling_window: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate the metric on windows of `rolling_window` periods of any fixed resolution ("H", "15min", "4H", ...).
+        - Summed from the trades per bucket (see `get_bucketed_rolling_aggregates`), so only the periods where a
+          window changes get rows, the metric holds until the next one
+        - Groups default to the account, the first `rolling_window` periods are skipped like in `calculate`
+        """
+        if not rolling_window:
+            rolling_window = self.default_rolling_window
+
+        groups = self.get_groups(["account_id"] if groups is None else list(groups))
+        if not all(group in data_frame.columns for group in groups):
+            raise ValueError(f"Some group columns are missing in the DataFrame: {groups}")
+
+        aggregates = self.get_bucketed_rolling_aggregates(
+            data_frame,
+            groups,
+            self._get_trade_values(data_frame),
+            aggregation_resolution=aggregation_resolution,
+            rolling_window=rolling_window,
+            skip_head=True,
+        )
+
+        return self.calculate_from_aggregates(aggregates, rolling_window)
+
+    def init_state(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        data_frame: pd.DataFrame,
+        group_by_account_id: bool = True,
+        group_by_symbol: bool = False,
+        group_by_asset_type: bool = False,
+        group_by_direction: bool = False,
+        group_by_hour: bool = False,
+        group_by_weekday: bool = False,
+        rolling_window: Optional[int] = None,
+    ) -> RollingTradeMetricState:
+        if not rolling_window:
+            rolling_window = self.default_rolling_window
+
+        groups = self.get_groups(
+            self.groups(
+                group_by_account_id=group_by_account_id,
+                group_by_symbol=group_by_symbol,
+                group_by_asset_type=group_by_asset_type,
+                group_by_direction=group_by_direction,
+                group_by_hour=group_by_hour,
+                group_by_weekday=group_by_weekday,
+            )
+        )
+        data_frame = self._normalize_time(data_frame=data_frame)
+        if not all(group in data_frame.columns for group in groups):
+            raise ValueError(f"Some group columns are missing in the DataFrame: {groups}")
+
+        bounds = self.get_rolling_window_bounds(
+            data_frame, skip_head=True, rolling_window=rolling_window, normalized=True
+        )
+
+        return RollingTradeMetricState(
+            groups=groups,
+            rolling_window=rolling_window,
+            start_time=data_frame["opened_at"].dt.normalize().min(),
+            buckets=self._get_day_buckets(bounds.data_frame, groups),
+            frame=self.calculate_from_bounds(bounds, groups, rolling_window),
+        )
+
+    def update(self, state: RollingTradeMetricState, new_trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add new trades to the day buckets and recalculate the windows from the first day they touch.
+        - Trades may close at any time, only the windows from their first close day on are recalculated
+        """
+        new_df = self._normalize_time(data_frame=new_trades)
+        if not all(group in new_df.columns for group in state.groups):
+            raise ValueError(f"Some group columns are missing in the DataFrame: {state.groups}")
+        new_df["agg_time_closed"] = new_df["closed_at"].dt.normalize()
+        new_buckets = self._get_day_buckets(new_df, state.groups)
+
+        start_time = pd.Series([state.start_time, new_df["opened_at"].dt.normalize().min()]).min()
+        first_period = start_time + pd.Timedelta(days=state.rolling_window)
+        if start_time != state.start_time or pd.isna(state.start_time):
+            recalculate_from = first_period
+        elif not new_buckets.empty:
+            recalculate_from = max(first_period, new_buckets["agg_time_closed"].iloc[0])
+        else:
+            return state.frame
+
+        state.buckets = self._merge_day_buckets(state.buckets, new_buckets, state.groups)
+        state.start_time = start_time
+
+        if state.buckets.empty:
+            return state.frame
+
+        periods = pd.date_range(recalculate_from, state.buckets["agg_time_closed"].iloc[-1], freq="D")
+        window_start = recalculate_from - pd.Timedelta(days=state.rolling_window)
+        buckets = state.buckets[state.buckets["agg_time_closed"] > window_start].reset_index(drop=True)
+        new_rows = self.calculate_from_aggregates(
+            self._get_bucket_aggregates(buckets, state.groups, periods, state.rolling_window), state.rolling_window
+        )
+
+        kept_rows = state.frame[state.frame["time"] < recalculate_from] if "time" in state.frame else state.frame
+        state.frame = pd.concat([kept_rows, new_rows], ignore_index=True)
+
+        return state.frame
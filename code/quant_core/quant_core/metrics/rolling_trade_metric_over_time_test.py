@@ -0,0 +1,163 @@
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_core.metrics.fees_paid_over_time.fees_paid_over_time import FeesOverTime
+from quant_core.metrics.kelly_criterion_over_time.kelly import KellyCriterionPerAccountOverTime
+from quant_core.metrics.profit_factor_over_time.profit_factor import ProfitFactorOverTime
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.sharpe_over_time.sharpe import SharpeRatioOverTime
+from quant_core.metrics.sortino_over_time.sortino import SortinoRatioOverTime
+from quant_core.metrics.swap_fees_over_time.total_fees import NetProfitAfterFeesOverTime
+from quant_core.metrics.top_traded_symbols_over_time.top_traded import MostTradedSymbols
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_core.metrics.trades_per_day_over_time.trades_per_day import TradesPerDayOverTime
+from quant_core.metrics.win_rate_over_time.win_rate_over_time import WinRateOverTime
+from quant_dev.builder import Builder
+
+ROLLING_WINDOW = 10
+
+
+def _kelly(trades: pd.DataFrame) -> float:
+    wins, losses = trades[trades["profit"] > 0], trades[trades["profit"] < 0]
+    if wins.empty or losses.empty:
+        return np.nan
+    win_rate = len(wins) / len(trades)
+
+    return win_rate - (1 - win_rate) / (wins["profit"].mean() / -losses["profit"].mean())
+
+
+def _sortino(trades: pd.DataFrame) -> float:
+    downside_deviation = np.sqrt((trades["profit"].clip(upper=0) ** 2).mean()) if len(trades) else 0.0
+
+    return trades["profit"].mean() / downside_deviation if downside_deviation > 0 else np.nan
+
+
+def _profit_factor(trades: pd.DataFrame) -> float:
+    gross_loss = -trades.loc[trades["profit"] < 0, "profit"].sum()
+
+    return trades.loc[trades["profit"] > 0, "profit"].sum() / gross_loss if gross_loss > 0 else np.nan
+
+
+# per window formulas on the trades of a (window, group), deposits and withdrawals removed
+REFERENCES: Dict[str, Callable[[pd.DataFrame], float]] = {
+    "sharpe": lambda trades: (
+        trades["profit"].mean() / trades["profit"].std() if len(trades) > 1 and trades["profit"].std() > 0 else np.nan
+    ),
+    "sortino": _sortino,
+    "profit_factor": _profit_factor,
+    "win_rate": lambda trades: 100 * (trades["profit"] > 0).mean() if len(trades) else 0.0,
+    "trade_count": lambda trades: len(trades) / ROLLING_WINDOW,
+    "kelly": _kelly,
+    "fees": lambda trades: (trades["commission"] + trades["swap"]).sum(),
+    "net_profit": lambda trades: (trades["profit"] + trades["commission"] + trades["swap"]).sum(),
+}
+
+METRICS = {
+    "sharpe": SharpeRatioOverTime,
+    "sortino": SortinoRatioOverTime,
+    "profit_factor": ProfitFactorOverTime,
+    "win_rate": WinRateOverTime,
+    "trade_count": TradesPerDayOverTime,
+    "kelly": KellyCriterionPerAccountOverTime,
+    "fees": FeesOverTime,
+    "net_profit": NetProfitAfterFeesOverTime,
+}
+
+
+def _expected(column: str, groups: List[str]) -> List[tuple]:
+    expected = []
+    for window_time, window_df in TradeMetricOverTime.get_rolling_windows(
+        Builder.get_trade_history(), skip_head=True, rolling_window=ROLLING_WINDOW
+    ).items():
+        grouped = window_df.groupby(groups) if groups else [((None,), window_df)]
+        for _, group_df in grouped:
+            trades = group_df[~group_df["event"].isin([TradeEventType.DEPOSIT.value, TradeEventType.WITHDRAW.value])]
+            expected.append((window_time, REFERENCES[column](trades)))
+
+    return expected
+
+
+class TestRollingTradeMetricOverTime:
+    @pytest.mark.parametrize("column", list(METRICS))
+    @pytest.mark.parametrize("groups", [[], ["account_id"], ["account_id", "symbol"], ["direction", "open_weekday"]])
+    def test_metric_matches_per_window_calculation(self, column: str, groups: List[str]) -> None:
+        metric_df = METRICS[column]().calculate(
+            Builder.get_trade_history(),
+            group_by_account_id="account_id" in groups,
+            group_by_symbol="symbol" in groups,
+            group_by_direction="direction" in groups,
+            group_by_weekday="open_weekday" in groups,
+            rolling_window=ROLLING_WINDOW,
+        )
+        expected = _expected(column, groups)
+
+        assert list(metric_df.columns) == ["time", *metric_df.columns[1 : -len(groups) or None], *groups]
+        assert list(metric_df["time"]) == [window_time for window_time, _ in expected]
+        np.testing.assert_allclose(metric_df[column], [value for _, value in expected], rtol=1e-9, atol=1e-9)
+
+    def test_value_error_is_thrown_if_group_columns_missing(self) -> None:
+        data_frame = Builder.get_trade_history().drop(columns=["symbol"])
+
+        with pytest.raises(ValueError):
+            SharpeRatioOverTime().calculate(data_frame, group_by_symbol=True)
+
+    def test_aggregates_are_shared_between_metrics(self) -> None:
+        data_frame = Builder.get_trade_history()
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(data_frame, skip_head=True, rolling_window=30)
+        aggregates = RollingTradeMetricOverTime.get_trade_aggregates(bounds, ["account_id"])
+
+        for metric in METRICS.values():
+            pd.testing.assert_frame_equal(
+                metric().calculate_from_aggregates(aggregates, 30), metric().calculate(data_frame)
+            )
+
+    def test_most_traded_symbols_are_ranked_per_window(self) -> None:
+        metric_df = MostTradedSymbols().calculate(Builder.get_trade_history(), rolling_window=ROLLING_WINDOW)
+        expected = _expected("trade_count", ["account_id", "symbol"])
+
+        assert {"time", "account_id", "symbol", "trade_count", "rank"} <= set(metric_df.columns)
+        assert (metric_df["trade_count"] > 0).all()
+        assert metric_df["trade_count"].sum() == round(sum(value for _, value in expected) * ROLLING_WINDOW)
+        for _, window_df in metric_df.groupby(["time", "account_id"]):
+            top = window_df[window_df["rank"] == 1]
+            assert (top["trade_count"] == window_df["trade_count"].max()).all()
+
+    @pytest.mark.parametrize("metric", [*METRICS.values(), MostTradedSymbols])
+    @pytest.mark.parametrize("groups", [[], ["account_id", "symbol"]])
+    def test_updates_match_the_full_calculation(self, metric: type, groups: List[str]) -> None:
+        data_frame = Builder.get_trade_history()
+        closed_at = pd.to_datetime(data_frame["closed_at"])
+        first_cut, second_cut = closed_at.quantile(0.5), closed_at.quantile(0.75)
+        flags = {"group_by_account_id": "account_id" in groups, "group_by_symbol": "symbol" in groups}
+
+        state = metric().init_state(data_frame[closed_at <= first_cut], **flags, rolling_window=ROLLING_WINDOW)
+        # later trades first, a sync does not have to deliver them in order
+        metric().update(state, data_frame[closed_at > second_cut])
+        result = metric().update(state, data_frame[(closed_at > first_cut) & (closed_at <= second_cut)])
+
+        expected = metric().calculate(data_frame, **flags, rolling_window=ROLLING_WINDOW)
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9)
+        assert state.buckets["agg_time_closed"].is_monotonic_increasing
+
+    @pytest.mark.parametrize("column", list(METRICS))
+    def test_bucketed_metric_matches_the_daily_calculation(self, column: str) -> None:
+        data_frame = Builder.get_trade_history()
+
+        metric_df = METRICS[column]().calculate_bucketed(data_frame, aggregation_resolution="D", rolling_window=10)
+
+        expected = METRICS[column]().calculate(data_frame, rolling_window=10)
+        assert len(metric_df) < len(expected)
+        merged_df = pd.merge_asof(expected, metric_df, on="time", by="account_id", suffixes=("", "_bucketed"))
+        np.testing.assert_allclose(merged_df[f"{column}_bucketed"], merged_df[column], rtol=1e-9, atol=1e-9)
+
+    @pytest.mark.parametrize("aggregation_resolution,rolling_window", [("D", 10), ("H", 240), ("4H", 60)])
+    def test_bucketed_trades_are_counted_per_day(self, aggregation_resolution: str, rolling_window: int) -> None:
+        metric_df = TradesPerDayOverTime().calculate_bucketed(
+            Builder.get_trade_history(), aggregation_resolution=aggregation_resolution, rolling_window=rolling_window
+        )
+
+        # every window spans 10 days
+        np.testing.assert_allclose(metric_df["trade_count"], metric_df["trades"] / 10, rtol=1e-12)
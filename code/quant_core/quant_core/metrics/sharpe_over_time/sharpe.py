@@ -1,5 +1,25 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import numpy as np
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class SharpeRatioOverTime(TradeMetricOverTime):
-    """Calculates the Sharpe ratio over time."""
+class SharpeRatioOverTime(RollingTradeMetricOverTime):
+    """
+    Calculates the Sharpe ratio over time.
+    - Per trade ratio of the mean trade profit to its sample standard deviation, not annualized
+    - NaN for windows with less than two trades or without variance
+    """
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+        trades = sums["trades"]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sums["profit"] / trades
+            squared_deviations = sums["profit_squared"] - sums["profit"] * mean
+            # below the rounding noise of the sums the trades are equal and the ratio is undefined
+            has_variance = (trades > 1) & (squared_deviations > 1e-12 * sums["profit_squared"])
+            sharpe = np.where(has_variance, mean / np.sqrt(squared_deviations / (trades - 1)), np.nan)
+
+        return aggregates.to_frame({"sharpe": sharpe})
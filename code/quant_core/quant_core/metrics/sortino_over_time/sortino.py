@@ -1,5 +1,24 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import numpy as np
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class SortinoRatioOverTime(TradeMetricOverTime):
-    """Calculates the Sortino ratio over time."""
+class SortinoRatioOverTime(RollingTradeMetricOverTime):
+    """
+    Calculates the Sortino ratio over time.
+    - Per trade ratio of the mean trade profit to the downside deviation (root mean square of the losses)
+    - NaN for windows without trades or without losses
+    """
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+        trades = sums["trades"]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            downside_deviation = np.sqrt(sums["downside_squared"] / trades)
+            sortino = np.where(
+                (trades > 0) & (downside_deviation > 0), sums["profit"] / trades / downside_deviation, np.nan
+            )
+
+        return aggregates.to_frame({"sortino": sortino})
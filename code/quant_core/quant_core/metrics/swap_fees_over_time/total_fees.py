@@ -1,5 +1,13 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class NetProfitAfterFeesOverTime(TradeMetricOverTime):
-    """Calculates the net profit after fees over time."""
+class NetProfitAfterFeesOverTime(RollingTradeMetricOverTime):
+    """Calculates the net profit after fees (profit + commission + swap) over time."""
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+        fees = sums["commission"] + sums["swap"]
+
+        return aggregates.to_frame({"profit": sums["profit"], "fees": fees, "net_profit": sums["profit"] + fees})
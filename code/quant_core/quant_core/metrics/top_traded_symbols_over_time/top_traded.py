@@ -1,5 +1,25 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class MostTradedSymbols(TradeMetricOverTime):
-    """Most Traded Symbols Over Time"""
+class MostTradedSymbols(RollingTradeMetricOverTime):
+    """
+    Most Traded Symbols Over Time
+    - Always grouped by symbol, `rank` 1 is the most traded symbol of the window (within the other groups)
+    """
+
+    required_groups = ["symbol"]
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        data_frame = aggregates.to_frame({"trade_count": aggregates.sums["trades"]})
+        if data_frame.empty:
+            return data_frame
+
+        data_frame = data_frame[data_frame["trade_count"] > 0].reset_index(drop=True)
+        rank_groups = ["time"] + [column for column in aggregates.keys.columns if column != "symbol"]
+        data_frame["rank"] = (
+            data_frame.groupby(rank_groups)["trade_count"].rank(method="min", ascending=False).astype(int)
+        )
+
+        return data_frame
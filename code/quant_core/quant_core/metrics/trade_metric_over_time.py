@@ -1,9 +1,84 @@
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, List, Literal, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from quant_core.enums.trade_event_type import TradeEventType
 
+CATEGORICAL_COLUMNS = ["account_id", "symbol", "asset_type"]
+
+# frame id -> (weak reference to the frame, its normalized trades), None if the frame is normalized trades itself
+_NORMALIZED_TRADES: Dict[int, Tuple[weakref.ref, Optional[pd.DataFrame]]] = {}
+
+
+def _cache_normalized_trades(data_frame: pd.DataFrame, normalized: Optional[pd.DataFrame]) -> None:
+    key = id(data_frame)
+    # the entry dies with the frame, so a new frame reusing the id never finds it
+    _NORMALIZED_TRADES[key] = (weakref.ref(data_frame, lambda _: _NORMALIZED_TRADES.pop(key, None)), normalized)
+
+
+def _get_normalized_trades(data_frame: pd.DataFrame, include_raw: bool) -> Optional[pd.DataFrame]:
+    entry = _NORMALIZED_TRADES.get(id(data_frame))
+    if entry is None or entry[0]() is not data_frame:
+        return None
+    if entry[1] is None:
+        return data_frame
+
+    return entry[1] if include_raw else None
+
+
+@dataclass
+class RollingWindowBounds:
+    """Rolling windows as [start, end) index ranges into trades sorted by their aggregated close time."""
+
+    data_frame: pd.DataFrame
+    periods: pd.DatetimeIndex
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def __iter__(self) -> Iterator[Tuple[pd.Timestamp, pd.DataFrame]]:
+        """Lazily yield (period, trades of the window) with the trades as a positional slice."""
+        for period, start, end in zip(self.periods, self.starts, self.ends):
+            yield period, self.data_frame.iloc[start:end]
+
+
+@dataclass
+class RollingAggregates:
+    """
+    Sums over the trades of every (rolling window, group) pair, in the order of a `groupby` per window.
+    - With groups only pairs with trades in the window are kept, without groups every window has one entry
+    - `group_rows` is the position (in the window bounds frame) of the first trade of the entry's group
+    """
+
+    periods: pd.DatetimeIndex
+    keys: pd.DataFrame
+    group_rows: np.ndarray
+    counts: np.ndarray
+    sums: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def to_frame(self, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Build the metric frame: time, the given metric columns and the group columns."""
+        if len(self) == 0:
+            return pd.DataFrame()
+
+        data_frame = pd.DataFrame({"time": self.periods, **columns})
+        for column in self.keys.columns:
+            values = self.keys[column].to_numpy()
+            # a single key `groupby` hands out integer keys as int64, keep the same dtype as the per group loops
+            if len(self.keys.columns) == 1 and values.dtype.kind in "iu":
+                values = values.astype(np.int64)
+            data_frame[column] = values
+
+        return data_frame
+
 
 class TradeMetricOverTime(ABC):
     """Trade metric over time base class."""
@@ -11,7 +86,7 @@ class TradeMetricOverTime(ABC):
     def _get_initial_balances(self, data_frame: pd.DataFrame) -> Dict[str, float]:
         return (
             data_frame[data_frame["event"] == TradeEventType.DEPOSIT.value]
-            .groupby("account_id")["profit"]
+            .groupby("account_id", observed=True)["profit"]
             .sum()
             .to_dict()
         )
@@ -27,12 +102,77 @@ class TradeMetricOverTime(ABC):
         group_by_hour: bool = False,
         group_by_weekday: bool = False,
         rolling_window: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate the metric grouped by account_id.
+        - `max_workers` evaluates partitions of the first group on a process pool (see `calculate_partitioned`),
+          metrics which are not calculated on rolling windows ignore it
+        """
+
+    def get_partition_group(self, groups: List[str]) -> Optional[str]:
+        """The group whose values can be calculated independently of each other, None if there is none."""
+        return groups[0] if groups else None
+
+    def calculate_from_bounds(  # pylint: disable=unused-argument
+        self, bounds: RollingWindowBounds, groups: List[str], rolling_window: int
     ) -> pd.DataFrame:
-        """Calculate the metric grouped by account_id."""
+        """Calculate the metric on prepared rolling windows, so several metrics can share them (see `MetricSuite`)."""
+        raise NotImplementedError(f"{type(self).__name__} is not calculated on rolling windows.")
+
+    def init_state(  # pylint: disable=too-many-arguments, too-many-positional-arguments, unused-argument
+        self,
+        data_frame: pd.DataFrame,
+        group_by_account_id: bool = True,
+        group_by_symbol: bool = False,
+        group_by_asset_type: bool = False,
+        group_by_direction: bool = False,
+        group_by_hour: bool = False,
+        group_by_weekday: bool = False,
+        rolling_window: Optional[int] = None,
+    ) -> Any:
+        """
+        Calculate the metric like `calculate` and return a state for incremental updates.
+        - The state is picklable, so it can be persisted between syncs, its `frame` holds the metric frame
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental updates.")
+
+    def update(self, state: Any, new_trades: pd.DataFrame) -> pd.DataFrame:  # pylint: disable=unused-argument
+        """
+        Extend the metric by trades which were not part of the state yet and return the updated metric frame.
+        - The state is updated in place, the work is proportional to the new trades (and the windows they touch)
+        - Raises a ValueError if the trades can not be added incrementally, the state has to be rebuilt then
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental updates.")
+
+    @staticmethod
+    def normalize_trades(data_frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return the normalized trades of `data_frame`, cached as long as `data_frame` lives.
+        - Times are datetimes, the open / close hour and weekday are precomputed and the trades are sorted by open time
+        - account_id, symbol and asset_type are categorical, which makes grouping by them cheap
+        - Metrics take the frame as it is instead of normalizing a copy, it is shared, so treat it as read only
+        """
+        normalized = _get_normalized_trades(data_frame, include_raw=True)
+        if normalized is not None:
+            return normalized
+
+        normalized = TradeMetricOverTime._normalize_time(data_frame)
+        for column in CATEGORICAL_COLUMNS:
+            if column in normalized.columns:
+                normalized[column] = normalized[column].astype("category")
+
+        _cache_normalized_trades(data_frame, normalized)
+        _cache_normalized_trades(normalized, None)
+
+        return normalized
 
     @staticmethod
     def _normalize_time(data_frame: pd.DataFrame) -> pd.DataFrame:
-        """Normalize time to a specific resolution."""
+        """Normalize time to a specific resolution, frames of `normalize_trades` are only shallow copied."""
+        if _get_normalized_trades(data_frame, include_raw=False) is not None:
+            return data_frame.copy(deep=False)
+
         data_frame = data_frame.copy()
 
         data_frame["opened_at"] = pd.to_datetime(data_frame["opened_at"])
@@ -75,68 +215,291 @@ class TradeMetricOverTime(ABC):
 
     def set_initial_balances(self, data_frame: pd.DataFrame, group_by_account_id: bool) -> pd.DataFrame:
         """Set initial balances for each account."""
-        data_frame["initial_balance"] = 0.0
         initial_balances = self._get_initial_balances(data_frame)
         if group_by_account_id:
-            for account, balance in initial_balances.items():
-                data_frame.loc[data_frame["account_id"] == account, "initial_balance"] = balance
+            # a categorical account_id maps its categories only, the result may be categorical as well
+            data_frame["initial_balance"] = (
+                data_frame["account_id"].map(initial_balances).astype(np.float64).fillna(0.0)
+            )
         else:
-            data_frame["initial_balance"] = sum(initial_balances.values())
+            data_frame["initial_balance"] = float(sum(initial_balances.values()))
 
         return data_frame
 
     @staticmethod
-    def get_rolling_windows(
+    def get_resolution(aggregation_resolution: str) -> pd.offsets.Tick:
+        """Parse a fixed aggregation resolution such as "D", "H", "15min" or "4H"."""
+        try:
+            resolution = pd.tseries.frequencies.to_offset(aggregation_resolution)
+        except ValueError as error:
+            raise ValueError(f"Unsupported aggregation resolution: {aggregation_resolution}") from error
+
+        # calendar offsets (months, business days, ...) have no fixed length to floor timestamps to
+        if not isinstance(resolution, pd.offsets.Tick):
+            raise ValueError(f"Unsupported aggregation resolution: {aggregation_resolution}")
+
+        return resolution
+
+    @staticmethod
+    def get_rolling_window_bounds(
         data_frame: pd.DataFrame,
         skip_head: bool = False,
-        aggregation_resolution: Literal["D", "H"] = "D",
+        aggregation_resolution: str = "D",
         rolling_window: int = 30,
-    ) -> Dict[pd.Timestamp, pd.DataFrame]:
+        normalized: bool = False,
+    ) -> RollingWindowBounds:
         """
-        Returns a dict of {aggregated_time: trades within the past `rolling_window_days` up to that point}.
-        - Supports arbitrary aggregation_resolution (e.g., 'D', 'H')
-        - If 'D', truncates timestamps to midnight for consistent grouping
+        Locate the trades of every rolling window as a [start, end) index range into the trades sorted by close time.
+        - A window at period p holds the trades whose aggregated close time lies in (p - rolling_window, p]
+        - Any fixed resolution works ("D", "H", "15min", "4H", ...), `rolling_window` counts periods of it
+        - Both window edges are found with `searchsorted`, nothing is copied per window
         - Skips first N windows if skip_head=True
+        - `normalized=True` skips `_normalize_time` for frames which already went through it
         """
-        data_frame = data_frame.copy()
-        data_frame = TradeMetricOverTime._normalize_time(data_frame)
-
-        if data_frame.empty:
-            return {}
-
-        if aggregation_resolution == "D":
-            data_frame["agg_time_opened"] = data_frame["opened_at"].dt.normalize()
-            data_frame["agg_time_closed"] = data_frame["closed_at"].dt.normalize()
-        elif aggregation_resolution == "H":
-            data_frame["agg_time_opened"] = data_frame["opened_at"].dt.floor("H")
-            data_frame["agg_time_closed"] = data_frame["closed_at"].dt.floor("H")
+        if normalized:
+            data_frame = data_frame.copy(deep=False)
         else:
-            raise ValueError(f"Unsupported aggregation resolution: {aggregation_resolution}")
+            data_frame = TradeMetricOverTime._normalize_time(data_frame)
+
+        resolution = TradeMetricOverTime.get_resolution(aggregation_resolution)
+        data_frame["agg_time_opened"] = data_frame["opened_at"].dt.floor(resolution)
+        data_frame["agg_time_closed"] = data_frame["closed_at"].dt.floor(resolution)
+        delta = pd.Timedelta(resolution) * rolling_window
 
         start_time = data_frame["agg_time_opened"].min()
         end_time = data_frame["agg_time_closed"].max()
+        if pd.isna(start_time) or pd.isna(end_time):
+            empty = np.empty(0, dtype=np.int64)
+            return RollingWindowBounds(data_frame.iloc[:0], pd.DatetimeIndex([]), empty, empty)
+
+        # stable, so trades closing in the same period keep their open time order
+        data_frame = data_frame[data_frame["agg_time_closed"].notna()].sort_values("agg_time_closed", kind="stable")
+        closed = data_frame["agg_time_closed"].to_numpy(dtype="datetime64[ns]")
+
+        periods = pd.date_range(start=start_time, end=end_time, freq=resolution, inclusive="both")
+        if skip_head:
+            periods = periods[rolling_window:]
+        period_values = periods.to_numpy(dtype="datetime64[ns]")
+
+        return RollingWindowBounds(
+            data_frame=data_frame,
+            periods=periods,
+            starts=np.searchsorted(closed, period_values - delta.to_timedelta64(), side="right"),
+            ends=np.searchsorted(closed, period_values, side="right"),
+        )
+
+    @staticmethod
+    def _sum_in_trade_order(  # pylint: disable=too-many-locals
+        bounds: RollingWindowBounds, positions: np.ndarray, lower: np.ndarray, upper: np.ndarray, value: np.ndarray
+    ) -> np.ndarray:
+        """
+        Sum the [lower, upper) ranges of `value[positions]` in open time order, skipping NaNs like pandas.
+        - Float sums are not associative, summing like a groupby on the window frame keeps the results bit-identical
+        """
+        sizes = upper - lower
+        sums = np.zeros(len(sizes))
+        if not sizes.sum():
+            return sums
+
+        entries = np.repeat(np.arange(len(sizes)), sizes)
+        rows = positions[np.repeat(lower - (np.cumsum(sizes) - sizes), sizes) + np.arange(len(entries))]
+
+        opened_at = bounds.data_frame["opened_at"].to_numpy()
+        if not (np.diff(opened_at[positions]) >= np.timedelta64(0)).all():
+            open_rank = np.empty(len(opened_at), dtype=np.int64)
+            open_rank[np.argsort(opened_at, kind="stable")] = np.arange(len(opened_at))
+            rows = rows[np.lexsort((open_rank[rows], entries))]
 
-        all_periods = pd.date_range(start=start_time, end=end_time, freq=aggregation_resolution, inclusive="both")
+        values = np.asarray(value, dtype=np.float64)[rows]
+        valid = ~np.isnan(values)
+        values, entries = values[valid], entries[valid]
+
+        # np.add.reduce per range sums pairwise like `Series.sum`, reduceat would add sequentially
+        ends = np.cumsum(np.bincount(entries, minlength=len(sizes)))
+        starts = np.concatenate(([0], ends[:-1]))
+        for entry in np.flatnonzero(ends > starts):
+            sums[entry] = np.add.reduce(values[starts[entry] : ends[entry]])
+
+        return sums
+
+    @staticmethod
+    def _get_compensated_prefix_sums(value: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Prefix sums of `value` (NaN counts as 0) with the rounding error of every step summed apart (TwoSum).
+        - prefix + errors is exact to far below float64 rounding, so the difference of two large prefixes keeps the
+          precision of the window's own magnitude, with float64 only and so the same on every platform
+        """
+        value = np.where(np.isnan(value), 0.0, value.astype(np.float64))
+        prefix = np.concatenate(([0.0], np.cumsum(value)))
+        previous = prefix[:-1]
+        added = prefix[1:] - previous
+        step_errors = (previous - (prefix[1:] - added)) + (value - added)
 
-        result = {}
+        return prefix, np.concatenate(([0.0], np.cumsum(step_errors)))
 
-        for current_period in all_periods:
-            delta = (
-                pd.Timedelta(days=rolling_window)
-                if aggregation_resolution == "D"
-                else pd.Timedelta(hours=rolling_window)
+    @staticmethod
+    def get_rolling_aggregates(  # pylint: disable=too-many-locals
+        bounds: RollingWindowBounds, groups: List[str], values: Dict[str, np.ndarray], exact_float_sums: bool = True
+    ) -> RollingAggregates:
+        """
+        Sum `values` (aligned with `bounds.data_frame`) per rolling window and group in one vectorized pass.
+        - Trades are ordered by (group, position), every window of every group is then a [lower, upper) range found
+          with two `searchsorted` lookups
+        - Bool and integer values are summed with prefix sums in O(trades + windows x groups), float values range by
+          range in open time order without NaNs, so they match summing the window frames exactly
+        - `exact_float_sums=False` sums float values with compensated prefix sums as well, NaN counts as 0, which is
+          O(trades + windows x groups) at the price of rounding noise in the last digits
+        - Trades with a missing group value are skipped, as `groupby` drops them
+        """
+        length = len(bounds.data_frame)
+        if groups:
+            codes = (
+                bounds.data_frame.groupby(groups, sort=True, observed=True).ngroup().fillna(-1).to_numpy(dtype=np.int64)
             )
-            window_start = current_period - delta
-            window_end = current_period
-            mask = (data_frame["agg_time_closed"] > window_start) & (data_frame["agg_time_closed"] <= window_end)
+        else:
+            codes = np.zeros(length, dtype=np.int64)
 
-            result[current_period] = data_frame.loc[mask]
+        positions = np.flatnonzero(codes >= 0)
+        positions = positions[np.argsort(codes[positions], kind="stable")]
+        group_codes, first_indices = np.unique(codes[positions], return_index=True)
+        group_rows = positions[first_indices]
+        if not groups:
+            group_codes, group_rows = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
 
-        if skip_head:
-            result = {
-                k: v for i, (k, v) in enumerate(sorted(result.items(), key=lambda item: item[0])) if i >= rolling_window
+        # (group, position) pairs as one sortable key, the windows of a group are ranges of it
+        combined = codes[positions] * (length + 1) + positions
+        offsets = group_codes[None, :] * (length + 1)
+        lower = np.searchsorted(combined, offsets + bounds.starts[:, None]).ravel()
+        upper = np.searchsorted(combined, offsets + bounds.ends[:, None]).ravel()
+
+        keep = upper > lower if groups else np.ones(len(lower), dtype=bool)
+        lower, upper = lower[keep], upper[keep]
+        group_index = np.tile(np.arange(len(group_codes)), len(bounds.periods))[keep]
+
+        sums = {}
+        for name, value in values.items():
+            value = np.asarray(value)
+            if value.dtype.kind in "biu":
+                prefix = np.concatenate(([0], np.cumsum(value[positions], dtype=np.int64)))
+                sums[name] = (prefix[upper] - prefix[lower]).astype(np.float64)
+            elif not exact_float_sums:
+                prefix, errors = TradeMetricOverTime._get_compensated_prefix_sums(value[positions])
+                sums[name] = (prefix[upper] - prefix[lower]) + (errors[upper] - errors[lower])
+            else:
+                sums[name] = TradeMetricOverTime._sum_in_trade_order(bounds, positions, lower, upper, value)
+
+        return RollingAggregates(
+            periods=bounds.periods.repeat(len(group_codes))[keep],
+            keys=bounds.data_frame[groups].iloc[group_rows[group_index]].reset_index(drop=True),
+            group_rows=group_rows[group_index],
+            counts=upper - lower,
+            sums=sums,
+        )
+
+    @staticmethod
+    def _get_buckets(
+        data_frame: pd.DataFrame, groups: List[str], values: Dict[str, np.ndarray], resolution: pd.offsets.Tick
+    ) -> pd.DataFrame:
+        """`values` and the trade count summed per (close time bucket, group), sorted by bucket."""
+        closed_at = pd.to_datetime(data_frame["closed_at"]).dt.floor(resolution)
+        is_closed = closed_at.notna().to_numpy()
+        buckets = pd.DataFrame(
+            {
+                "agg_time_closed": closed_at.to_numpy()[is_closed],
+                **{group: data_frame[group].to_numpy()[is_closed] for group in groups},
+                **{name: np.asarray(value)[is_closed] for name, value in values.items()},
+                "trade_count": np.ones(is_closed.sum(), dtype=np.int64),
             }
+        )
+
+        return buckets.groupby(["agg_time_closed"] + groups, sort=True, observed=True).sum().reset_index()
+
+    @staticmethod
+    def _get_change_periods(days: np.ndarray, start_time: pd.Timestamp, delta: np.timedelta64) -> pd.DatetimeIndex:
+        """The periods from `start_time` to the last bucket where a bucket enters or leaves the window."""
+        if len(days) == 0 or pd.isna(start_time) or start_time > days[-1]:
+            return pd.DatetimeIndex([])
+
+        changes = np.concatenate(([start_time.to_datetime64()], days, days + delta))
+
+        return pd.DatetimeIndex(np.unique(changes[(changes >= start_time.to_datetime64()) & (changes <= days[-1])]))
+
+    @staticmethod
+    def get_bucketed_rolling_aggregates(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        data_frame: pd.DataFrame,
+        groups: List[str],
+        values: Dict[str, np.ndarray],
+        aggregation_resolution: str = "H",
+        rolling_window: int = 30,
+        skip_head: bool = False,
+    ) -> RollingAggregates:
+        """
+        Rolling sums of `values` (aligned with `data_frame`) from partial sums per bucket of the close time.
+        - Trades are summed per (bucket, group), only the non-empty buckets are kept
+        - A window only changes where a bucket enters or leaves it, so the aggregates hold the periods of those
+          changes only: they equal the ones of `get_rolling_window_bounds` at these periods and stay the same until
+          the next one, which keeps memory bounded by the non-empty buckets instead of the periods of the history
+        - Sums are compensated prefix sums (see `exact_float_sums=False`), `counts` are the trades and
+          `group_rows` point into the buckets
+        """
+        resolution = TradeMetricOverTime.get_resolution(aggregation_resolution)
+        delta = (pd.Timedelta(resolution) * rolling_window).to_timedelta64()
+        buckets = TradeMetricOverTime._get_buckets(data_frame, groups, values, resolution)
+        days = buckets["agg_time_closed"].to_numpy(dtype="datetime64[ns]")
+
+        start_time = pd.to_datetime(data_frame["opened_at"]).dt.floor(resolution).min()
+        if skip_head:
+            start_time += pd.Timedelta(delta)
+        periods = TradeMetricOverTime._get_change_periods(days, start_time, delta)
+
+        bounds = RollingWindowBounds(
+            data_frame=buckets,
+            periods=periods,
+            starts=np.searchsorted(days, periods.to_numpy(dtype="datetime64[ns]") - delta, side="right"),
+            ends=np.searchsorted(days, periods.to_numpy(dtype="datetime64[ns]"), side="right"),
+        )
+        aggregates = TradeMetricOverTime.get_rolling_aggregates(
+            bounds,
+            groups,
+            {name: buckets[name].to_numpy() for name in [*values, "trade_count"]},
+            exact_float_sums=False,
+        )
+        aggregates.counts = aggregates.sums.pop("trade_count").astype(np.int64)
+
+        return aggregates
+
+    @staticmethod
+    def get_rolling_windows(
+        data_frame: pd.DataFrame,
+        skip_head: bool = False,
+        aggregation_resolution: str = "D",
+        rolling_window: int = 30,
+    ) -> Dict[pd.Timestamp, pd.DataFrame]:
+        """
+        Returns a dict of {aggregated_time: trades within the past `rolling_window_days` up to that point}.
+        - Supports arbitrary fixed aggregation_resolution (e.g., 'D', 'H', '15min')
+        - If 'D', truncates timestamps to midnight for consistent grouping
+        - Builds one frame per period, for fine resolutions over long histories use `get_bucketed_rolling_aggregates`
+        - Skips first N windows if skip_head=True
+        - Trades of a window are ordered by open time, use `get_rolling_window_bounds` to avoid the per window frames
+        """
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(
+            data_frame,
+            skip_head=skip_head,
+            aggregation_resolution=aggregation_resolution,
+            rolling_window=rolling_window,
+        )
+
+        if bounds.data_frame["opened_at"].is_monotonic_increasing:
+            return dict(iter(bounds))
 
-        result.pop(pd.NaT, None)
+        # overlapping trades: take the rows of each window by their position in open time order
+        open_order = np.argsort(bounds.data_frame["opened_at"].to_numpy(), kind="stable")
+        by_open_time = bounds.data_frame.take(open_order)
+        open_rank = np.empty_like(open_order)
+        open_rank[open_order] = np.arange(len(open_order))
 
-        return result
+        return {
+            period: by_open_time.take(np.sort(open_rank[start:end]))
+            for period, start, end in zip(bounds.periods, bounds.starts, bounds.ends)
+        }
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 import pytest
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
 from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
 from quant_core.utils.combination_utils import create_combination_bitmasks
 from quant_dev.builder import Builder
@@ -73,6 +75,43 @@ class TestTradeMetricOverTime:
         assert normalized_df["opened_at"].dtype == "datetime64[ns]"
         assert normalized_df["closed_at"].dtype == "datetime64[ns]"
 
+    def test_normalize_trades_is_cached_and_categorical(self) -> None:
+        data_frame = Builder.get_trade_history()
+
+        normalized_df = TradeMetricOverTime.normalize_trades(data_frame)
+
+        assert TradeMetricOverTime.normalize_trades(data_frame) is normalized_df
+        assert TradeMetricOverTime.normalize_trades(normalized_df) is normalized_df
+        assert TradeMetricOverTime.normalize_trades(Builder.get_trade_history()) is not normalized_df
+        for column in ["account_id", "symbol", "asset_type"]:
+            assert isinstance(normalized_df[column].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(
+            normalized_df, TradeMetricOverTime._normalize_time(data_frame), check_categorical=False, check_dtype=False
+        )
+
+    def test_normalized_trades_are_not_copied(self) -> None:
+        normalized_df = TradeMetricOverTime.normalize_trades(Builder.get_trade_history())
+
+        shallow_df = TradeMetricOverTime._normalize_time(normalized_df)
+        shallow_df["initial_balance"] = 0.0
+
+        assert np.shares_memory(shallow_df["profit"].to_numpy(), normalized_df["profit"].to_numpy())
+        assert "initial_balance" not in normalized_df.columns
+
+    @pytest.mark.parametrize("group_by_account_id", [True, False])
+    def test_set_initial_balances(self, group_by_account_id: bool) -> None:
+        data_frame = TradeMetricOverTime._normalize_time(Builder.get_trade_history())
+        deposits = data_frame[data_frame["event"] == 0].groupby("account_id")["profit"].sum()
+
+        for trades_df in [data_frame, TradeMetricOverTime.normalize_trades(data_frame)]:
+            result = AccountBalanceOverTime().set_initial_balances(
+                trades_df.copy(), group_by_account_id=group_by_account_id
+            )
+
+            expected = result["account_id"].astype(str).map(deposits) if group_by_account_id else deposits.sum()
+            assert result["initial_balance"].dtype == np.float64
+            np.testing.assert_array_equal(result["initial_balance"], np.broadcast_to(expected, len(result)))
+
     @pytest.mark.parametrize("skip_head", [True, False])
     def test_rolling_window_days(self, skip_head: bool) -> None:
         trade_metric_over_time = TradeMetricOverTime
@@ -154,14 +193,98 @@ class TestTradeMetricOverTime:
                 data_frame
             ), f"Missing:{data_frame[~data_frame['closed_at'].isin(concatenate_df['closed_at'])]}"
 
-    def test_unknown_aggregation_resolution(self) -> None:
+    @pytest.mark.parametrize("aggregation_resolution", ["unknown", "M"])
+    def test_unknown_aggregation_resolution(self, aggregation_resolution: str) -> None:
         trade_metric_over_time = TradeMetricOverTime
         data_frame = Builder.get_trade_history()
 
-        with pytest.raises(ValueError, match="Unsupported aggregation resolution: unknown"):
+        with pytest.raises(ValueError, match=f"Unsupported aggregation resolution: {aggregation_resolution}"):
             trade_metric_over_time.get_rolling_windows(
                 data_frame=data_frame,
                 rolling_window=30,
                 skip_head=False,
-                aggregation_resolution="unknown",  # type: ignore
+                aggregation_resolution=aggregation_resolution,
             )
+
+    @pytest.mark.parametrize("aggregation_resolution", ["D", "H", "4H"])
+    def test_rolling_window_bounds_match_masks(self, aggregation_resolution: str) -> None:
+        data_frame = TradeMetricOverTime._normalize_time(Builder.get_trade_history())
+        rolling_window = 10
+
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(
+            data_frame, rolling_window=rolling_window, aggregation_resolution=aggregation_resolution
+        )
+        delta = pd.Timedelta(TradeMetricOverTime.get_resolution(aggregation_resolution)) * rolling_window
+        agg_time_closed = bounds.data_frame["agg_time_closed"]
+
+        assert len(bounds) == len(bounds.starts) == len(bounds.ends)
+        assert agg_time_closed.is_monotonic_increasing
+        for window_time, window_df in bounds:
+            mask = (agg_time_closed > window_time - delta) & (agg_time_closed <= window_time)
+            pd.testing.assert_frame_equal(window_df, bounds.data_frame[mask])
+
+    @pytest.mark.parametrize("groups", [[], ["account_id"], ["account_id", "symbol"]])
+    def test_rolling_aggregates_match_groupby(self, groups: list) -> None:
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(Builder.get_trade_history(), rolling_window=10)
+        profit = bounds.data_frame["profit"].to_numpy()
+
+        aggregates = TradeMetricOverTime.get_rolling_aggregates(
+            bounds, groups, {"wins": profit > 0, "win_profit": np.where(profit > 0, profit, np.nan)}
+        )
+
+        expected = []
+        for window_time, window_df in TradeMetricOverTime.get_rolling_windows(
+            Builder.get_trade_history(), rolling_window=10
+        ).items():
+            grouped = window_df.groupby(groups) if groups else [((None,), window_df)]
+            for _, group_df in grouped:
+                winning_trades = group_df[group_df["profit"] > 0]
+                expected.append((window_time, len(group_df), len(winning_trades), winning_trades["profit"].sum()))
+
+        assert list(
+            zip(aggregates.periods, aggregates.counts, aggregates.sums["wins"], aggregates.sums["win_profit"])
+        ) == (expected)
+
+    @pytest.mark.parametrize("aggregation_resolution", ["D", "H", "4H", "15min"])
+    @pytest.mark.parametrize("groups", [[], ["account_id", "symbol"]])
+    def test_bucketed_rolling_aggregates_match_every_period(self, aggregation_resolution: str, groups: list) -> None:
+        data_frame = Builder.get_trade_history()
+        bounds = TradeMetricOverTime.get_rolling_window_bounds(
+            data_frame, skip_head=True, aggregation_resolution=aggregation_resolution, rolling_window=10
+        )
+        profit = bounds.data_frame["profit"].to_numpy()
+        dense = TradeMetricOverTime.get_rolling_aggregates(
+            bounds, groups, {"wins": profit > 0, "profit": profit}, exact_float_sums=False
+        )
+
+        profit = data_frame["profit"].to_numpy()
+        bucketed = TradeMetricOverTime.get_bucketed_rolling_aggregates(
+            data_frame, groups, {"wins": profit > 0, "profit": profit}, aggregation_resolution, 10, skip_head=True
+        )
+
+        assert len(bucketed) < len(dense)
+        assert bucketed.periods.isin(bounds.periods).all()
+        dense_df = dense.to_frame({"counts": dense.counts, **dense.sums})
+        bucketed_df = bucketed.to_frame({"counts": bucketed.counts, **bucketed.sums})
+        # every period takes the aggregates of the last change before it
+        merged_df = pd.merge_asof(dense_df, bucketed_df, on="time", by=groups or None, suffixes=("", "_bucketed"))
+        for column in ["counts", "wins", "profit"]:
+            np.testing.assert_allclose(merged_df[f"{column}_bucketed"], merged_df[column], rtol=1e-9, atol=1e-9)
+
+    def test_compensated_prefix_sums_keep_small_windows_exact(self) -> None:
+        # the large prefix would round away the cents of the windows around it with plain float64 prefix sums
+        value = np.array([1e16, 0.01, 0.02, -1e16, 0.03, np.nan, 0.04])
+
+        prefix, errors = TradeMetricOverTime._get_compensated_prefix_sums(value)
+        sums = [(prefix[upper] - prefix[lower]) + (errors[upper] - errors[lower]) for lower, upper in [(1, 3), (4, 7)]]
+
+        assert sums == [0.01 + 0.02, 0.03 + 0.04]
+
+    def test_bucketed_rolling_aggregates_of_no_trades(self) -> None:
+        data_frame = Builder.get_trade_history().iloc[:0]
+
+        aggregates = TradeMetricOverTime.get_bucketed_rolling_aggregates(
+            data_frame, ["account_id"], {"profit": data_frame["profit"].to_numpy()}
+        )
+
+        assert len(aggregates) == 0
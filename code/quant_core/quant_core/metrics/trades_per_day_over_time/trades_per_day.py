@@ -1,5 +1,28 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from typing import List, Optional
 
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
-class TradesPerDayOverTime(TradeMetricOverTime):
-    """Trades per day over time metric."""
+
+class TradesPerDayOverTime(RollingTradeMetricOverTime):
+    """Trades per day over time metric, averaged over the rolling window (`rolling_window=1` gives daily counts)."""
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        trades = aggregates.sums["trades"]
+
+        return aggregates.to_frame({"trade_count": trades / rolling_window, "trades": trades})
+
+    def calculate_bucketed(
+        self,
+        data_frame: pd.DataFrame,
+        groups: Optional[List[str]] = None,
+        aggregation_resolution: str = "H",
+        rolling_window: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """The trades per period of the resolution are scaled to trades per day."""
+        metric_df = super().calculate_bucketed(data_frame, groups, aggregation_resolution, rolling_window)
+        if not metric_df.empty:
+            metric_df["trade_count"] *= pd.Timedelta(days=1) / pd.Timedelta(self.get_resolution(aggregation_resolution))
+
+        return metric_df
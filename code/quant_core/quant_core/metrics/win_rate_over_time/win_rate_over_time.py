@@ -1,5 +1,16 @@
-from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+import numpy as np
+import pandas as pd
+from quant_core.metrics.rolling_trade_metric_over_time import RollingTradeMetricOverTime
+from quant_core.metrics.trade_metric_over_time import RollingAggregates
 
 
-class WinRateOverTime(TradeMetricOverTime):
-    """Win rate over time."""
+class WinRateOverTime(RollingTradeMetricOverTime):
+    """Win rate over time in percent, 0 for windows without trades."""
+
+    def calculate_from_aggregates(self, aggregates: RollingAggregates, rolling_window: int) -> pd.DataFrame:
+        sums = aggregates.sums
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = np.where(sums["trades"] > 0, 100 * sums["wins"] / sums["trades"], 0.0)
+
+        return aggregates.to_frame({"win_rate": win_rate, "trades": sums["trades"]})
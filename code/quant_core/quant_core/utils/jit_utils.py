@@ -0,0 +1,24 @@
+from typing import Callable, TypeVar
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+F = TypeVar("F", bound=Callable)
+
+
+def is_jit_available() -> bool:
+    """Return True if numba is installed and kernels can be compiled."""
+    return njit is not None
+
+
+def optional_jit(func: F) -> F:
+    """
+    Compile a kernel with numba (nopython, cached) if it is installed.
+    Falls back to the plain Python function otherwise, so kernels must only use numba compatible NumPy code.
+    """
+    if njit is None:
+        return func
+
+    return njit(cache=True, nogil=True)(func)  # type: ignore
@@ -0,0 +1,328 @@
+import math
+from collections import deque
+from typing import Deque, Iterable, Optional, Tuple
+
+import numpy as np
+from quant_core.utils.jit_utils import is_jit_available, optional_jit
+
+
+class RollingWindow:
+    """
+    Fixed-size window over a stream of values with O(1) mean and standard deviation per push.
+    - Sums are kept relative to an anchor and rebuilt from the window every `window` pushes to bound float drift
+    - Like pandas `rolling(window)`, the statistics are NaN until the window is full or while it contains a NaN
+    """
+
+    def __init__(self, window: int, values: Iterable[float] = ()) -> None:
+        if window < 1:
+            raise ValueError("Window must be at least 1.")
+
+        self._window = window
+        self._values: Deque[float] = deque(maxlen=window)
+        self._anchor = 0.0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._nan_count = 0
+        self._pushes_since_rebuild = 0
+
+        for value in values:
+            self.push(value)
+
+    def push(self, value: float) -> None:
+        """Append a value and drop the oldest one once the window is full."""
+        if len(self._values) == self._window:
+            self._remove(self._values[0])
+        self._values.append(value)
+        self._add(value)
+
+        self._pushes_since_rebuild += 1
+        if self._pushes_since_rebuild >= self._window:
+            self._rebuild()
+
+    def is_ready(self) -> bool:
+        """Return True if the window is full and free of NaNs."""
+        return len(self._values) == self._window and self._nan_count == 0
+
+    def mean(self) -> float:
+        """Mean of the window."""
+        if not self.is_ready():
+            return math.nan
+
+        return self._anchor + self._sum / self._window
+
+    def std(self, ddof: int = 1) -> float:
+        """Standard deviation of the window."""
+        if not self.is_ready() or self._window - ddof <= 0:
+            return math.nan
+
+        variance = (self._sum_sq - self._sum * self._sum / self._window) / (self._window - ddof)
+
+        return math.sqrt(max(variance, 0.0))
+
+    def _add(self, value: float) -> None:
+        if math.isnan(value):
+            self._nan_count += 1
+            return
+        shifted = value - self._anchor
+        self._sum += shifted
+        self._sum_sq += shifted * shifted
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            self._nan_count -= 1
+            return
+        shifted = value - self._anchor
+        self._sum -= shifted
+        self._sum_sq -= shifted * shifted
+
+    def _rebuild(self) -> None:
+        finite_values = [value for value in self._values if not math.isnan(value)]
+        self._anchor = math.fsum(finite_values) / len(finite_values) if finite_values else 0.0
+        self._sum = math.fsum(value - self._anchor for value in finite_values)
+        self._sum_sq = math.fsum((value - self._anchor) ** 2 for value in finite_values)
+        self._nan_count = len(self._values) - len(finite_values)
+        self._pushes_since_rebuild = 0
+
+
+class RollingExtremes:
+    """Rolling maximum and minimum of a stream in amortized O(1) per push using monotonic deques."""
+
+    def __init__(self, window: int, values: Iterable[float] = ()) -> None:
+        if window < 1:
+            raise ValueError("Window must be at least 1.")
+
+        self._window = window
+        self._count = 0
+        self._last_nan_index = -window - 1
+        self._max_candidates: Deque[Tuple[int, float]] = deque()
+        self._min_candidates: Deque[Tuple[int, float]] = deque()
+
+        for value in values:
+            self.push(value)
+
+    def push(self, value: float) -> None:
+        """Append a value and drop the oldest one once the window is full."""
+        index = self._count
+        self._count += 1
+
+        if math.isnan(value):
+            self._last_nan_index = index
+        else:
+            while self._max_candidates and self._max_candidates[-1][1] <= value:
+                self._max_candidates.pop()
+            self._max_candidates.append((index, value))
+
+            while self._min_candidates and self._min_candidates[-1][1] >= value:
+                self._min_candidates.pop()
+            self._min_candidates.append((index, value))
+
+        oldest_index = self._count - self._window
+        while self._max_candidates and self._max_candidates[0][0] < oldest_index:
+            self._max_candidates.popleft()
+        while self._min_candidates and self._min_candidates[0][0] < oldest_index:
+            self._min_candidates.popleft()
+
+    def is_ready(self) -> bool:
+        """Return True if the window is full and free of NaNs."""
+        return self._count >= self._window and self._last_nan_index < self._count - self._window
+
+    def max(self) -> float:
+        """Maximum of the window."""
+        return self._max_candidates[0][1] if self.is_ready() else math.nan
+
+    def min(self) -> float:
+        """Minimum of the window."""
+        return self._min_candidates[0][1] if self.is_ready() else math.nan
+
+
+def _push_linreg_sums(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    sum_y: float, sum_xy: float, value: float, oldest: float, filled: int, window: int
+) -> Tuple[float, float]:
+    """
+    Advance the least-squares sums (x = 0 .. window - 1) by one value, NaNs count as 0.
+    - `filled` values were in the window before, once it is full `oldest` drops out
+    """
+    if filled == window:
+        if np.isnan(oldest):
+            oldest = 0.0
+        # every remaining value moves one step to the left (x - 1)
+        sum_xy -= sum_y - oldest
+        sum_y -= oldest
+
+    if not np.isnan(value):
+        sum_xy += min(filled, window - 1) * value
+        sum_y += value
+
+    return sum_y, sum_xy
+
+
+def _get_linreg_sums(window_values: np.ndarray) -> Tuple[float, float]:
+    """The least-squares sums of a full window from scratch, used to bound the drift of the running sums."""
+    sum_y = 0.0
+    sum_xy = 0.0
+    for x in range(window_values.shape[0]):
+        if not np.isnan(window_values[x]):
+            sum_y += window_values[x]
+            sum_xy += x * window_values[x]
+
+    return sum_y, sum_xy
+
+
+def _fit_linreg(sum_y: float, sum_xy: float, window: int) -> Tuple[float, float]:
+    """Slope and value at the newest point (x = window - 1) of the line fitted to a full window."""
+    x_mean = (window - 1) / 2.0
+    x_var_sum = window * (window * window - 1) / 12.0
+    slope = (sum_xy - x_mean * sum_y) / x_var_sum if x_var_sum != 0 else 0.0
+
+    return slope, sum_y / window + slope * (window - 1 - x_mean)
+
+
+_push_linreg_sums = optional_jit(_push_linreg_sums)
+_get_linreg_sums = optional_jit(_get_linreg_sums)
+_fit_linreg = optional_jit(_fit_linreg)
+
+
+class RollingLinearRegression:
+    """
+    Least-squares line over the last `window` values (x = 0 .. window - 1), updated in O(1) per push.
+    - Sums are rebuilt from the window every `window` pushes to bound float drift
+    - The fit is NaN until the window is full or while it contains a NaN
+    - Shares the sum updates with `rolling_linear_regression`, so the stream and the array results agree
+    """
+
+    def __init__(self, window: int, values: Iterable[float] = ()) -> None:
+        if window < 1:
+            raise ValueError("Window must be at least 1.")
+
+        self._window = window
+        self._values: Deque[float] = deque(maxlen=window)
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+        self._nan_count = 0
+        self._pushes_since_rebuild = 0
+
+        for value in values:
+            self.push(value)
+
+    def push(self, value: float) -> None:
+        """Append a value and drop the oldest one once the window is full."""
+        filled = len(self._values)
+        oldest = self._values[0] if filled == self._window else 0.0
+        if filled == self._window:
+            self._nan_count -= math.isnan(oldest)
+
+        self._sum_y, self._sum_xy = _push_linreg_sums(self._sum_y, self._sum_xy, value, oldest, filled, self._window)
+        self._nan_count += math.isnan(value)
+        self._values.append(value)
+
+        self._pushes_since_rebuild += 1
+        if self._pushes_since_rebuild >= self._window:
+            self._sum_y, self._sum_xy = _get_linreg_sums(np.fromiter(self._values, dtype=np.float64))
+            self._pushes_since_rebuild = 0
+
+    def is_ready(self) -> bool:
+        """Return True if the window is full and free of NaNs."""
+        return len(self._values) == self._window and self._nan_count == 0
+
+    def slope(self) -> float:
+        """Slope of the fitted line."""
+        if not self.is_ready():
+            return math.nan
+
+        return _fit_linreg(self._sum_y, self._sum_xy, self._window)[0]
+
+    def value(self, x: Optional[float] = None) -> float:
+        """Value of the fitted line at `x`, by default at the newest value (x = window - 1)."""
+        if not self.is_ready():
+            return math.nan
+
+        slope, newest = _fit_linreg(self._sum_y, self._sum_xy, self._window)
+
+        return newest if x is None else newest + slope * (x - (self._window - 1))
+
+
+class ExponentialMovingAverage:
+    """
+    Exponentially weighted mean of a stream, identical to pandas `ewm(span=span, adjust=False).mean()`.
+    - NaNs before the first observation yield NaN, later NaNs keep the last value and decay its weight
+    """
+
+    def __init__(self, span: float, values: Iterable[float] = ()) -> None:
+        if span < 1:
+            raise ValueError("Span must be at least 1.")
+
+        self._alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self._old_weight_factor = 1.0 - self._alpha
+        self._old_weight = 1.0
+        self._weighted = math.nan
+
+        for value in values:
+            self.push(value)
+
+    def push(self, value: float) -> None:
+        """Fold the next value into the average."""
+        if math.isnan(self._weighted):
+            self._weighted = value
+            return
+
+        self._old_weight *= self._old_weight_factor
+        if math.isnan(value):
+            return
+
+        if self._weighted != value:
+            self._weighted = (self._old_weight * self._weighted + self._alpha * value) / (
+                self._old_weight + self._alpha
+            )
+        self._old_weight = 1.0
+
+    def mean(self) -> float:
+        """Current value of the average."""
+        return self._weighted
+
+
+def _rolling_linear_regression_loop(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The `RollingLinearRegression` updates over an array, the sums are rebuilt every `window` values."""
+    n = values.shape[0]
+    slopes = np.full(n, np.nan)
+    fitted = np.full(n, np.nan)
+
+    sum_y = 0.0
+    sum_xy = 0.0
+    nan_count = 0
+    for i in range(n):
+        oldest = values[i - window] if i >= window else 0.0
+        if i >= window and np.isnan(oldest):
+            nan_count -= 1
+
+        sum_y, sum_xy = _push_linreg_sums(sum_y, sum_xy, values[i], oldest, min(i, window), window)
+        if np.isnan(values[i]):
+            nan_count += 1
+        if (i + 1) % window == 0:
+            sum_y, sum_xy = _get_linreg_sums(values[i - window + 1 : i + 1])
+
+        if i >= window - 1 and nan_count == 0:
+            slopes[i], fitted[i] = _fit_linreg(sum_y, sum_xy, window)
+
+    return slopes, fitted
+
+
+_rolling_linear_regression_loop_jit = optional_jit(_rolling_linear_regression_loop)
+
+
+def rolling_linear_regression(
+    values: np.ndarray, window: int, use_jit: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Least-squares line over every trailing window of `values` (x = 0 .. window - 1) in O(n).
+    - Returns the slopes and the fitted values at the newest point of each window (pine `linreg(src, window, 0)`)
+    - Both are NaN for the first `window - 1` values and for every window that contains a NaN
+    """
+    if window < 1:
+        raise ValueError("Window must be at least 1.")
+    if use_jit and not is_jit_available():
+        raise RuntimeError("numba is not installed, the JIT backend is not available.")
+
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    loop = _rolling_linear_regression_loop_jit if use_jit is not False else _rolling_linear_regression_loop
+
+    return loop(values, int(window))
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+from quant_core.utils.jit_utils import is_jit_available
+from quant_core.utils.rolling_utils import (
+    ExponentialMovingAverage,
+    RollingExtremes,
+    RollingLinearRegression,
+    RollingWindow,
+    rolling_linear_regression,
+)
+
+
+def _values(length: int = 500, seed: int = 0) -> np.ndarray:
+    values = 100 + np.random.default_rng(seed).normal(size=length).cumsum()
+    values[[50, 51, 300]] = np.nan
+
+    return values
+
+
+def _reference_rolling_linreg(series: pd.Series, window: int) -> pd.Series:
+    """Former per-window implementation of the Squeeze Momentum linear regression."""
+    results = np.full(len(series), np.nan)
+    x_vals = np.arange(window)
+    for i in range(window - 1, len(series)):
+        y_window = series.iloc[i - window + 1 : i + 1]
+        if y_window.isnull().any():
+            continue
+        x_mean = x_vals.mean()
+        y_mean = y_window.mean()
+        num = np.sum((x_vals - x_mean) * (y_window - y_mean))
+        den = np.sum((x_vals - x_mean) ** 2)
+        slope = num / den if den != 0 else 0
+        intercept = y_mean - slope * x_mean
+        results[i] = intercept + slope * (window - 1)
+    return pd.Series(results, index=series.index)
+
+
+class TestRollingUtils:
+    @pytest.mark.parametrize("window", [1, 2, 20, 77])
+    def test_rolling_window(self, window: int) -> None:
+        values = _values()
+        rolling = RollingWindow(window)
+
+        means, stds = [], []
+        for value in values:
+            rolling.push(value)
+            means.append(rolling.mean())
+            stds.append(rolling.std(ddof=0))
+
+        series = pd.Series(values).rolling(window)
+        np.testing.assert_allclose(means, series.mean(), rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(stds, series.std(ddof=0), rtol=1e-9, atol=1e-9)
+
+    @pytest.mark.parametrize("window", [1, 5, 20])
+    def test_rolling_extremes(self, window: int) -> None:
+        values = _values()
+        rolling = RollingExtremes(window)
+
+        maxima, minima = [], []
+        for value in values:
+            rolling.push(value)
+            maxima.append(rolling.max())
+            minima.append(rolling.min())
+
+        series = pd.Series(values).rolling(window)
+        np.testing.assert_array_equal(maxima, series.max())
+        np.testing.assert_array_equal(minima, series.min())
+
+    @pytest.mark.parametrize("window", [2, 20, 100])
+    def test_rolling_linear_regression(self, window: int) -> None:
+        values = _values()
+        rolling = RollingLinearRegression(window)
+
+        x_vals = np.arange(window)
+        for i, value in enumerate(values):
+            rolling.push(value)
+            y_window = values[max(0, i - window + 1) : i + 1]
+            if i < window - 1 or np.isnan(y_window).any():
+                assert np.isnan(rolling.value())
+                continue
+            slope, intercept = np.polyfit(x_vals, y_window, 1)
+            assert rolling.slope() == pytest.approx(slope, rel=1e-9, abs=1e-9)
+            assert rolling.value() == pytest.approx(intercept + slope * (window - 1), rel=1e-9, abs=1e-9)
+
+    @pytest.mark.parametrize("use_jit", [False, True] if is_jit_available() else [False])
+    @pytest.mark.parametrize("window", [1, 2, 20, 100, 500])
+    def test_vectorized_rolling_linear_regression(self, window: int, use_jit: bool) -> None:
+        values = _values(length=2000) - 100
+
+        expected = _reference_rolling_linreg(pd.Series(values), window)
+        _, result = rolling_linear_regression(values, window, use_jit=use_jit)
+
+        np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-9)
+
+    def test_vectorized_rolling_linear_regression_short_input(self) -> None:
+        slopes, fitted = rolling_linear_regression(np.array([1.0, 2.0]), 5)
+
+        assert np.isnan(slopes).all() and np.isnan(fitted).all()
+
+    @pytest.mark.parametrize("span", [1, 3, 14])
+    def test_exponential_moving_average(self, span: int) -> None:
+        values = np.concatenate([[np.nan, np.nan], _values()])
+        average = ExponentialMovingAverage(span)
+
+        means = []
+        for value in values:
+            average.push(value)
+            means.append(average.mean())
+
+        np.testing.assert_array_equal(means, pd.Series(values).ewm(span=span, adjust=False).mean())
+
+    @pytest.mark.parametrize("rolling_class", [RollingWindow, RollingExtremes, RollingLinearRegression])
+    def test_invalid_window(self, rolling_class: type) -> None:
+        with pytest.raises(ValueError):
+            rolling_class(0)
@@ -0,0 +1,66 @@
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List
+
+
+@dataclass
+class BenchmarkResult:
+    """Wall-clock time of one benchmark case."""
+
+    name: str
+    size: int
+    seconds: float
+
+    @property
+    def per_item_ns(self) -> float:
+        """Cost per processed item in nanoseconds."""
+        return self.seconds / self.size * 1e9 if self.size else 0.0
+
+
+def time_call(func: Callable[[], object], repeat: int = 3) -> float:
+    """Return the best wall-clock time of `repeat` calls in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start_time)
+
+    return best
+
+
+def print_results(results: List[BenchmarkResult], unit: str = "row") -> None:
+    """Print a per-item cost table for all benchmark results."""
+    name_width = max([len(result.name) for result in results] + [4])
+    print(f"{'name':<{name_width}} {'size':>10} {'total [s]':>12} {f'per {unit} [ns]':>16}")
+    for result in results:
+        print(f"{result.name:<{name_width}} {result.size:>10} {result.seconds:>12.4f} {result.per_item_ns:>16.1f}")
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> None:
+    """Save the results as JSON, e.g. as the baseline of later runs."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump([asdict(result) for result in results], file, indent=2)
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    """Load results saved by `save_results`."""
+    with open(path, "r", encoding="utf-8") as file:
+        return [BenchmarkResult(**result) for result in json.load(file)]
+
+
+def find_regressions(
+    results: List[BenchmarkResult], baseline: List[BenchmarkResult], tolerance: float = 0.25
+) -> List[str]:
+    """Describe every case which is more than `tolerance` (relative) slower than the same case of the baseline."""
+    baseline_seconds = {(result.name, result.size): result.seconds for result in baseline}
+    regressions = []
+    for result in results:
+        seconds = baseline_seconds.get((result.name, result.size))
+        if seconds and result.seconds > seconds * (1 + tolerance):
+            regressions.append(
+                f"{result.name} [{result.size}]: {result.seconds:.4f}s vs. {seconds:.4f}s "
+                f"({result.seconds / seconds - 1:+.0%})"
+            )
+
+    return regressions
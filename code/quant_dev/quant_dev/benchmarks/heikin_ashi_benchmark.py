@@ -0,0 +1,61 @@
+import argparse
+from typing import List
+
+import pandas as pd
+from quant_core.features.kernels.heikin_ashi_kernel import heikin_ashi
+from quant_core.utils.jit_utils import is_jit_available
+from quant_dev.benchmarks.harness import BenchmarkResult, print_results, time_call
+from quant_dev.builder import Builder
+
+
+def _legacy_smoothed_heikin_ashi(data_frame: pd.DataFrame, smooth_length: int) -> pd.DataFrame:
+    """Separate pandas passes the Smoothed Heikin Ashi used before the fused kernel."""
+    data_frame["ha_open"] = (data_frame["open"].shift(1) + data_frame["close"].shift(1)) / 2
+    data_frame["ha_close"] = (data_frame["open"] + data_frame["high"] + data_frame["low"] + data_frame["close"]) / 4
+    data_frame["ha_high"] = data_frame[["high", "ha_open", "ha_close"]].max(axis=1)
+    data_frame["ha_low"] = data_frame[["low", "ha_open", "ha_close"]].min(axis=1)
+
+    for column in ("ha_open", "ha_close", "ha_high", "ha_low"):
+        smooth_column = f"{column}_smooth_{smooth_length}"
+        data_frame[smooth_column] = data_frame[column].ewm(span=smooth_length, adjust=False).mean()
+        data_frame.loc[: smooth_length - 1, smooth_column] = float("nan")
+
+    return data_frame
+
+
+def run(sizes: List[int], smooth_length: int = 10) -> List[BenchmarkResult]:
+    """Benchmark the fused Heikin Ashi kernel against the pandas path on random walk candles."""
+    results = []
+    for size in sizes:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=size, seed=size)
+        arrays = {column: data_frame[column].to_numpy() for column in ("high", "low", "close")}
+        arrays["open_"] = data_frame["open"].to_numpy()
+
+        seconds = time_call(
+            lambda data_frame=data_frame: _legacy_smoothed_heikin_ashi(data_frame.copy(), smooth_length)
+        )
+        results.append(BenchmarkResult(name="pandas", size=size, seconds=seconds))
+
+        backends = {"numpy": False}
+        if is_jit_available():
+            heikin_ashi(**arrays, smooth_length=smooth_length, use_jit=True)  # compile outside the timing
+            backends["numba"] = True
+
+        for backend, use_jit in backends.items():
+            seconds = time_call(
+                lambda arrays=arrays, use_jit=use_jit: heikin_ashi(
+                    **arrays, smooth_length=smooth_length, use_jit=use_jit
+                )
+            )
+            results.append(BenchmarkResult(name=f"kernel[{backend}]", size=size, seconds=seconds))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fused Heikin Ashi + EWM kernel.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--smooth-length", type=int, default=10)
+    args = parser.parse_args()
+
+    print_results(run(args.sizes, args.smooth_length), unit="bar")
@@ -0,0 +1,79 @@
+import argparse
+import sys
+from typing import List
+
+from quant_core.metrics.account_balance_over_time.balance_over_time import AccountBalanceOverTime
+from quant_core.metrics.expectancy_over_time.expectancy_over_time import ExpectancyOverTime
+from quant_core.metrics.metric_suite import MetricSuite
+from quant_core.metrics.sharpe_over_time.sharpe import SharpeRatioOverTime
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_core.metrics.win_rate_over_time.win_rate_over_time import WinRateOverTime
+from quant_dev.benchmarks.harness import (
+    BenchmarkResult,
+    find_regressions,
+    load_results,
+    print_results,
+    save_results,
+    time_call,
+)
+from quant_dev.builder import Builder
+
+
+def run(sizes: List[int], accounts: int = 4, symbols: int = 10, rolling_window: int = 30) -> List[BenchmarkResult]:
+    """Benchmark the trade metrics and the rolling window engine on synthetic trade histories over five years."""
+    results = []
+    for size in sizes:
+        data_frame = Builder.build_trade_history(
+            accounts=accounts, symbols=symbols, years=5, trades_per_day=size / accounts / (365 * 5), seed=size
+        )
+        cases = {
+            "rolling window bounds": lambda data_frame=data_frame: TradeMetricOverTime.get_rolling_window_bounds(
+                data_frame, skip_head=True, rolling_window=rolling_window
+            ),
+            "balance": lambda data_frame=data_frame: AccountBalanceOverTime().calculate(data_frame),
+            "balance by symbol": lambda data_frame=data_frame: AccountBalanceOverTime().calculate(
+                data_frame, group_by_symbol=True
+            ),
+            "expectancy": lambda data_frame=data_frame: ExpectancyOverTime().calculate(
+                data_frame, rolling_window=rolling_window
+            ),
+            "expectancy by symbol": lambda data_frame=data_frame: ExpectancyOverTime().calculate(
+                data_frame, group_by_symbol=True, rolling_window=rolling_window
+            ),
+            "sharpe hourly (bucketed)": lambda data_frame=data_frame: SharpeRatioOverTime().calculate_bucketed(
+                data_frame, aggregation_resolution="H", rolling_window=24 * rolling_window
+            ),
+            "suite": lambda data_frame=data_frame: MetricSuite.calculate(
+                data_frame,
+                [ExpectancyOverTime(), SharpeRatioOverTime(), WinRateOverTime()],
+                rolling_window=rolling_window,
+            ),
+        }
+
+        for name, case in cases.items():
+            results.append(BenchmarkResult(name=name, size=len(data_frame), seconds=time_call(case)))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the trade metrics.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--rolling-window", type=int, default=30)
+    parser.add_argument("--save", help="Save the results as JSON, e.g. as a new baseline.")
+    parser.add_argument("--baseline", help="Compare against the results of an earlier run saved with --save.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown to the baseline.")
+    args = parser.parse_args()
+
+    benchmark_results = run(args.sizes, args.accounts, args.symbols, args.rolling_window)
+    print_results(benchmark_results, unit="trade")
+
+    if args.save:
+        save_results(benchmark_results, args.save)
+    if args.baseline:
+        regressions = find_regressions(benchmark_results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
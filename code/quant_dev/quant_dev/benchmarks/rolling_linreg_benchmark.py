@@ -0,0 +1,64 @@
+import argparse
+from typing import List
+
+import numpy as np
+import pandas as pd
+from quant_core.utils.jit_utils import is_jit_available
+from quant_core.utils.rolling_utils import rolling_linear_regression
+from quant_dev.benchmarks.harness import BenchmarkResult, print_results, time_call
+from quant_dev.builder import Builder
+
+
+def _legacy_rolling_linreg(series: pd.Series, window: int) -> pd.Series:
+    """Per-window pandas implementation the Squeeze Momentum used before the running-sum engine."""
+    results = np.full(len(series), np.nan)
+    x_vals = np.arange(window)
+    for i in range(window - 1, len(series)):
+        y_window = series.iloc[i - window + 1 : i + 1]
+        if y_window.isnull().any():
+            continue
+        x_mean = x_vals.mean()
+        y_mean = y_window.mean()
+        num = np.sum((x_vals - x_mean) * (y_window - y_mean))
+        den = np.sum((x_vals - x_mean) ** 2)
+        slope = num / den if den != 0 else 0
+        intercept = y_mean - slope * x_mean
+        results[i] = intercept + slope * (window - 1)
+    return pd.Series(results, index=series.index)
+
+
+def run(size: int, windows: List[int], legacy_size: int) -> List[BenchmarkResult]:
+    """Benchmark the rolling linear regression backends against the legacy per-window loop."""
+    close = Builder.build_random_walk_chart_data_frame(length=size, seed=size)["close"]
+    values = close.to_numpy()
+
+    backends = {"numpy": False}
+    if is_jit_available():
+        rolling_linear_regression(values[:10], 2, use_jit=True)  # compile outside the timing
+        backends["numba"] = True
+
+    results = []
+    for window in windows:
+        legacy_series = close.iloc[:legacy_size]
+        seconds = time_call(
+            lambda series=legacy_series, window=window: _legacy_rolling_linreg(series, window), repeat=1
+        )
+        results.append(BenchmarkResult(name=f"legacy[w={window}]", size=legacy_size, seconds=seconds))
+
+        for backend, use_jit in backends.items():
+            seconds = time_call(
+                lambda window=window, use_jit=use_jit: rolling_linear_regression(values, window, use_jit=use_jit)
+            )
+            results.append(BenchmarkResult(name=f"{backend}[w={window}]", size=size, seconds=seconds))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the rolling linear regression of the Squeeze Momentum.")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--legacy-size", type=int, default=5_000, help="rows for the slow legacy loop")
+    args = parser.parse_args()
+
+    print_results(run(args.size, args.windows, args.legacy_size), unit="bar")
@@ -0,0 +1,78 @@
+import argparse
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from quant_core.metrics.trade_metric_over_time import TradeMetricOverTime
+from quant_dev.benchmarks.harness import BenchmarkResult, print_results, time_call
+
+
+def _build_trades(size: int, years: int = 5, seed: int = 0) -> pd.DataFrame:
+    """Random trades opened uniformly over `years` years and held for up to two days."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2020-01-01").value
+    span = pd.Timedelta(days=365 * years).value
+    opened_at = np.sort(rng.integers(start, start + span, size))
+    closed_at = opened_at + rng.integers(60, 2 * 24 * 3600, size) * 1_000_000_000
+
+    return pd.DataFrame(
+        {
+            "opened_at": pd.to_datetime(opened_at),
+            "closed_at": pd.to_datetime(closed_at),
+            "profit": rng.normal(0.0, 10.0, size),
+        }
+    )
+
+
+def _legacy_get_rolling_windows(data_frame: pd.DataFrame, rolling_window: int) -> Dict[pd.Timestamp, pd.DataFrame]:
+    """Daily windows with one boolean mask over all trades per day, as before the searchsorted engine."""
+    data_frame = TradeMetricOverTime._normalize_time(data_frame)  # pylint: disable=protected-access
+    data_frame["agg_time_opened"] = data_frame["opened_at"].dt.normalize()
+    data_frame["agg_time_closed"] = data_frame["closed_at"].dt.normalize()
+
+    result = {}
+    for current_period in pd.date_range(data_frame["agg_time_opened"].min(), data_frame["agg_time_closed"].max()):
+        window_start = current_period - pd.Timedelta(days=rolling_window)
+        mask = (data_frame["agg_time_closed"] > window_start) & (data_frame["agg_time_closed"] <= current_period)
+        result[current_period] = data_frame.loc[mask]
+
+    return result
+
+
+def run(sizes: List[int], rolling_window: int = 30, legacy_max_size: int = 100_000) -> List[BenchmarkResult]:
+    """Benchmark the rolling window engine on trades spread over five years."""
+    results = []
+    for size in sizes:
+        data_frame = _build_trades(size, seed=size)
+
+        if size <= legacy_max_size:
+            seconds = time_call(
+                lambda data_frame=data_frame: _legacy_get_rolling_windows(data_frame, rolling_window), repeat=1
+            )
+            results.append(BenchmarkResult(name="legacy mask", size=size, seconds=seconds))
+
+        seconds = time_call(
+            lambda data_frame=data_frame: TradeMetricOverTime.get_rolling_window_bounds(
+                data_frame, rolling_window=rolling_window
+            )
+        )
+        results.append(BenchmarkResult(name="bounds", size=size, seconds=seconds))
+
+        seconds = time_call(
+            lambda data_frame=data_frame: TradeMetricOverTime.get_rolling_windows(
+                data_frame, rolling_window=rolling_window
+            )
+        )
+        results.append(BenchmarkResult(name="windows dict", size=size, seconds=seconds))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TradeMetricOverTime rolling windows.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--rolling-window", type=int, default=30)
+    parser.add_argument("--legacy-max-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print_results(run(args.sizes, args.rolling_window, args.legacy_max_size), unit="trade")
@@ -0,0 +1,44 @@
+import argparse
+from typing import List
+
+from quant_core.features.indicators.average_true_range import DataFeatureAverageTrueRange
+from quant_core.features.kernels.super_trend_kernel import super_trend
+from quant_core.utils.jit_utils import is_jit_available
+from quant_dev.benchmarks.harness import BenchmarkResult, print_results, time_call
+from quant_dev.builder import Builder
+
+
+def run(sizes: List[int], factor: float = 3.0, atr_period: int = 10) -> List[BenchmarkResult]:
+    """Benchmark the SuperTrend kernel backends on random walk candles."""
+    results = []
+    for size in sizes:
+        data_frame = Builder.build_random_walk_chart_data_frame(length=size, seed=size)
+        atr_feature = DataFeatureAverageTrueRange(atr_period)
+        data_frame = atr_feature.add_feature(data_frame)
+        arrays = {
+            "high": data_frame["high"].to_numpy(),
+            "low": data_frame["low"].to_numpy(),
+            "close": data_frame["close"].to_numpy(),
+            "atr": data_frame[atr_feature.get_columns()[0]].to_numpy(),
+        }
+
+        backends = {"numpy": False}
+        if is_jit_available():
+            super_trend(**arrays, factor=factor, use_jit=True)  # compile outside the timing
+            backends["numba"] = True
+
+        for backend, use_jit in backends.items():
+            seconds = time_call(
+                lambda arrays=arrays, use_jit=use_jit: super_trend(**arrays, factor=factor, use_jit=use_jit)
+            )
+            results.append(BenchmarkResult(name=f"super_trend[{backend}]", size=size, seconds=seconds))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SuperTrend kernel.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print_results(run(args.sizes), unit="bar")
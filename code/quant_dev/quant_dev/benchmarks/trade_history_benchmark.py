@@ -0,0 +1,178 @@
+import argparse
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import List
+from unittest.mock import patch
+
+import pandas as pd
+from models.cache.trade_history import Trade
+from models.main.account import Account
+from models.main.account_config import AccountConfig
+from quant_core.entities.dto.trade import AlphaTradeDTO
+from quant_core.enums.asset_type import AssetType
+from quant_core.enums.platform import Platform
+from quant_core.enums.prop_firm import PropFirm
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.enums.trade_event_type import TradeEventType
+from quant_dev.benchmarks.harness import BenchmarkResult, print_results, time_call
+from services.db.cache import trade_history
+from services.db.main.account import AccountService
+from services.db.main.account_config import AccountConfigService
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# the trade history services are imported from the app, run from code/app:
+# python -m quant_dev.benchmarks.trade_history_benchmark
+
+# the per trade upsert commits every row, it is only timed up to this size
+LEGACY_MAX_SIZE = 10_000
+
+
+def _build_trades(size: int) -> List[AlphaTradeDTO]:
+    opened_at = datetime(2020, 1, 1)
+    return [
+        AlphaTradeDTO(
+            id=index,
+            account_id="",
+            order=index,
+            trade_group="123",
+            opened_at=opened_at + timedelta(minutes=index),
+            closed_at=opened_at + timedelta(minutes=index + 30),
+            direction=TradeDirection.LONG if index % 2 else TradeDirection.SHORT,
+            event=TradeEventType.LONG if index % 2 else TradeEventType.SHORT,
+            size=0.1,
+            symbol="EURUSD",
+            entry_price=1.1,
+            exit_price=1.1 + (index % 7 - 3) * 1e-4,
+            profit=(index % 7 - 3) * 10.0,
+            swap=0.0,
+            commission=-0.5,
+        )
+        for index in range(size)
+    ]
+
+
+def _upsert_legacy(trades: List[AlphaTradeDTO], account_id: str) -> None:
+    for trade in trades:
+        values = Trade.get_values(account_id, trade)
+        values.pop("account_id")
+        trade_history.upsert_trade(values, account_id)
+
+
+def get_all_trades_df_orm(enrich: bool = True) -> pd.DataFrame:
+    """The trade loader before the SQL join, ORM objects turned into rows and merged with the accounts and configs."""
+    trades_df = pd.DataFrame([trade.__dict__ for trade in trade_history.get_all_trades()])
+    trades_df = trades_df[[col for col in trades_df.columns if not col.startswith("_sa_")]]
+
+    if enrich and not trades_df.empty:
+        accounts_df = pd.DataFrame([account.__dict__ for account in AccountService().get_all_accounts()])
+        accounts_df = accounts_df[[col for col in accounts_df.columns if not col.startswith("_sa_")]]
+
+        trades_df = trades_df.merge(accounts_df, left_on="account_id", right_on="uid", how="left")
+        trades_df.drop(columns=["enabled", "uid"], inplace=True)
+
+        accounts_config_df = pd.DataFrame([config.__dict__ for config in AccountConfigService().get_all_configs()])
+        accounts_config_df = accounts_config_df[
+            [col for col in accounts_config_df.columns if not col.startswith("_sa_")]
+        ]
+        accounts_config_df["asset_type"] = accounts_config_df["asset_type"].apply(
+            lambda x: x.value if x else AssetType.UNKNOWN.value
+        )
+        accounts_config_df["symbol"] = accounts_config_df["platform_asset_id"]
+        trades_df = trades_df.merge(accounts_config_df, on=["account_id", "symbol"], how="left")
+
+    return trades_df
+
+
+def run(sizes: List[int]) -> List[BenchmarkResult]:
+    """Benchmark the per trade against the bulk upsert on a SQLite file, every case starts from an empty table."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'cache.db')}", echo=False)
+        Trade.metadata.create_all(bind=engine)
+
+        def _truncate() -> None:
+            with engine.begin() as connection:
+                connection.execute(text(f"DELETE FROM {Trade.__tablename__}"))
+
+        with patch.object(trade_history, "CacheSessionLocal", sessionmaker(bind=engine)):
+            for size in sizes:
+                trades = _build_trades(size)
+                cases = {"bulk upsert": lambda trades=trades: trade_history.upsert_trades(trades, "ACCOUNT")}
+                if size <= LEGACY_MAX_SIZE:
+                    cases["per trade upsert"] = lambda trades=trades: _upsert_legacy(trades, "ACCOUNT")
+
+                for name, func in cases.items():
+                    seconds = time_call(lambda func=func: (_truncate(), func()), repeat=1)
+                    results.append(BenchmarkResult(name, size, seconds))
+                # a re-sync of an already stored history only updates rows
+                seconds = time_call(lambda trades=trades: trade_history.upsert_trades(trades, "ACCOUNT"), repeat=1)
+                results.append(BenchmarkResult("bulk upsert (existing)", size, seconds))
+
+        engine.dispose()
+
+    return results
+
+
+def run_loaders(sizes: List[int], accounts: int = 4) -> List[BenchmarkResult]:
+    """Benchmark the SQL join trade loader against the ORM loader, the trades are spread over `accounts` accounts."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        main_engine = create_engine(f"sqlite:///{os.path.join(directory, 'main.db')}", echo=False)
+        cache_engine = create_engine(f"sqlite:///{os.path.join(directory, 'cache.db')}", echo=False)
+        Account.metadata.create_all(bind=main_engine)
+        Trade.metadata.create_all(bind=cache_engine)
+        main_session_local, cache_session_local = sessionmaker(bind=main_engine), sessionmaker(bind=cache_engine)
+
+        with main_session_local() as session:
+            for index in range(accounts):
+                session.add(
+                    Account(
+                        uid=f"ACC{index}",
+                        platform=Platform.METATRADER,
+                        prop_firm=PropFirm.FTMO,
+                        friendly_name=f"Account {index}",
+                        enabled=True,
+                    )
+                )
+                session.add(
+                    AccountConfig(
+                        account_id=f"ACC{index}",
+                        platform_asset_id="EURUSD",
+                        signal_asset_id="EURUSD",
+                        decimal_points=5,
+                        asset_type=AssetType.FOREX,
+                    )
+                )
+            session.commit()
+
+        with patch.object(trade_history, "CacheSessionLocal", cache_session_local), patch.object(
+            trade_history, "MainSessionLocal", main_session_local
+        ), patch("services.db.main.account.MainSessionLocal", main_session_local), patch(
+            "services.db.main.account_config.MainSessionLocal", main_session_local
+        ):
+            for size in sizes:
+                with cache_engine.begin() as connection:
+                    connection.execute(text(f"DELETE FROM {Trade.__tablename__}"))
+                trades = _build_trades(size)
+                for index in range(accounts):
+                    trade_history.upsert_trades(trades[index::accounts], f"ACC{index}")
+
+                results.append(BenchmarkResult("orm loader", size, time_call(get_all_trades_df_orm)))
+                results.append(BenchmarkResult("sql join loader", size, time_call(trade_history.load_trades_df)))
+
+        main_engine.dispose()
+        cache_engine.dispose()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the trade history upserts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    arguments = parser.parse_args()
+
+    print_results(run(arguments.sizes), unit="trade")
+    print()
+    print_results(run_loaders(arguments.sizes), unit="trade")
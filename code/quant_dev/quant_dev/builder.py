@@ -4,10 +4,22 @@ from contextlib import contextmanager
 from random import choices
 from typing import Any, Generator, List, Optional, Type, Union
 
+import numpy as np
 import pandas as pd
+from quant_core.enums.asset_type import AssetType
+from quant_core.enums.trade_direction import TradeDirection
+from quant_core.enums.trade_event_type import TradeEventType
 from sqlalchemy import create_engine
 from sqlalchemy.orm import DeclarativeMeta, sessionmaker
 
+SYMBOLS = [
+    ("EURUSD", AssetType.FOREX.value),
+    ("XAUUSD", AssetType.COMMODITIES.value),
+    ("US500", AssetType.INDICES.value),
+    ("BTCUSD", AssetType.CRYPTO.value),
+    ("AAPL", AssetType.STOCK.value),
+]
+
 
 class Builder:
     @staticmethod
@@ -92,6 +104,102 @@ class Builder:
 
         return pd.DataFrame(data)
 
+    @staticmethod
+    def build_random_walk_chart_data_frame(
+        length: int = 2000,
+        seed: Optional[int] = None,
+        start_price: float = 100.0,
+        volatility: float = 0.002,
+        freq: str = "5min",
+    ) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+
+        close_prices = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, length)))
+        open_prices = np.concatenate(([start_price], close_prices[:-1]))
+        wicks = np.abs(rng.normal(0.0, volatility, (2, length))) * close_prices
+        high_prices = np.maximum(open_prices, close_prices) + wicks[0]
+        low_prices = np.minimum(open_prices, close_prices) - wicks[1]
+
+        return pd.DataFrame(
+            {
+                "date": pd.date_range(start="1/1/2000", periods=length, freq=freq),
+                "open": open_prices,
+                "high": high_prices,
+                "low": low_prices,
+                "close": close_prices,
+                "volume": rng.integers(1, 1000, length).astype(float),
+            }
+        )
+
+    @staticmethod
+    def build_trade_history(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+        accounts: int = 2,
+        symbols: int = 5,
+        years: float = 1.0,
+        trades_per_day: float = 5.0,
+        initial_balance: float = 10_000.0,
+        seed: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Synthetic trade history in the layout of `get_trade_history`, every account starts with one deposit.
+        - Trades open uniformly over `years` years on random symbols and are held for minutes to days (log-normal)
+        - Profits risk 0.5% of the initial balance with fat tails (Student t, 3 degrees of freedom) and a slight edge
+        """
+        rng = np.random.default_rng(seed)
+        start = pd.Timestamp("2020-01-01")
+        span = int(pd.Timedelta(days=365 * years).total_seconds())
+        size = int(365 * years * trades_per_day)
+
+        symbol_names = [f"{name}{index // len(SYMBOLS) or ''}" for index, (name, _) in enumerate(SYMBOLS * symbols)]
+        asset_types = [asset_type for _, asset_type in SYMBOLS * symbols]
+        account_ids = ["".join(rng.choice(list(string.ascii_uppercase + string.digits), 8)) for _ in range(accounts)]
+
+        trades = []
+        for account_id in account_ids:
+            opened_at = start + pd.to_timedelta(np.sort(rng.integers(60, span, size)), unit="s")
+            held = pd.to_timedelta(rng.lognormal(np.log(2 * 3600), 1.2, size).astype(np.int64) + 1, unit="s")
+            symbol = rng.integers(0, symbols, size)
+            lots = rng.choice([0.01, 0.05, 0.1, 0.5, 1.0], size)
+            is_long = rng.random(size) < 0.5
+            nights = ((opened_at + held).normalize() - opened_at.normalize()).days
+
+            trades.append(
+                pd.DataFrame(
+                    {
+                        "account_id": account_id,
+                        "position_id": np.arange(1, size + 1),
+                        "opened_at": opened_at,
+                        "closed_at": opened_at + held,
+                        "event": np.where(is_long, TradeEventType.LONG.value, TradeEventType.SHORT.value),
+                        "symbol": np.array(symbol_names)[symbol],
+                        "asset_type": np.array(asset_types)[symbol],
+                        "direction": np.where(is_long, TradeDirection.LONG.value, TradeDirection.SHORT.value),
+                        "size": lots,
+                        "profit": np.round(0.005 * initial_balance * (0.1 + rng.standard_t(3, size)), 2),
+                        "commission": np.round(-3.5 * lots, 2),
+                        "swap": np.round(-0.5 * lots * nights, 2) + 0.0,  # no negative zeros
+                    }
+                )
+            )
+            trades.append(
+                pd.DataFrame(
+                    {
+                        "account_id": [account_id],
+                        "position_id": [0],
+                        "opened_at": [start],
+                        "closed_at": [start],
+                        "event": [TradeEventType.DEPOSIT.value],
+                        "direction": [TradeDirection.NEUTRAL.value],
+                        "size": [0.0],
+                        "profit": [initial_balance],
+                        "commission": [0.0],
+                        "swap": [0.0],
+                    }
+                )
+            )
+
+        return pd.concat(trades, ignore_index=True).sort_values("closed_at", kind="stable").reset_index(drop=True)
+
     @staticmethod
     def get_trade_history() -> pd.DataFrame:
         data_frame = pd.read_csv(